@@ -1,9 +1,94 @@
 from django.contrib import admin
-from app01.models import *
+from django.db import transaction
+
+from app01.models import Article, Comment, Tag, User
+from app01.utils import bulk_articles
+from app01.utils.admin_changelist import ScalableModelAdmin
+from app01.utils.counters import refresh_comment_counts
+from app01.utils.reference_cache import invalidate_users
+
+
 # 注册模型类
-admin.site.register(User)
-admin.site.register(Article)
-admin.site.register(Comment)
-admin.site.register(Tag)
+# 文章/评论/用户：估算计数 + 游标翻页（见 utils/admin_changelist），筛选项都走索引，
+# 外键用 raw_id 输入框（不在表单里渲染全表下拉框），批量动作用一条 UPDATE/DELETE 完成
+@admin.register(Article)
+class ArticleAdmin(ScalableModelAdmin):
+    list_display = ('id', 'title', 'user', 'status', 'is_delete', 'is_top', 'read_count', 'comment_count', 'create_time')
+    list_select_related = ('user',)
+    list_defer = ('content',)
+    # (status, is_delete, create_time) 联合索引
+    list_filter = ('status', 'is_delete', ('create_time', admin.DateFieldListFilter))
+    search_fields = ('^title',)
+    sortable_by = ('id', 'read_count', 'comment_count')
+    raw_id_fields = ('user',)
+    actions = ('publish_articles', 'unpublish_articles', 'delete_articles')
+
+    def _apply(self, request, queryset, operation, done):
+        # 与前台批量操作相同：一个事务内批量更新，提交后更新订阅/站点地图、相关文章、搜索提示
+        matched, changed = bulk_articles.apply_to(Article.objects.filter(pk__in=queryset.values('pk')), operation)
+        self.message_user(request, f'选中 {matched} 篇未删除的文章，{done} {len(changed)} 篇')
+
+    @admin.action(description='发布所选文章', permissions=['change'])
+    def publish_articles(self, request, queryset):
+        self._apply(request, queryset, 'publish', '发布')
+
+    @admin.action(description='所选文章改为草稿', permissions=['change'])
+    def unpublish_articles(self, request, queryset):
+        self._apply(request, queryset, 'unpublish', '改为草稿')
+
+    @admin.action(description='逻辑删除所选文章', permissions=['change'])
+    def delete_articles(self, request, queryset):
+        self._apply(request, queryset, 'delete', '删除')
+
 
+@admin.register(Comment)
+class CommentAdmin(ScalableModelAdmin):
+    list_display = ('id', '__str__', 'article', 'user', 'depth', 'create_time')
+    list_select_related = ('article', 'user')
+    list_defer = ('article__content',)
+    list_filter = (('create_time', admin.DateFieldListFilter),)
+    # 按用户名精确查找（唯一索引）；评论内容无索引，不提供全文搜索
+    search_fields = ('=user__username',)
+    sortable_by = ('id',)
+    raw_id_fields = ('article', 'user', 'root', 'parent')
+    actions = ('delete_comments',)
 
+    @admin.action(description='删除所选评论（连同回复）', permissions=['delete'])
+    def delete_comments(self, request, queryset):
+        with transaction.atomic():
+            article_ids = set(queryset.order_by().values_list('article_id', flat=True).distinct())
+            deleted, _ = queryset.delete()
+            # 删除后按实际评论数重算涉及文章的 comment_count
+            refresh_comment_counts(article_ids)
+        self.message_user(request, f'已删除 {deleted} 条评论（含回复），涉及 {len(article_ids)} 篇文章')
+
+
+@admin.register(User)
+class UserAdmin(ScalableModelAdmin):
+    list_display = ('id', 'username', 'email', 'is_active', 'is_staff', 'date_joined', 'last_login')
+    list_filter = ('is_active', 'is_staff', ('date_joined', admin.DateFieldListFilter))
+    search_fields = ('^username',)
+    sortable_by = ('id', 'username')
+    actions = ('activate_users', 'deactivate_users')
+
+    def _set_active(self, request, queryset, active):
+        with transaction.atomic():
+            # 不停用自己
+            user_ids = list(
+                queryset.exclude(pk=request.user.pk).filter(is_active=not active).values_list('pk', flat=True)
+            )
+            User.objects.filter(pk__in=user_ids).update(is_active=active)
+            # update() 不触发信号，手动失效用户缓存（认证中间件从缓存取用户）
+            invalidate_users(user_ids)
+        return len(user_ids)
+
+    @admin.action(description='启用所选用户', permissions=['change'])
+    def activate_users(self, request, queryset):
+        self.message_user(request, f'已启用 {self._set_active(request, queryset, True)} 个用户')
+
+    @admin.action(description='停用所选用户', permissions=['change'])
+    def deactivate_users(self, request, queryset):
+        self.message_user(request, f'已停用 {self._set_active(request, queryset, False)} 个用户')
+
+
+admin.site.register(Tag)
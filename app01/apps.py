@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class App01Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app01'
+
+    def ready(self):
+        # 注册标签/用户缓存的失效信号、订阅和站点地图、相关文章、搜索提示的增量更新信号（管理命令里修改数据也要生效），以及延后任务的 request_finished 处理
+        from app01.utils import deferred, feeds, reference_cache, related, search_suggest  # noqa: F401
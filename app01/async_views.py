@@ -0,0 +1,151 @@
+"""
+高频只读页面的异步版本，部署在 ASGI（uvicorn/daphne）下时使用。
+
+- 限流判断走 redis.asyncio，不占用线程
+- 相互独立的查询用 asyncio.gather 并发发起
+- 查询构造、模板全部复用 views.py，页面输出与同步版本一致
+
+注意：Django 4.2 的异步 ORM 仍在同一个 DB 线程里串行执行 SQL，
+gather 能重叠的是 Redis 往返和线程切换的等待，不是 SQL 本身。
+"""
+import asyncio
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import Paginator
+from django.db.models import F, Sum
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.views import View
+
+from app01.models import Article, DailyVisitStat, Tag, User
+from app01.utils.deferred import defer
+from app01.utils.read_limiter import ashould_increase_read_count
+from app01.utils.site_visit_limiter import ashould_count_site_visit
+from app01.views import ArticleDetailView, DataDashboardView, IndexView, increase_read_count
+
+# 模板渲染可能触发惰性查询（request.user、article.tags.all 等），放到同步线程执行
+arender = sync_to_async(render)
+
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _load_user(request):
+    # 先在同步线程里解析一次会话用户，后续模板访问 request.user 不再查库
+    await sync_to_async(lambda: request.user.is_authenticated)()
+
+
+class AsyncIndexView(View):
+    async def _count_visit(self, request):
+        today_visit_obj, _ = await DailyVisitStat.objects.aget_or_create(date=date.today())
+        # 今日访问：按 IP 1 小时去重后再计数
+        if await ashould_count_site_visit(request):
+            await DailyVisitStat.objects.filter(id=today_visit_obj.id).aupdate(visit_count=F('visit_count') + 1)
+        await today_visit_obj.arefresh_from_db(fields=['visit_count'])
+        return today_visit_obj.visit_count
+
+    async def get(self, request):
+        search_keyword = request.GET.get('q', '').strip()
+        tag_id = request.GET.get('tag', '').strip()
+
+        selected_tag = None
+        if tag_id.isdigit():
+            selected_tag = await Tag.objects.filter(id=int(tag_id)).afirst()
+        article_queryset = IndexView._get_article_queryset(search_keyword, selected_tag)
+
+        # 分页需要 count + 切片，放到同步线程里一次完成
+        def get_page():
+            page_obj = Paginator(article_queryset, 6).get_page(request.GET.get('page', 1))
+            page_obj.object_list = list(page_obj.object_list)
+            return page_obj
+
+        (
+            _, page_obj, hot_tags, hot_articles,
+            article_total, user_total, today_visit_count, total_visit,
+        ) = await asyncio.gather(
+            _load_user(request),
+            sync_to_async(get_page)(),
+            _alist(IndexView._get_hot_tags()),
+            _alist(IndexView._get_hot_articles()),
+            Article.objects.filter(is_delete=False, status=1).acount(),
+            User.objects.acount(),
+            self._count_visit(request),
+            DailyVisitStat.objects.aaggregate(total=Sum('visit_count')),
+        )
+
+        query_params = request.GET.copy()
+        query_params.pop('page', None)
+
+        return await arender(request, 'index.html', {
+            'search_keyword': search_keyword,
+            'selected_tag': selected_tag,
+            'page_obj': page_obj,
+            'querystring': query_params.urlencode(),
+            'hot_tags': hot_tags,
+            'hot_articles': hot_articles,
+            'article_total': article_total,
+            'user_total': user_total,
+            'today_visit_count': today_visit_count,
+            'total_visit_count': total_visit['total'] or 0,
+        })
+
+
+class AsyncArticleDetailView(View):
+    async def get(self, request, article_id):
+        try:
+            article = await Article.objects.select_related('user').prefetch_related('tags').aget(
+                id=article_id,
+                is_delete=False,
+                status=1,
+            )
+        except Article.DoesNotExist:
+            raise Http404
+
+        async def count_read():
+            # 1 小时限流：登录用户按 user_id，匿名用户按 IP+UA 去重
+            if await ashould_increase_read_count(request, article.id):
+                # 计数 UPDATE 放到响应发出之后执行（见 utils/deferred）
+                defer(increase_read_count, article.id)
+                article.read_count += 1
+
+        # 限流键按用户区分，必须先解析 request.user，否则会在事件循环里同步查库
+        await _load_user(request)
+        _, comment_list, related_links = await asyncio.gather(
+            count_read(),
+            _alist(ArticleDetailView._get_comment_queryset(article)),
+            _alist(ArticleDetailView._get_related_queryset(article)),
+        )
+
+        return await arender(request, 'article_detail.html', {
+            'article': article,
+            'root_comment_items': ArticleDetailView._build_comment_tree(comment_list),
+            'related_articles': [link.related for link in related_links],
+        })
+
+    async def post(self, request, article_id):
+        # 发表评论是低频写操作，直接复用同步实现
+        return await sync_to_async(ArticleDetailView.as_view())(request, article_id=article_id)
+
+    async def http_method_not_allowed(self, request, *args, **kwargs):
+        return JsonResponse({'code': 405, 'msg': '请求方法不被允许'})
+
+
+class AsyncDataDashboardView(View):
+    async def get(self, request):
+        end_date = date.today()
+        start_date = end_date - timedelta(days=DataDashboardView.days - 1)
+
+        _, stat_rows, register_rows, total_visit, total_user_count = await asyncio.gather(
+            _load_user(request),
+            _alist(DataDashboardView._get_stat_queryset(start_date, end_date)),
+            _alist(DataDashboardView._get_register_queryset(start_date, end_date)),
+            DailyVisitStat.objects.aaggregate(total=Sum('visit_count')),
+            User.objects.acount(),
+        )
+
+        context = DataDashboardView._build_chart_context(start_date, stat_rows, register_rows)
+        context['total_visit_count'] = total_visit['total'] or 0
+        context['total_user_count'] = total_user_count
+        return await arender(request, 'dashboard.html', context)
@@ -0,0 +1,62 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app01.utils.benchmark import free_port, run_load, start_server, stop_server
+
+
+class Command(BaseCommand):
+    help = '对比 WSGI（同步视图）与 ASGI（uvicorn + 异步视图）下首页/文章详情的吞吐和延迟'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', nargs='+', default=['/', '/article/1/'], help='压测的页面路径')
+        parser.add_argument('--concurrency', type=int, default=20, help='并发连接数')
+        parser.add_argument('--duration', type=float, default=10.0, help='每种部署压测的秒数')
+        parser.add_argument('--workers', type=int, default=1, help='uvicorn 进程数')
+        parser.add_argument('--skip-wsgi', action='store_true', help='只测 ASGI')
+
+    def handle(self, *args, **options):
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise CommandError('需要先安装 uvicorn：pip install uvicorn')
+
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'blog.settings')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+
+        targets = []
+        if not options['skip_wsgi']:
+            # runserver 为多线程 WSGI 服务器，视图为同步版本
+            wsgi_port = free_port()
+            targets.append(('WSGI', wsgi_port, dict(env, BLOG_ASYNC_VIEWS='0'), [
+                manage_py, 'runserver', f'127.0.0.1:{wsgi_port}', '--noreload', '--nostatic',
+            ]))
+        asgi_port = free_port()
+        targets.append(('ASGI', asgi_port, dict(env, BLOG_ASYNC_VIEWS='1'), [
+            '-m', 'uvicorn', 'blog.asgi:application', '--host', '127.0.0.1', '--port', str(asgi_port),
+            '--workers', str(options['workers']), '--no-access-log', '--log-level', 'warning',
+        ]))
+
+        for name, port, target_env, server_args in targets:
+            try:
+                process = start_server(server_args, port, env=target_env)
+            except RuntimeError as exc:
+                raise CommandError(f'{name} 服务器启动失败：{exc}')
+            try:
+                # 预热：建立连接、填充各级缓存
+                run_load(f'http://127.0.0.1:{port}', options['paths'], concurrency=2, duration=1)
+                result = run_load(
+                    f'http://127.0.0.1:{port}',
+                    options['paths'],
+                    concurrency=options['concurrency'],
+                    duration=options['duration'],
+                )
+            finally:
+                stop_server(process)
+            self.stdout.write(
+                f"{name}: {result['rps']:.1f} req/s, 请求 {result['requests']}，错误 {result['errors']}，"
+                f"p50 {result['p50']:.1f}ms, p95 {result['p95']:.1f}ms, p99 {result['p99']:.1f}ms"
+            )
@@ -0,0 +1,151 @@
+import json
+import os
+import subprocess
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from app01 import urls as app01_urls
+from app01.models import Article, Comment, StoredFile, User
+from app01.utils.benchmark import free_port, run_client_load, run_load, start_server, stop_server
+from app01.utils.warmup import warm_up
+
+# 只接受 POST 或有副作用（发邮件、删除）的路由不压测；feeds 生产环境由 Nginx 发送静态文件
+SKIP_ROUTES = {
+    'logout', 'upload_article_image', 'create_tag', 'send_email_captcha', 'delete_article', 'feeds',
+    'autosave_draft', 'bulk_article_action',
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = '逐个压测 app01/urls.py 中可 GET 的页面，输出吞吐、p50/p95/p99 延迟和每请求 SQL 条数（JSON）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='并发数（线程或连接）')
+        parser.add_argument('--duration', type=float, default=3.0, help='每个路由压测的秒数')
+        parser.add_argument('--routes', nargs='+', help='只压测这些 URL name')
+        parser.add_argument('--user', help='以该用户名登录后压测（默认匿名）')
+        parser.add_argument('--server', action='store_true', help='启动本机 runserver 并通过 HTTP 压测（默认进程内测试客户端）')
+        parser.add_argument('--base-url', help='压测已运行的服务器，例如 http://127.0.0.1:8000')
+        parser.add_argument('--output', help='JSON 结果写入文件（默认输出到标准输出）')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"用户不存在：{options['user']}")
+
+        routes = self._route_paths(options['routes'], user)
+        if not routes:
+            raise CommandError('没有可压测的路由（先运行 generate_demo_data 生成数据）')
+
+        process = None
+        base_url = options['base_url']
+        mode = 'url' if base_url else 'client'
+        if options['server'] and not base_url:
+            mode = 'server'
+            port = free_port()
+            manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+            try:
+                process = start_server([manage_py, 'runserver', f'127.0.0.1:{port}', '--noreload', '--nostatic'], port)
+            except RuntimeError as exc:
+                raise CommandError(f'服务器启动失败：{exc}')
+            base_url = f'http://127.0.0.1:{port}'
+        elif mode == 'client':
+            # 与 runserver 导入 blog/wsgi.py 时一样先预热本进程，否则 /readyz 一直返回 503
+            warm_up()
+
+        cookies = None
+        if user is not None and base_url:
+            # 在共享的会话存储里建一个登录会话，HTTP 请求带上它的 Cookie
+            client = Client()
+            client.force_login(user)
+            cookies = {settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value}
+
+        results = {}
+        try:
+            for name, path in routes:
+                result = results[name] = dict(path=path, **self._bench(path, options, base_url, user, cookies))
+                queries = '-' if result['queries'] is None else f"{result['queries']:.1f}"
+                self.stderr.write(
+                    f"{name:<16} {path:<40} {result['rps']:8.1f} req/s  p50 {result['p50']:7.1f}ms  "
+                    f"p95 {result['p95']:7.1f}ms  p99 {result['p99']:7.1f}ms  SQL {queries}  错误 {result['errors']}"
+                )
+        finally:
+            if process is not None:
+                stop_server(process)
+
+        report = {
+            'commit': _git_commit(),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'mode': mode,
+            'settings': os.environ.get('DJANGO_SETTINGS_MODULE'),
+            'database': connection.vendor,
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'user': options['user'],
+            'data': {
+                'users': User.objects.count(),
+                'articles': Article.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'routes': results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fp:
+                fp.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"结果已写入 {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def _bench(self, path, options, base_url, user, cookies):
+        if base_url:
+            # 预热：模板编译、连接建立
+            run_load(base_url, [path], concurrency=1, duration=0.3, cookies=cookies)
+            return run_load(
+                base_url, [path], concurrency=options['concurrency'], duration=options['duration'], cookies=cookies,
+            )
+        run_client_load([path], concurrency=1, duration=0.3, user=user)
+        return run_client_load([path], concurrency=options['concurrency'], duration=options['duration'], user=user)
+
+    def _samples(self, user=None):
+        # 评论最多的已发布文章：评论树最大，最能体现详情页的开销；登录压测时优先选该用户的文章（编辑页需要作者本人）
+        articles = Article.objects.filter(is_delete=False, status=1).order_by('-comment_count', '-id')
+        article = (user and articles.filter(user=user).first()) or articles.first()
+        stored = StoredFile.objects.filter(ref_count__gt=0).order_by('-id').first()
+        samples = {}
+        if article is not None:
+            samples['article_id'] = article.id
+        if stored is not None:
+            samples['path'] = stored.name
+        return samples
+
+    def _route_paths(self, only=None, user=None):
+        samples = self._samples(user)
+        routes = []
+        for pattern in app01_urls.urlpatterns:
+            name = getattr(pattern, 'name', None)
+            if not name or name in SKIP_ROUTES or (only and name not in only):
+                continue
+            params = list(pattern.pattern.regex.groupindex)
+            if any(param not in samples for param in params):
+                self.stderr.write(f'跳过 {name}：缺少示例参数 {params}')
+                continue
+            routes.append((name, reverse(name, kwargs={param: samples[param] for param in params})))
+        return routes
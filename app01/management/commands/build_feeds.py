@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from app01.utils import feeds
+
+
+class Command(BaseCommand):
+    help = '全量生成 RSS/Atom 订阅和站点地图（FEEDS_ROOT 下的静态文件）'
+
+    def handle(self, *args, **options):
+        shards = feeds.build_all()
+        self.stdout.write(self.style.SUCCESS(f'已生成订阅和站点地图：{feeds.feeds_root()}（文章分片 {shards} 个）'))
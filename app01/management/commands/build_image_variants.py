@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app01.models import StoredFile, User
+from app01.utils import image_variants
+
+
+class Command(BaseCommand):
+    help = '为已有头像和文章图片补生成缩略图/WebP 派生图'
+
+    def handle(self, *args, **options):
+        if image_variants.Image is None:
+            raise CommandError('需要先安装 Pillow')
+
+        futures = []
+        for name in StoredFile.objects.filter(name__startswith='article/').values_list('name', flat=True).iterator():
+            futures.append(image_variants.schedule(name, 'article'))
+        avatar_names = User.objects.exclude(avatar='').exclude(avatar__isnull=True).values_list(
+            'avatar', flat=True
+        ).distinct()
+        for name in avatar_names.iterator():
+            futures.append(image_variants.schedule(name, 'avatar'))
+
+        for future in futures:
+            future.result()
+        self.stdout.write(self.style.SUCCESS(f'已处理图片：{len(futures)} 张'))
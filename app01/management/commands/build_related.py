@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from app01.utils import related
+
+
+class Command(BaseCommand):
+    help = '按标签相似度全量重建相关文章（RelatedArticle）'
+
+    def handle(self, *args, **options):
+        engine = 'NumPy/SciPy' if related.np is not None else '纯 Python'
+        articles, rows = related.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'已计算 {articles} 篇文章（{engine}），写入 {rows} 条相关文章'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from app01.utils.static_export import export_root, export_site
+
+
+class Command(BaseCommand):
+    help = '把已发布文章页、标签页和首页导出为静态 HTML（增量，只渲染有变化的文章）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='渲染进程数，默认 CPU 核数；1 表示不用进程池')
+        parser.add_argument('--force', action='store_true', help='忽略上次的指纹，全部重新渲染（模板或静态资源变化后使用）')
+
+    def handle(self, *args, **options):
+        def report(count):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'已渲染，内容变化 {count} 页')
+
+        rendered, purge_list = export_site(workers=options['workers'], force=options['force'], on_progress=report)
+        for url in purge_list:
+            self.stdout.write(url)
+        self.stdout.write(self.style.SUCCESS(
+            f'导出到 {export_root()}：重新渲染文章 {rendered} 篇，需清除缓存 {len(purge_list)} 个地址（purge.txt）'
+        ))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app01.utils.drafts import flush_idle
+
+
+class Command(BaseCommand):
+    help = '把空闲超过 DRAFT_IDLE_SECONDS 的自动保存草稿写入文章（内容未变化的跳过）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle', type=int, help='空闲秒数（默认 DRAFT_IDLE_SECONDS）')
+        parser.add_argument('--loop', type=float, help='每隔多少秒执行一次（默认只执行一次）')
+
+    def handle(self, *args, **options):
+        while True:
+            written = flush_idle(idle_seconds=options['idle'])
+            if written or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'写入草稿 {written} 篇'))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,35 @@
+import redis
+from django.core.management.base import BaseCommand, CommandError
+
+from app01.utils.file_store import collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    help = (
+        '回收无引用的上传文件（头像/文章图片）。文章图片的引用在编辑、删除文章时不会释放，'
+        '需要加 --recount 按正文重新计数后才会被回收'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recount', action='store_true', help='先按头像、文章正文（含已删除文章）和草稿缓冲重新计算引用次数（回收文章图片需要）')
+        parser.add_argument('--batch-size', type=int, default=200, help='每批删除的文件数')
+        parser.add_argument('--grace-hours', type=int, default=24, help='引用归零后至少保留的小时数')
+        parser.add_argument('--dry-run', action='store_true', help='只统计，不删除')
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            try:
+                changed = recount_references(chunk_size=options['batch_size'], dry_run=options['dry_run'])
+            except redis.RedisError as exc:
+                # 读不到草稿缓冲就无法确认哪些图片仍被引用，不能继续回收
+                raise CommandError(f'读取草稿缓冲失败，已中止：{exc}')
+            action = '待修正' if options['dry_run'] else '已修正'
+            self.stdout.write(f'引用次数{action}：{changed} 条')
+
+        deleted = collect_garbage(
+            batch_size=options['batch_size'],
+            grace_seconds=options['grace_hours'] * 3600,
+            dry_run=options['dry_run'],
+        )
+        action = '待删除' if options['dry_run'] else '已删除'
+        self.stdout.write(self.style.SUCCESS(f'{action}无引用文件：{deleted} 个'))
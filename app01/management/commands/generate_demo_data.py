@@ -0,0 +1,283 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from app01.models import Article, Comment, DailyVisitStat, Tag, User
+
+# 预设规模：用户、标签、文章、单篇最多评论数
+SCALES = {
+    'small': (50, 20, 300, 20),
+    'medium': (500, 80, 5000, 60),
+    'large': (5000, 200, 50000, 150),
+}
+
+WORDS = (
+    'Django', 'Python', 'Redis', 'MySQL', '缓存', '索引', '事务', '连接池', '并发', '异步', '模板', '中间件',
+    '查询', '分页', '部署', 'Nginx', '日志', '监控', '性能', '优化', '架构', '接口', '测试', '队列',
+    '序列化', '权限', '会话', '静态资源', '压缩', '容器', '配置', '迁移', '模型', '视图', '路由', '表单',
+)
+SENTENCE_PARTS = (
+    '在实际项目中', '需要注意的是', '经过压测发现', '一个常见的误区是', '从源码可以看到', '换句话说',
+    '为了减少数据库压力', '线上环境里', '默认配置下', '更稳妥的做法是', '这里的关键在于', '对比之后',
+)
+TAG_NAMES = (
+    'Python', 'Django', 'Redis', 'MySQL', 'Linux', 'Nginx', 'Docker', '前端', '算法', '数据库',
+    '性能优化', '缓存', '并发编程', '网络', '设计模式', '读书笔记', '随笔', '工具', 'Git', '部署',
+)
+CODE_SNIPPETS = (
+    ('python', "def handler(request):\n    data = cache.get(key)\n    if data is None:\n"
+               "        data = build()\n        cache.set(key, data, 60)\n    return data"),
+    ('sql', "SELECT id, title FROM app01_article\nWHERE status = 1 AND is_delete = 0\n"
+            "ORDER BY create_time DESC\nLIMIT 10;"),
+    ('bash', "python manage.py migrate\npython manage.py collectstatic --noinput\nsystemctl restart uwsgi"),
+)
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    # bulk_create 会调用 pre_save，auto_now/auto_now_add 会覆盖手动设置的时间；生成期间临时关闭
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _next_id(model):
+    return (model.objects.aggregate(value=Max('id'))['value'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = '批量生成演示/压测数据：用户、标签、Markdown 文章、多层评论和一年的访问统计'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES.keys(), default='small', help='预设规模')
+        parser.add_argument('--users', type=int, help='用户数（覆盖预设）')
+        parser.add_argument('--tags', type=int, help='标签数（覆盖预设）')
+        parser.add_argument('--articles', type=int, help='文章数（覆盖预设）')
+        parser.add_argument('--max-comments', type=int, help='单篇文章最多评论数（覆盖预设）')
+        parser.add_argument('--days', type=int, default=365, help='生成多少天的访问统计')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='bulk_create 每批条数')
+        parser.add_argument('--seed', type=int, default=42, help='随机种子，相同参数生成相同数据')
+
+    def handle(self, *args, **options):
+        users, tags, articles, max_comments = SCALES[options['scale']]
+        self.users = options['users'] if options['users'] is not None else users
+        self.tag_total = options['tags'] if options['tags'] is not None else tags
+        self.article_total = options['articles'] if options['articles'] is not None else articles
+        self.max_comments = options['max_comments'] if options['max_comments'] is not None else max_comments
+        self.chunk_size = options['chunk_size']
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+
+        started = time.perf_counter()
+        with _explicit_timestamps(User, Tag, Article, Comment):
+            user_ids = self._create_users()
+            tag_ids = self._create_tags()
+            article_ids = self._create_articles(user_ids, tag_ids)
+            comment_total = self._create_comments(user_ids, article_ids)
+        stat_total = self._create_visit_stats(options['days'])
+        self._reset_sequences()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'用户 {len(user_ids)}，标签 {len(tag_ids)}，文章 {len(article_ids)}，评论 {comment_total}，'
+            f'访问统计 {stat_total} 天，耗时 {time.perf_counter() - started:.1f}s'
+        ))
+
+    def _bulk_create(self, model, objs):
+        # 每批单独提交，避免大事务长时间占用锁
+        for start in range(0, len(objs), self.chunk_size):
+            with transaction.atomic():
+                model.objects.bulk_create(objs[start:start + self.chunk_size])
+
+    def _random_time(self, after=None):
+        # 时间集中在最近一段时间，模拟“越新的内容越多”
+        earliest = after or self.now - timedelta(days=365)
+        span = (self.now - earliest).total_seconds()
+        return earliest + timedelta(seconds=span * (1 - self.random.random() ** 2))
+
+    def _create_users(self):
+        first_id = _next_id(User)
+        # 密码哈希很慢，所有演示用户共用一个
+        password = make_password('demo123456')
+        objs = []
+        for offset in range(self.users):
+            user_id = first_id + offset
+            joined = self._random_time()
+            objs.append(User(
+                id=user_id,
+                username=f'demo_{user_id}',
+                first_name=f'用户{user_id}',
+                email=f'demo_{user_id}@example.com',
+                password=password,
+                date_joined=joined,
+                last_login=joined,
+            ))
+        # 第一个演示用户设为超级管理员，方便压测需要登录的页面
+        if objs and not User.objects.filter(is_superuser=True).exists():
+            objs[0].is_superuser = objs[0].is_staff = True
+        self._bulk_create(User, objs)
+        return [obj.id for obj in objs]
+
+    def _create_tags(self):
+        existing = set(Tag.objects.values_list('name', flat=True))
+        first_id = _next_id(Tag)
+        objs = []
+        index = 0
+        while len(objs) < self.tag_total:
+            base = TAG_NAMES[index % len(TAG_NAMES)]
+            name = base if index < len(TAG_NAMES) else f'{base}{index // len(TAG_NAMES)}'
+            index += 1
+            if name in existing:
+                continue
+            created = self._random_time()
+            objs.append(Tag(id=first_id + len(objs), name=name, create_time=created, update_time=created))
+        self._bulk_create(Tag, objs)
+        return [obj.id for obj in objs]
+
+    def _sentence(self):
+        words = self.random.sample(WORDS, 3)
+        return f'{self.random.choice(SENTENCE_PARTS)}，{words[0]} 和 {words[1]} 的配合决定了{words[2]}的表现。'
+
+    def _markdown(self):
+        blocks = []
+        for section in range(self.random.randint(2, 6)):
+            blocks.append(f'## {section + 1}. {self.random.choice(WORDS)} {self.random.choice(WORDS)}')
+            for _ in range(self.random.randint(1, 4)):
+                blocks.append(''.join(self._sentence() for _ in range(self.random.randint(2, 6))))
+            roll = self.random.random()
+            if roll < 0.35:
+                lang, code = self.random.choice(CODE_SNIPPETS)
+                blocks.append(f'```{lang}\n{code}\n```')
+            elif roll < 0.6:
+                blocks.append('\n'.join(f'- **{self.random.choice(WORDS)}**：{self._sentence()}' for _ in range(3)))
+            elif roll < 0.7:
+                blocks.append(f'> {self._sentence()}')
+        return '\n\n'.join(blocks)
+
+    def _create_articles(self, user_ids, tag_ids):
+        # 作者集中在少数用户（博客通常只有少数人写文章）
+        authors = user_ids[:max(1, len(user_ids) // 20)] or list(User.objects.values_list('id', flat=True)[:1])
+        first_id = _next_id(Article)
+        through = Article.tags.through
+        article_ids = []
+        for start in range(0, self.article_total, self.chunk_size):
+            objs, links = [], []
+            for offset in range(start, min(start + self.chunk_size, self.article_total)):
+                article_id = first_id + offset
+                created = self._random_time()
+                roll = self.random.random()
+                objs.append(Article(
+                    id=article_id,
+                    title=f'{self.random.choice(WORDS)} 实践：{self.random.choice(WORDS)} 与 {self.random.choice(WORDS)}',
+                    content=self._markdown(),
+                    status=0 if roll < 0.05 else 1,
+                    is_delete=0.05 <= roll < 0.07,
+                    # 阅读量长尾分布
+                    read_count=min(int(self.random.paretovariate(1.2) * 20), 10 ** 6),
+                    user_id=self.random.choice(authors),
+                    create_time=created,
+                    update_time=created,
+                ))
+                for tag_id in self.random.sample(tag_ids, min(len(tag_ids), self.random.randint(0, 3))):
+                    links.append(through(article_id=article_id, tag_id=tag_id))
+                article_ids.append(article_id)
+            with transaction.atomic():
+                Article.objects.bulk_create(objs)
+                through.objects.bulk_create(links)
+        return article_ids
+
+    def _create_comments(self, user_ids, article_ids):
+        if not user_ids or not article_ids:
+            return 0
+        next_id = _next_id(Comment)
+        created_times = dict(Article.objects.filter(id__in=article_ids).values_list('id', 'create_time'))
+        total = 0
+        pending = []
+        counts = {}
+        for article_id in article_ids:
+            # 评论数长尾分布：少数热门文章评论很多
+            count = min(self.max_comments, int(self.random.paretovariate(1.1)) - 1)
+            article_comments = []
+            for _ in range(count):
+                parent = None
+                if article_comments and self.random.random() < 0.6:
+                    parent = self.random.choice(article_comments)
+                after = parent.create_time if parent else created_times[article_id]
+                created = self._random_time(after=after)
+                comment = Comment(
+                    id=next_id,
+                    article_id=article_id,
+                    user_id=self.random.choice(user_ids),
+                    content=self._sentence(),
+                    parent=parent,
+                    root=(parent.root or parent) if parent else None,
+                    depth=parent.depth + 1 if parent else 0,
+                    create_time=created,
+                    update_time=created,
+                )
+                next_id += 1
+                article_comments.append(comment)
+            if count:
+                counts[article_id] = count
+            pending.extend(article_comments)
+            if len(pending) >= self.chunk_size:
+                total += self._flush_comments(pending)
+                pending = []
+        total += self._flush_comments(pending)
+
+        # 评论数写回文章计数字段，按评论数分组批量更新
+        by_count = {}
+        for article_id, count in counts.items():
+            by_count.setdefault(count, []).append(article_id)
+        with transaction.atomic():
+            for count, ids in by_count.items():
+                for start in range(0, len(ids), self.chunk_size):
+                    Article.objects.filter(id__in=ids[start:start + self.chunk_size]).update(comment_count=count)
+        return total
+
+    def _flush_comments(self, comments):
+        # 同一批里父评论在前（按 id 顺序生成），外键约束可以满足
+        comments.sort(key=lambda c: c.id)
+        self._bulk_create(Comment, comments)
+        return len(comments)
+
+    def _create_visit_stats(self, days):
+        today = date.today()
+        existing = set(DailyVisitStat.objects.filter(
+            date__gte=today - timedelta(days=days - 1),
+        ).values_list('date', flat=True))
+        objs = []
+        for offset in range(days):
+            current = today - timedelta(days=offset)
+            if current in existing:
+                continue
+            # 周末访问量低一些，越接近现在访问越多
+            base = 200 + (days - offset) * 2
+            weekend = 0.7 if current.weekday() >= 5 else 1.0
+            objs.append(DailyVisitStat(date=current, visit_count=int(base * weekend * self.random.uniform(0.7, 1.3))))
+        self._bulk_create(DailyVisitStat, objs)
+        return len(objs)
+
+    def _reset_sequences(self):
+        # 手动指定了主键，PostgreSQL 等需要重置序列；MySQL/SQLite 返回空列表
+        statements = connection.ops.sequence_reset_sql(no_style(), [User, Tag, Article, Comment])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
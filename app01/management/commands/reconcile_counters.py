@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from app01.utils.counters import reconcile_comment_counts
+
+
+class Command(BaseCommand):
+    help = '按实际评论数校正 Article.comment_count（分块扫描，只回写有差异的文章）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='每块文章数（一条分组查询）')
+        parser.add_argument('--pause', type=float, default=0.0, help='每块之间休眠的秒数')
+        parser.add_argument('--dry-run', action='store_true', help='只统计差异，不回写')
+
+    def handle(self, *args, **options):
+        def report(last_id, changed):
+            for article_id, stored, real in changed:
+                self.stdout.write(f'文章 {article_id}：comment_count {stored} -> {real}')
+            if options['verbosity'] > 1:
+                self.stdout.write(f'已扫描到 id {last_id}')
+
+        scanned, fixed = reconcile_comment_counts(
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            pause=options['pause'],
+            on_chunk=report,
+        )
+        action = '待修正' if options['dry_run'] else '已修正'
+        self.stdout.write(self.style.SUCCESS(f'扫描文章 {scanned} 篇，{action} {fixed} 篇'))
@@ -0,0 +1,48 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from app01.utils.deferred import run_durable_batch
+
+
+class Command(BaseCommand):
+    help = '执行 defer_durable() 写入的持久化延后任务（可多进程同时运行，按行加锁领取）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='执行完当前到期的任务后退出')
+        parser.add_argument('--batch', type=int, default=20, help='每次领取的任务数')
+        parser.add_argument('--sleep', type=float, default=1.0, help='没有到期任务时的休眠秒数')
+        parser.add_argument('--lease', type=int, default=300, help='领取后多少秒内不会被其它进程重复领取')
+        parser.add_argument('--max-attempts', type=int, default=5, help='失败达到该次数后不再重试（保留记录）')
+
+    def handle(self, *args, **options):
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+            self.stdout.write('收到退出信号，执行完当前这批任务后退出')
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        total_done = total_failed = 0
+        while not stopping:
+            close_old_connections()
+            done, failed = run_durable_batch(
+                batch_size=options['batch'],
+                lease_seconds=options['lease'],
+                max_attempts=options['max_attempts'],
+            )
+            total_done += done
+            total_failed += failed
+            if done or failed:
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'成功 {done}，失败 {failed}')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'持久化任务：成功 {total_done}，失败 {total_failed}'))
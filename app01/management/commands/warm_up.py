@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app01.utils.benchmark import USER_AGENT
+
+
+def _first_requests(paths):
+    """在新进程里导入 blog.wsgi（按 BLOG_WARMUP 决定是否预热），依次请求 paths，返回启动和各请求耗时（毫秒）。"""
+    start = time.perf_counter()
+    from blog.wsgi import application
+
+    result = {'startup': (time.perf_counter() - start) * 1000, 'requests': []}
+    for path in paths:
+        path, _, query = path.partition('?')
+        environ = {'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_USER_AGENT': USER_AGENT, 'REMOTE_ADDR': '127.0.0.1'}
+        setup_testing_defaults(environ)
+        status = []
+        start = time.perf_counter()
+        response = application(environ, lambda code, headers, exc_info=None: status.append(code))
+        try:
+            for _ in response:
+                pass
+        finally:
+            response.close()
+        result['requests'].append({
+            'path': path + (f'?{query}' if query else ''),
+            'status': int(status[0].split()[0]),
+            'ms': (time.perf_counter() - start) * 1000,
+        })
+    return result
+
+
+async def _first_requests_asgi(paths):
+    """同 _first_requests，但在事件循环中导入 blog.asgi（与 uvicorn 相同）并直接调用 ASGI 应用。"""
+    start = time.perf_counter()
+    from blog.asgi import application
+
+    result = {'startup': (time.perf_counter() - start) * 1000, 'requests': []}
+    for path in paths:
+        path, _, query = path.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 80),
+            'headers': [(b'host', b'127.0.0.1'), (b'user-agent', USER_AGENT.encode())],
+        }
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        status = []
+
+        async def receive():
+            return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        start = time.perf_counter()
+        await application(scope, receive, send)
+        result['requests'].append({
+            'path': path + (f'?{query}' if query else ''),
+            'status': status[0],
+            'ms': (time.perf_counter() - start) * 1000,
+        })
+    return result
+
+
+class Command(BaseCommand):
+    help = '执行 worker 预热并输出各步骤耗时（--measure 对比预热前后新进程首个请求的延迟）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--measure', action='store_true', help='分别启动不预热/预热的新进程，测量首个请求延迟')
+        parser.add_argument('--paths', nargs='+', default=['/', '/article/1/'], help='--measure 时依次请求的页面')
+        parser.add_argument('--repeat', type=int, default=3, help='--measure 时每种方式启动的进程数，取中位数')
+        parser.add_argument('--asgi', action='store_true', help='--measure 时改为在事件循环中导入 blog.asgi（同 uvicorn）')
+        parser.add_argument('--first-request', action='store_true', help='（内部使用）子进程测量模式')
+
+    def handle(self, *args, **options):
+        if options['first_request']:
+            if options['asgi']:
+                result = asyncio.run(_first_requests_asgi(options['paths']))
+            else:
+                result = _first_requests(options['paths'])
+            self.stdout.write(json.dumps(result))
+            return
+        if options['measure']:
+            self._measure(options['paths'], options['repeat'], options['asgi'])
+            return
+
+        from app01.utils.warmup import warm_up
+
+        state = warm_up()
+        for name, ms in state['steps'].items():
+            error = state['errors'].get(name)
+            self.stdout.write(f'{name:<10} {ms:>8.1f}ms' + (f'  失败：{error}' if error else ''))
+        if state['errors']:
+            raise CommandError(f"{len(state['errors'])} 个预热步骤失败")
+        self.stdout.write(self.style.SUCCESS('预热完成'))
+
+    def _measure(self, paths, repeat, asgi=False):
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        # ASGI 下由 blog/asgi.py 开启异步视图
+        env = dict(os.environ, BLOG_ASYNC_VIEWS='1' if asgi else '0')
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'blog.settings')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+
+        summary = {}
+        for label, flag in (('不预热', '0'), ('预热', '1')):
+            runs = []
+            for _ in range(repeat):
+                completed = subprocess.run(
+                    [sys.executable, manage_py, 'warm_up', '--first-request', '--paths', *paths,
+                     *(['--asgi'] if asgi else [])],
+                    env=dict(env, BLOG_WARMUP=flag), capture_output=True, text=True,
+                )
+                if completed.returncode != 0:
+                    raise CommandError(completed.stderr[-2000:])
+                runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+            summary[label] = runs
+            startup = statistics.median(run['startup'] for run in runs)
+            self.stdout.write(f"{label}：导入 blog.{'asgi' if asgi else 'wsgi'} {startup:.1f}ms")
+            for index, path in enumerate(paths):
+                ms = statistics.median(run['requests'][index]['ms'] for run in runs)
+                status = runs[-1]['requests'][index]['status']
+                self.stdout.write(f'  {path:<24} 首个请求 {ms:>8.1f}ms（{status}）')
+
+        for index, path in enumerate(paths):
+            before = statistics.median(run['requests'][index]['ms'] for run in summary['不预热'])
+            after = statistics.median(run['requests'][index]['ms'] for run in summary['预热'])
+            self.stdout.write(self.style.SUCCESS(f'{path}：{before:.1f}ms -> {after:.1f}ms'))
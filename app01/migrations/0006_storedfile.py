@@ -0,0 +1,29 @@
+# Generated by Django 4.2.10 on 2026-10-19 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app01', '0005_dailyvisitstat_alter_user_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('create_time', models.DateTimeField(auto_now_add=True)),
+                ('update_time', models.DateTimeField(auto_now=True)),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='内容哈希')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='存储路径')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='文件大小')),
+                ('ref_count', models.IntegerField(db_index=True, default=0, verbose_name='引用次数')),
+            ],
+            options={
+                'verbose_name': 'stored_file',
+                'verbose_name_plural': 'stored_file',
+            },
+        ),
+    ]
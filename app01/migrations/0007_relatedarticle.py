@@ -0,0 +1,29 @@
+# Generated by Django 4.2.10 on 2026-10-19 22:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app01', '0006_storedfile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='相似度')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='排名')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='app01.article', verbose_name='文章')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app01.article', verbose_name='相关文章')),
+            ],
+            options={
+                'verbose_name': 'related_article',
+                'verbose_name_plural': 'related_article',
+                'unique_together': {('article', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.10 on 2026-10-19 22:56
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app01', '0007_relatedarticle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeferredTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('func', models.CharField(max_length=255, verbose_name='任务函数')),
+                ('payload', models.JSONField(default=dict, verbose_name='参数')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='已失败次数')),
+                ('run_after', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='执行时间')),
+                ('last_error', models.TextField(blank=True, verbose_name='最近错误')),
+                ('create_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+            ],
+            options={
+                'verbose_name': 'deferred_task',
+                'verbose_name_plural': 'deferred_task',
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 # 抽象类，用于定义公共字段
@@ -23,6 +24,8 @@ class User(AbstractUser):
     class Meta:
         verbose_name = "user"
         verbose_name_plural = "user"
+        # 后台按注册时间筛选
+        indexes = [models.Index(fields=["date_joined"], name="user_date_joined_idx")]
     # 重写你不想要的字段，设置为允许为空
     last_name = models.CharField(max_length=150, blank=True, null=True)
     first_name = models.CharField(max_length=150, blank=True, null=True)
@@ -81,6 +84,9 @@ class Comment(CommonModel):
     # 深度 表示评论的层级，根评论深度为0，回复评论深度为1
     depth = models.PositiveIntegerField("深度", default=0)
 
+    class Meta:
+        # 后台按评论时间筛选
+        indexes = [models.Index(fields=["create_time"], name="comment_create_time_idx")]
 
     def __str__(self):
         return self.content[:10]
@@ -117,6 +123,10 @@ class Article(CommonModel):
         verbose_name="标签",
     )
 
+    class Meta:
+        # 后台按状态 / 是否删除 / 发布时间筛选
+        indexes = [models.Index(fields=["status", "is_delete", "create_time"], name="article_status_time_idx")]
+
     def __str__(self):
         return self.title
 
@@ -134,3 +144,69 @@ class DailyVisitStat(models.Model):
     def __str__(self):
         return f"{self.date}: {self.visit_count}"
 
+
+
+# 上传文件表（内容寻址）：相同内容只存一份，按引用计数回收
+class StoredFile(CommonModel):
+    # 文件内容的 SHA-256，唯一
+    sha256 = models.CharField("内容哈希", max_length=64, unique=True)
+    # 存储路径（相对 MEDIA_ROOT），如 article/ab/ab12...ef.png
+    name = models.CharField("存储路径", max_length=255, unique=True)
+    size = models.PositiveBigIntegerField("文件大小", default=0)
+    # 引用次数：头像/文章引用；<= 0 时可被垃圾回收
+    ref_count = models.IntegerField("引用次数", default=0, db_index=True)
+
+    class Meta:
+        verbose_name = "stored_file"
+        verbose_name_plural = "stored_file"
+
+    def __str__(self):
+        return self.name
+
+
+# 相关文章（预计算）：按标签相似度排序的前 K 篇，详情页按 (article, rank) 索引一次查询读取
+class RelatedArticle(models.Model):
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="related_links",
+        verbose_name="文章",
+    )
+    related = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="相关文章",
+    )
+    # Jaccard / 余弦相似度
+    score = models.FloatField("相似度")
+    # 排名，从 0 开始
+    rank = models.PositiveSmallIntegerField("排名")
+
+    class Meta:
+        verbose_name = "related_article"
+        verbose_name_plural = "related_article"
+        unique_together = (("article", "rank"),)
+
+    def __str__(self):
+        return f"{self.article_id} -> {self.related_id}"
+
+
+# 持久化延后任务（见 utils/deferred.defer_durable），由 run_deferred_tasks 命令执行
+class DeferredTask(models.Model):
+    # 模块级函数的导入路径，如 app01.views.increase_read_count
+    func = models.CharField("任务函数", max_length=255)
+    # {"args": [...], "kwargs": {...}}
+    payload = models.JSONField("参数", default=dict)
+    attempts = models.PositiveSmallIntegerField("已失败次数", default=0)
+    # 到期时间：领取后推后一个租约，失败后按指数退避推后
+    run_after = models.DateTimeField("执行时间", default=timezone.now, db_index=True)
+    last_error = models.TextField("最近错误", blank=True)
+    create_time = models.DateTimeField("创建时间", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "deferred_task"
+        verbose_name_plural = "deferred_task"
+
+    def __str__(self):
+        return f"{self.id} {self.func}"
@@ -2,6 +2,31 @@
 from django import forms
 
 from app01.models import Tag
+from app01.utils.reference_cache import get_all_tags
+
+
+class TagMultipleChoiceField(forms.MultipleChoiceField):
+    """按缓存的标签列表校验，返回 Tag 对象列表，代替 ModelMultipleChoiceField 每次查库。"""
+
+    def __init__(self, **kwargs):
+        super().__init__(choices=self._tag_choices, **kwargs)
+        self._tag_map = {}
+
+    @staticmethod
+    def _tag_choices():
+        return [(str(tag.pk), tag.name) for tag in get_all_tags()]
+
+    def valid_value(self, value):
+        return str(value) in self._tag_map
+
+    def clean(self, value):
+        self._tag_map = {str(tag.pk): tag for tag in get_all_tags()}
+        # 刚在其它进程创建、失效广播还没到本进程的标签：回查数据库
+        missing = [pk for pk in value or () if str(pk) not in self._tag_map and str(pk).isdigit()]
+        if missing:
+            self._tag_map.update((str(tag.pk), tag) for tag in Tag.objects.filter(pk__in=missing))
+        values = super().clean(value)
+        return [self._tag_map[str(pk)] for pk in values]
 
 
 class PubArticleForm(forms.Form):
@@ -16,6 +41,6 @@ class PubArticleForm(forms.Form):
         'required': '请输入内容',
     })
     # 可以用ModelMultipleChoiceField来选择多个标签
-    tags = forms.ModelMultipleChoiceField(queryset=Tag.objects.all(), error_messages={
+    tags = TagMultipleChoiceField(error_messages={
         'required': '请选择标签',
     })
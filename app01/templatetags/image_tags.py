@@ -0,0 +1,18 @@
+from django import template
+
+from app01.utils import image_variants
+
+register = template.Library()
+
+
+@register.filter
+def avatar_thumb(avatar, display_size=40):
+    """{{ user.avatar|avatar_thumb:30 }}：返回适合该显示尺寸的头像缩略图地址。"""
+    name = getattr(avatar, 'name', avatar)
+    return image_variants.avatar_url(name, int(display_size))
+
+
+@register.filter
+def responsive_images(content):
+    """{{ article.content|responsive_images }}：正文图片改为引用多宽度派生图。"""
+    return image_variants.responsive_markdown(content)
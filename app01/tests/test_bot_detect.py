@@ -0,0 +1,70 @@
+"""
+爬虫识别（app01/utils/bot_detect.py）：python manage.py test app01.tests.test_bot_detect
+"""
+from django.test import SimpleTestCase
+
+from app01.utils.bot_detect import BotClassifier
+
+BROWSERS = (
+    # 搜狗浏览器
+    'Mozilla/5.0 (Linux; Android 10; V1938T Build/QP1A.190711.020; wv) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Version/4.0 Chrome/68.0.3440.106 Mobile Safari/537.36 SogouMobileBrowser/5.28.6',
+    'Mozilla/5.0 (Linux; Android 9; ALP-AL00 Build/HUAWEIALP-AL00) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/66.0.3359.126 Mobile Safari/537.36 SogouMSE,SogouMobileBrowser/5.22.8',
+    'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.198 '
+    'Safari/537.36 SE 2.X MetaSr 1.0',
+    'Mozilla/5.0 (compatible; MSIE 9.0; Windows NT 6.1; Trident/5.0; SE 2.X MetaSr 1.0; Sogou Explorer)',
+    # 机型名带 bot
+    'Mozilla/5.0 (Linux; Android 10; CUBOT X30) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/87.0.4280.101 Mobile Safari/537.36',
+    'Mozilla/5.0 (Linux; Android 10; CUBOT KINGKONG 5 Pro Build/QP1A.190711.020; wv) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Version/4.0 Chrome/96.0.4664.104 Mobile Safari/537.36',
+    # 常见浏览器
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 '
+    'Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148 '
+    'MicroMessenger/8.0.40(0x1800282a) NetType/WIFI Language/zh_CN',
+)
+
+CRAWLERS = (
+    ('Sogou web spider/4.0(+http://www.sogou.com/docs/help/webmasters.htm#07)', 'sogou'),
+    ('Sogou inst spider/4.0(+http://www.sogou.com/docs/help/webmasters.htm#07)', 'sogou'),
+    ('Sogou Pic Spider/3.0(+http://www.sogou.com/docs/help/webmasters.htm#07)', 'sogou'),
+    ('Sogou-Test-Spider/4.0 (compatible; MSIE 5.5; Windows 98)', 'sogou'),
+    ('Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)', 'google'),
+    ('Mozilla/5.0 (compatible; Baiduspider/2.0; +http://www.baidu.com/search/spider.html)', 'baidu'),
+    ('Mozilla/5.0 (compatible; bingbot/2.0; +http://www.bing.com/bingbot.htm)', 'bing'),
+    ('Mozilla/5.0 (Linux; Android 5.0) AppleWebKit/537.36 (KHTML, like Gecko) Mobile Safari/537.36 '
+     '(compatible; Bytespider; spider-feedback@bytedance.com)', 'bytedance'),
+    ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/13.1.1 '
+     'Safari/605.1.15 (Applebot/0.1; +http://www.apple.com/go/applebot)', 'generic'),
+    ('Mozilla/5.0 (compatible; SeznamBot/4.0; +https://o-seznam.cz/napoveda/vyhledavani/en/seznambot-crawler/)',
+     'generic'),
+    ('Mozilla/5.0 (compatible; Barkrowler/0.9; +https://babbar.tech/crawler)', 'generic'),
+    ('curl/8.5.0', 'http_client'),
+    ('', 'empty'),
+)
+
+
+class UserAgentTests(SimpleTestCase):
+    def setUp(self):
+        self.classifier = BotClassifier()
+
+    def test_browsers_are_counted(self):
+        for user_agent in BROWSERS:
+            with self.subTest(user_agent=user_agent):
+                self.assertIsNone(self.classifier.classify_user_agent(user_agent))
+
+    def test_crawlers(self):
+        for user_agent, family in CRAWLERS:
+            with self.subTest(user_agent=user_agent):
+                self.assertEqual(self.classifier.classify_user_agent(user_agent), family)
+
+    def test_ip_ranges(self):
+        classifier = BotClassifier(ip_ranges=('203.0.113.0/24', '2001:db8::/32'))
+        self.assertEqual(classifier.classify_ip('203.0.113.7'), 'ip')
+        self.assertEqual(classifier.classify_ip('::ffff:203.0.113.7'), 'ip')
+        self.assertEqual(classifier.classify_ip('2001:db8::1'), 'ip')
+        self.assertIsNone(classifier.classify_ip('198.51.100.1'))
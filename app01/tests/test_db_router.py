@@ -0,0 +1,136 @@
+"""
+读写分离（app01/utils/db_router.py）：python manage.py test app01.tests.test_db_router --settings=blog.settings_test
+
+需要 DATABASES 中有名为 replica 的第二个 SQLite 库（blog/settings_test.py），测试中把它加入 DATABASE_REPLICAS。
+两个库的数据互相独立：只写入主库的数据从从库读不到，可以直接看出读请求走了哪个库。
+"""
+import asyncio
+import time
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase
+from django.test.utils import override_settings
+
+from app01.models import Tag
+from app01.utils import db_router
+from app01.utils.db_router import PIN_COOKIE_NAME, PRIMARY, ReplicaPinMiddleware, health
+
+REPLICA = 'replica'
+
+
+@skipUnless(REPLICA in settings.DATABASES, '需要 DATABASES 中的 replica 库（--settings=blog.settings_test）')
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_HEALTH_CHECK_INTERVAL=60, REPLICA_PIN_SECONDS=10)
+class ReplicaRouterTests(TransactionTestCase):
+    # 不能用 TestCase：它把每个测试包在主库事务里，路由器会因 in_atomic_block 全部读主库
+    # 跳过时测试运行器仍会收集 databases，写成 __all__ 避免别名不存在时报错
+    databases = '__all__'
+
+    def setUp(self):
+        health.reset()
+        self.factory = RequestFactory()
+        Tag.objects.create(name='primary-only')
+
+    def _serve(self, request, view=None):
+        """经 ReplicaPinMiddleware 执行 view，返回 (响应, view 中各次读取所用的库)。"""
+        reads = []
+
+        def get_response(request):
+            (view or (lambda: None))()
+            reads.append(Tag.objects.all().db)
+            return HttpResponse()
+
+        return ReplicaPinMiddleware(get_response)(request), reads
+
+    def test_outside_request_reads_primary(self):
+        self.assertEqual(Tag.objects.all().db, PRIMARY)
+
+    def test_safe_request_reads_replica(self):
+        response, reads = self._serve(self.factory.get('/'))
+        self.assertEqual(reads, [REPLICA])
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+        # 主库写入的数据从库里没有：确实读了另一个库
+        self.assertFalse(Tag.objects.using(REPLICA).filter(name='primary-only').exists())
+
+    def test_unsafe_method_reads_primary_and_pins(self):
+        response, reads = self._serve(self.factory.post('/'), view=lambda: Tag.objects.create(name='posted'))
+        self.assertEqual(reads, [PRIMARY])
+        self.assertIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_unsafe_method_without_write_does_not_pin(self):
+        response, reads = self._serve(self.factory.post('/'))
+        self.assertEqual(reads, [PRIMARY])
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_pin_cookie(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE_NAME] = str(int(time.time()) + 10)
+        self.assertEqual(self._serve(request)[1], [PRIMARY])
+
+        expired = self.factory.get('/')
+        expired.COOKIES[PIN_COOKIE_NAME] = str(int(time.time()) - 1)
+        self.assertEqual(self._serve(expired)[1], [REPLICA])
+
+        garbage = self.factory.get('/')
+        garbage.COOKIES[PIN_COOKIE_NAME] = 'x'
+        self.assertEqual(self._serve(garbage)[1], [REPLICA])
+
+    def test_write_in_safe_request_reads_primary_afterwards(self):
+        reads = []
+
+        def view():
+            reads.append(Tag.objects.all().db)
+            Tag.objects.filter(name='primary-only').update(name='renamed')
+
+        response, after = self._serve(self.factory.get('/'), view=view)
+        self.assertEqual(reads + after, [REPLICA, PRIMARY])
+        # 安全方法不下发 Cookie
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_atomic_block_reads_primary(self):
+        reads = []
+
+        def view():
+            with transaction.atomic():
+                reads.append(Tag.objects.all().db)
+
+        _, after = self._serve(self.factory.get('/'), view=view)
+        self.assertEqual(reads + after, [PRIMARY, REPLICA])
+
+    def test_replica_marked_down_falls_back_to_primary(self):
+        health.mark_down(REPLICA, 'test')
+        self.assertEqual(self._serve(self.factory.get('/'))[1], [PRIMARY])
+        # 摘除到期后恢复
+        with mock.patch.object(db_router.time, 'monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(self._serve(self.factory.get('/'))[1], [REPLICA])
+
+    def test_failed_health_check_marks_down(self):
+        with mock.patch.object(db_router.connections[REPLICA], 'cursor', side_effect=OperationalError('gone')):
+            self.assertEqual(self._serve(self.factory.get('/'))[1], [PRIMARY])
+        self.assertFalse(health.is_up(REPLICA))
+
+    def test_connection_error_on_query_marks_down(self):
+        def view():
+            # 在从库上执行时出现连接错误：本次查询照常抛出，从库被摘除
+            execute = mock.Mock(side_effect=OperationalError('lost connection'))
+            context = {'connection': db_router.connections[REPLICA]}
+            with self.assertRaises(OperationalError):
+                db_router._track_errors(execute, 'SELECT 1', None, False, context)
+
+        self._serve(self.factory.get('/'), view=view)
+        self.assertEqual(self._serve(self.factory.get('/'))[1], [PRIMARY])
+
+    def test_async_middleware(self):
+        async def get_response(request):
+            await sync_to_async(Tag.objects.create)(name='async-write')
+            return HttpResponse(await sync_to_async(lambda: Tag.objects.all().db)())
+
+        async def serve(request):
+            return await ReplicaPinMiddleware(get_response)(request)
+
+        response = asyncio.run(serve(self.factory.post('/')))
+        self.assertEqual(response.content, PRIMARY.encode())
+        self.assertIn(PIN_COOKIE_NAME, response.cookies)
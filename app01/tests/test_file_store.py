@@ -0,0 +1,85 @@
+"""
+上传文件引用计数与回收（app01/utils/file_store.py）：python manage.py test app01.tests.test_file_store
+"""
+from datetime import timedelta
+from unittest import mock, skipIf
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from app01.models import Article, StoredFile, User
+from app01.utils import drafts, file_store
+from app01.utils.redis_client import get_client
+
+try:
+    import fakeredis
+except ImportError:  # 测试依赖，未安装时跳过
+    fakeredis = None
+
+DAY_AGO = timedelta(days=2)
+
+
+@skipIf(fakeredis is None, '需要安装 fakeredis')
+@override_settings(REDIS_CLIENT_FACTORY='fakeredis.FakeRedis', MEDIA_URL='/media/')
+class RecountTests(TestCase):
+    def setUp(self):
+        get_client().flushdb()
+        self.user = User.objects.create_user('gc_author', password='x')
+
+    def _stored(self, name, ref_count):
+        # 首次上传在保留期之前
+        stored = StoredFile.objects.create(sha256=name.ljust(64, '0')[:64], name=name, ref_count=ref_count)
+        StoredFile.objects.filter(id=stored.id).update(update_time=timezone.now() - DAY_AGO)
+        return stored
+
+    def _ref(self, name):
+        return StoredFile.objects.get(name=name).ref_count
+
+    def test_soft_deleted_articles_and_draft_buffers_count(self):
+        self._stored('article/aa/deleted.png', 1)
+        self._stored('article/bb/buffered.png', 1)
+        Article.objects.create(title='t', content='![](/media/article/aa/deleted.png)', user=self.user, is_delete=True)
+        article = Article.objects.create(title='t', content='', user=self.user, status=0)
+        drafts.redis_buffer.save(article.id, {
+            'title': 't', 'content': '![](/media/article/bb/buffered.png)', 'tags': [], 'hash': 'h', 'saved_at': 0,
+        }, track_idle=False)
+
+        self.assertEqual(file_store.recount_references(), 0)
+        self.assertEqual(file_store.collect_garbage(), 0)
+        self.assertEqual(StoredFile.objects.count(), 2)
+
+    def test_recount_refreshes_grace_period(self):
+        self._stored('article/cc/orphan.png', 1)
+        self.assertEqual(file_store.recount_references(), 1)
+        self.assertEqual(self._ref('article/cc/orphan.png'), 0)
+        # 刚归零，同一次 gc_media --recount 不会删除
+        self.assertEqual(file_store.collect_garbage(), 0)
+        self.assertEqual(file_store.collect_garbage(grace_seconds=0), 1)
+
+    def test_reupload_refreshes_grace_period(self):
+        stored = self._stored('article/dd/reused.png', 0)
+        before = StoredFile.objects.get(id=stored.id).update_time
+        with mock.patch.object(file_store.default_storage, 'exists', return_value=True):
+            file_store._store('/nonexistent', stored.sha256, 0, stored.name)
+        stored.refresh_from_db()
+        self.assertEqual(stored.ref_count, 1)
+        self.assertGreater(stored.update_time, before)
+
+    def test_dry_run_does_not_write(self):
+        self._stored('article/ee/orphan.png', 3)
+        self.assertEqual(file_store.recount_references(dry_run=True), 1)
+        self.assertEqual(self._ref('article/ee/orphan.png'), 3)
+
+    def test_concurrent_upload_is_not_overwritten(self):
+        self._stored('article/ff/new.png', 0)
+        count = file_store._count_references
+
+        def count_with_upload(chunk_size):
+            # 统计期间同内容又被上传一次
+            StoredFile.objects.filter(name='article/ff/new.png').update(ref_count=1)
+            return count(chunk_size)
+
+        with mock.patch.object(file_store, '_count_references', count_with_upload):
+            file_store.recount_references()
+        self.assertEqual(self._ref('article/ff/new.png'), 1)
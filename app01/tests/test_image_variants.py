@@ -0,0 +1,48 @@
+"""
+派生图存在性缓存（app01/utils/image_variants.py）：python manage.py test app01.tests.test_image_variants
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+from app01.utils import image_variants
+
+NAME = 'variants/article/ab/abcd_480.webp'
+
+
+@override_settings(IMAGE_VARIANT_HIT_TTL=600, IMAGE_VARIANT_MISS_TTL=60)
+class VariantExistsTests(SimpleTestCase):
+    def setUp(self):
+        image_variants._known_variants.clear()
+        self.addCleanup(image_variants._known_variants.clear)
+        self.now = 1000.0
+        patcher = mock.patch.object(image_variants.time, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _exists(self, stored):
+        with mock.patch.object(image_variants.default_storage, 'exists', return_value=stored) as exists:
+            result = image_variants.variant_exists(NAME)
+        return result, exists.called
+
+    def test_hit_expires(self):
+        self.assertEqual(self._exists(True), (True, True))
+        self.now += 599
+        self.assertEqual(self._exists(False), (True, False))
+        # 其它进程（gc_media）删除后，过期重查即停止引用
+        self.now += 2
+        self.assertEqual(self._exists(False), (False, True))
+
+    def test_miss_expires(self):
+        self.assertEqual(self._exists(False), (False, True))
+        self.now += 59
+        self.assertEqual(self._exists(True), (False, False))
+        self.now += 2
+        self.assertEqual(self._exists(True), (True, True))
+
+    def test_delete_forgets(self):
+        self._exists(True)
+        with mock.patch.object(image_variants.default_storage, 'delete'):
+            image_variants.delete_variants('article/ab/abcd.png')
+        self.assertEqual(self._exists(False), (False, True))
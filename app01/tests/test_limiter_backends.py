@@ -0,0 +1,103 @@
+"""
+进程内去重后端（app01/utils/limiter_backends.LocalLimiterBackend）：python manage.py test app01.tests.test_limiter_backends
+
+用假时钟代替 time.monotonic，不需要等待真实时间，也不依赖 Redis。
+"""
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+from app01.utils import limiter_backends
+from app01.utils.limiter_backends import LocalLimiterBackend, get_backend
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class LocalLimiterBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(limiter_backends.time, 'monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.backend = LocalLimiterBackend(shards=4, wheel_size=8)
+
+    def _stored(self):
+        return sum(len(shard) for shard in self.backend._shards)
+
+    def test_set_if_absent(self):
+        self.assertTrue(self.backend.set_if_absent('read:1:ip', 60))
+        self.assertFalse(self.backend.set_if_absent('read:1:ip', 60))
+        self.assertTrue(self.backend.set_if_absent('read:2:ip', 60))
+
+    def test_ttl(self):
+        self.assertTrue(self.backend.set_if_absent('k', 5))
+        self.clock.now += 4.9
+        self.assertFalse(self.backend.set_if_absent('k', 5))
+        self.clock.now += 0.2
+        self.assertTrue(self.backend.set_if_absent('k', 5))
+
+    def test_wheel_removes_expired_keys_without_access(self):
+        for index in range(20):
+            self.backend.set_if_absent(f'k{index}', 3)
+        self.assertEqual(self._stored(), 20)
+        self.clock.now += 5
+        # 任意一次操作推进时间轮，过期项被批量清理
+        self.backend.set_if_absent('other', 60)
+        self.assertEqual(self._stored(), 1)
+
+    def test_ttl_longer_than_wheel_is_rescheduled(self):
+        self.backend.set_if_absent('long', 20)
+        for _ in range(19):
+            self.clock.now += 1
+            self.backend.set_if_absent('tick', 1)
+        self.assertFalse(self.backend.set_if_absent('long', 20))
+        self.clock.now += 2
+        self.backend.set_if_absent('tick', 1)
+        self.assertNotIn('long', self.backend._shard('long'))
+
+    def test_stall_longer_than_one_turn(self):
+        self.backend.set_if_absent('a', 2)
+        self.backend.set_if_absent('b', 30)
+        self.clock.now += 1000
+        self.backend.set_if_absent('other', 60)
+        self.assertEqual(self._stored(), 1)
+
+    def test_expire_extends_ttl(self):
+        self.backend.set_if_absent('k', 5)
+        self.clock.now += 3
+        self.assertTrue(self.backend.expire('k', 30))
+        self.clock.now += 10
+        self.backend.set_if_absent('tick', 1)
+        self.assertFalse(self.backend.set_if_absent('k', 5))
+        self.assertFalse(self.backend.expire('missing', 30))
+
+    def test_incr(self):
+        self.assertEqual([self.backend.incr('c', 10) for _ in range(3)], [1, 2, 3])
+        self.clock.now += 11
+        self.assertEqual(self.backend.incr('c', 10), 1)
+
+    def test_incr_without_ttl_never_expires(self):
+        self.backend.incr('c')
+        self.clock.now += 10 ** 6
+        self.assertEqual(self.backend.incr('c'), 2)
+
+    def test_async_set_if_absent(self):
+        self.assertTrue(asyncio.run(self.backend.aset_if_absent('k', 5)))
+        self.assertFalse(asyncio.run(self.backend.aset_if_absent('k', 5)))
+
+
+class GetBackendTests(SimpleTestCase):
+    @override_settings(LIMITER_BACKEND='app01.utils.limiter_backends.LocalLimiterBackend', LIMITER_LOCAL_SHARDS=2)
+    def test_setting_selects_backend(self):
+        backend = get_backend()
+        self.assertIsInstance(backend, LocalLimiterBackend)
+        self.assertEqual(backend.shard_count, 2)
+        self.assertIs(get_backend(), backend)
@@ -0,0 +1,121 @@
+"""
+media 文件服务（app01/utils/media_server.py）：python manage.py test app01.tests.test_media_server
+
+不需要 Nginx：X-Accel-Redirect / X-Sendfile 只检查 Django 返回的响应头。
+"""
+import os
+import shutil
+import tempfile
+
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase
+from django.test.utils import override_settings
+from django.utils.http import http_date
+
+from app01.utils.media_server import serve_media
+
+CONTENT = bytes(range(256)) * 4
+HASHED = 'article/ab/' + 'ab' * 32 + '.png'
+
+
+class ServeMediaTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        for name in (HASHED, 'avatar/me.png', '.upload_tmp/x.upload'):
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as fp:
+                fp.write(CONTENT)
+        settings_override = override_settings(MEDIA_ROOT=self.root, MEDIA_ACCEL=None, MEDIA_MAX_AGE=600)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.factory = RequestFactory()
+
+    def _get(self, path=HASHED, **headers):
+        response = serve_media(self.factory.get('/media/' + path, **headers), path)
+        self.addCleanup(response.close)
+        return response
+
+    def _body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_full_file(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._body(response), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+    def test_cache_control(self):
+        self.assertEqual(self._get()['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(self._get('avatar/me.png')['Cache-Control'], 'public, max-age=600')
+
+    def test_range(self):
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=1000-': (1000, 1023),
+            'bytes=-24': (1000, 1023),
+            'bytes=1020-5000': (1020, 1023),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(range=header):
+                response = self._get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(self._body(response), CONTENT[start:end + 1])
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{len(CONTENT)}')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+
+    def test_unsatisfiable_range(self):
+        for header in ('bytes=1024-', 'bytes=-0', 'bytes=10-5'):
+            with self.subTest(range=header):
+                response = self._get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_unsupported_range_returns_full_file(self):
+        for header in ('bytes=0-1,5-6', 'items=0-1', 'bytes=-'):
+            with self.subTest(range=header):
+                response = self._get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self._body(response), CONTENT)
+
+    def test_not_modified(self):
+        first = self._get()
+        etag, last_modified = first['ETag'], first['Last-Modified']
+        for headers in (
+            {'HTTP_IF_NONE_MATCH': etag},
+            {'HTTP_IF_NONE_MATCH': f'"other", {etag}'},
+            {'HTTP_IF_NONE_MATCH': '*'},
+            {'HTTP_IF_MODIFIED_SINCE': last_modified},
+        ):
+            with self.subTest(headers=headers):
+                response = self._get(**headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+        self.assertEqual(self._get(HTTP_IF_MODIFIED_SINCE=http_date(0)).status_code, 200)
+
+    @override_settings(MEDIA_ACCEL='x-accel-redirect', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_x_accel_redirect(self):
+        response = self._get(HTTP_RANGE='bytes=0-9')
+        # Nginx 负责发送文件和处理 Range，Django 只返回头
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + HASHED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    @override_settings(MEDIA_ACCEL='x-sendfile')
+    def test_x_sendfile(self):
+        response = self._get()
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.root, HASHED))
+        self.assertEqual(response.content, b'')
+
+    def test_hidden_and_outside_paths(self):
+        for path in ('.upload_tmp/x.upload', '../etc/passwd', 'article', 'missing.png'):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                serve_media(self.factory.get('/media/' + path), path)
@@ -0,0 +1,33 @@
+"""
+/metrics 访问控制与 Server-Timing 开关（app01/utils/metrics.py）：python manage.py test app01.tests.test_metrics
+"""
+from django.test import TestCase
+from django.test.utils import override_settings
+
+
+@override_settings(METRICS_TOKEN='s3cret', METRICS_ALLOWED_IPS=())
+class MetricsAccessTests(TestCase):
+    def test_loopback_is_not_trusted(self):
+        # 同机 Nginx 反向代理时所有访客都是 127.0.0.1
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 403)
+
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_empty_token_never_matches(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    @override_settings(METRICS_ALLOWED_IPS=('10.0.0.5',))
+    def test_allowed_ip(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.0.0.5').status_code, 200)
+
+
+class ServerTimingTests(TestCase):
+    def test_off_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get('/metrics'))
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_enabled(self):
+        self.assertIn('Server-Timing', self.client.get('/metrics'))
@@ -0,0 +1,60 @@
+"""
+视图查询预算（场景见 app01/utils/query_budget.py）：python manage.py test app01.tests.test_query_budgets
+
+先用小数据集跑一遍全部场景，再把文章/评论/标签扩充到数倍再跑一遍：
+任一轮超出 SQL / Redis 上限，或两轮条数不同（N+1），该场景失败并列出相关 SQL。
+"""
+from unittest import skipIf
+
+from django.conf import settings
+from django.test import TransactionTestCase
+from django.test.utils import override_settings
+
+from app01.utils import query_budget
+
+try:
+    import fakeredis
+except ImportError:  # 测试依赖，未安装时跳过
+    fakeredis = None
+
+# 两轮数据集：(文章数, 每篇评论数, 每篇标签数)
+SMALL = (3, 2, 1)
+LARGE = (12, 12, 4)
+
+
+@skipIf(fakeredis is None, '需要安装 fakeredis')
+@override_settings(
+    # 预算按默认配置（Redis 会话 + Redis 去重）设定；Redis 用替身，不依赖也不改动本机 Redis
+    REDIS_CLIENT_FACTORY='fakeredis.FakeRedis',
+    REDIS_ASYNC_CLIENT_FACTORY='fakeredis.FakeAsyncRedis',
+    SESSION_ENGINE='app01.utils.redis_session',
+    LIMITER_BACKEND='app01.utils.limiter_backends.RedisLimiterBackend',
+    # Redis 次数取自 Server-Timing 响应头
+    SERVER_TIMING_HEADER=True,
+    # 不依赖 collectstatic 生成的 manifest
+    STORAGES={**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}},
+)
+class QueryBudgetTests(TransactionTestCase):
+    # 缓存失效、延后任务等挂在 transaction.on_commit 上，需要真实提交，与线上一致
+
+    def _run_round(self, label, index, shape):
+        run = query_budget.BudgetRun(label, index)
+        run.seed(*shape)
+        return {scenario.name: query_budget.run_scenario(scenario, run) for scenario in query_budget.SCENARIOS}
+
+    def test_query_budgets(self):
+        query_budget.seed_common()
+        small = self._run_round('small', 1, SMALL)
+        # 在小数据集基础上继续扩充，文章/评论/标签数量都变成数倍
+        large = self._run_round('large', 2, LARGE)
+
+        for scenario in query_budget.SCENARIOS:
+            before, after = small[scenario.name], large[scenario.name]
+            with self.subTest(scenario=scenario.name):
+                self.assertEqual(before.failures, [], '小数据集：\n' + query_budget.format_queries(before.queries))
+                self.assertEqual(after.failures, [], '大数据集：\n' + query_budget.format_queries(after.queries))
+                self.assertEqual(
+                    (len(before.queries), before.redis), (len(after.queries), after.redis),
+                    '查询数随数据量变化（SQL 条数, Redis 次数）：\n'
+                    + query_budget.format_growth(before.queries, after.queries),
+                )
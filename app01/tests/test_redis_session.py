@@ -0,0 +1,116 @@
+"""
+Redis 会话引擎（app01/utils/redis_session.py）：python manage.py test app01.tests.test_redis_session
+
+Redis 用 fakeredis 代替（未安装时跳过），降级路径用抛 RedisError 的客户端模拟 Redis 故障。
+"""
+from unittest import mock, skipIf
+
+import redis
+from django.contrib.sessions.backends.base import CreateError
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+from django.contrib.sessions.models import Session
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from app01.utils import redis_session
+from app01.utils.redis_client import get_client
+from app01.utils.redis_session import KEY_PREFIX, SessionStore
+
+try:
+    import fakeredis
+except ImportError:  # 测试依赖，未安装时跳过
+    fakeredis = None
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise redis.ConnectionError('Connection refused')
+        return fail
+
+
+@skipIf(fakeredis is None, '需要安装 fakeredis')
+@override_settings(REDIS_CLIENT_FACTORY='fakeredis.FakeRedis', SESSION_SAVE_EVERY_REQUEST=False)
+class RedisSessionTests(TestCase):
+    def setUp(self):
+        self.client_redis = get_client()
+        self.client_redis.flushdb()
+
+    def _saved(self, **data):
+        store = SessionStore()
+        store.update(data)
+        store.save()
+        return store.session_key
+
+    def test_round_trip_with_ttl(self):
+        key = self._saved(user='alice')
+        self.assertEqual(SessionStore(key)['user'], 'alice')
+        ttl = self.client_redis.ttl(KEY_PREFIX + key)
+        self.assertGreater(ttl, 0)
+        self.assertLessEqual(ttl, SessionStore(key).get_expiry_age())
+        self.assertFalse(Session.objects.exists())
+
+    def test_unchanged_session_is_not_written_back(self):
+        key = self._saved(user='alice')
+        store = SessionStore(key)
+        store['user'] = 'alice'
+        with mock.patch.object(self.client_redis, 'set', wraps=self.client_redis.set) as set_call:
+            store.save()
+        set_call.assert_not_called()
+
+    def test_changed_session_is_written(self):
+        key = self._saved(user='alice')
+        store = SessionStore(key)
+        store['user'] = 'bob'
+        store.save()
+        self.assertEqual(SessionStore(key)['user'], 'bob')
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+    def test_unchanged_session_only_refreshes_ttl(self):
+        key = self._saved(user='alice')
+        self.client_redis.expire(KEY_PREFIX + key, 5)
+        store = SessionStore(key)
+        store.load()
+        with mock.patch.object(self.client_redis, 'set', wraps=self.client_redis.set) as set_call:
+            store.save()
+        set_call.assert_not_called()
+        self.assertGreater(self.client_redis.ttl(KEY_PREFIX + key), 5)
+
+    def test_must_create_collision(self):
+        key = self._saved(user='alice')
+        store = SessionStore(key)
+        with self.assertRaises(CreateError):
+            store.save(must_create=True)
+
+    def test_miss_falls_back_to_db_and_migrates(self):
+        old = DBSessionStore()
+        old['user'] = 'legacy'
+        old.save()
+        store = SessionStore(old.session_key)
+        self.assertEqual(store['user'], 'legacy')
+        self.assertTrue(store.modified)
+        store.save()
+        self.assertTrue(self.client_redis.exists(KEY_PREFIX + old.session_key))
+
+    def test_unknown_key_gets_new_session(self):
+        store = SessionStore('x' * 32)
+        self.assertEqual(store.load(), {})
+        self.assertIsNone(store.session_key)
+
+    def test_redis_down_uses_db(self):
+        with mock.patch.object(redis_session, 'get_client', BrokenRedis):
+            key = self._saved(user='alice')
+            self.assertTrue(Session.objects.filter(session_key=key).exists())
+            self.assertEqual(SessionStore(key)['user'], 'alice')
+            self.assertTrue(SessionStore().exists(key))
+        # Redis 恢复后，未命中时回查数据库，故障期间写入的会话仍然有效
+        self.assertEqual(SessionStore(key)['user'], 'alice')
+
+    def test_delete_clears_redis_and_db(self):
+        key = self._saved(user='alice')
+        old = DBSessionStore(key)
+        old['user'] = 'alice'
+        old.save()
+        SessionStore(key).delete()
+        self.assertFalse(self.client_redis.exists(KEY_PREFIX + key))
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
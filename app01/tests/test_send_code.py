@@ -0,0 +1,28 @@
+"""
+注册验证码邮件（app01/utils/send_code.py）：python manage.py test app01.tests.test_send_code
+"""
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from app01.models import CaptchaModel
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class SendEmailCaptchaTests(TestCase):
+    def test_sent_in_request(self):
+        result = self.client.get('/send_email_captcha/', {'email': 'reader@example.com'}).json()
+        self.assertEqual(result['code'], 200)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].body, CaptchaModel.objects.get(email='reader@example.com').captcha)
+
+    def test_smtp_failure_is_reported(self):
+        with mock.patch('app01.utils.send_code.send_mail', side_effect=OSError('connection refused')):
+            with self.assertLogs('app01.utils.send_code', 'ERROR'):
+                result = self.client.get('/send_email_captcha/', {'email': 'reader@example.com'}).json()
+        self.assertEqual(result['code'], 500)
+
+    def test_email_required(self):
+        self.assertEqual(self.client.get('/send_email_captcha/').json()['code'], 400)
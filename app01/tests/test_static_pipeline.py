@@ -0,0 +1,65 @@
+"""
+预压缩静态文件服务（app01/utils/static_pipeline.py）：python manage.py test app01.tests.test_static_pipeline
+"""
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.test.utils import override_settings
+
+from app01.utils.static_pipeline import PrecompressedStaticMiddleware
+
+CSS = b'body { color: #333; }\n' * 200
+
+
+class PrecompressedStaticMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        os.makedirs(os.path.join(self.root, 'css'))
+        path = os.path.join(self.root, 'css', 'app.css')
+        with open(path, 'wb') as fp:
+            fp.write(CSS)
+        with open(path + '.gz', 'wb') as fp:
+            fp.write(gzip.compress(CSS))
+        settings_override = override_settings(STATIC_ROOT=self.root, STATIC_URL='/static/')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.middleware = PrecompressedStaticMiddleware(lambda request: HttpResponse('fallback'))
+        self.factory = RequestFactory()
+
+    def _get(self, **headers):
+        response = self.middleware(self.factory.get('/static/css/app.css', **headers))
+        self.addCleanup(response.close)
+        return response
+
+    def test_serves_precompressed_without_content_disposition(self):
+        response = self._get(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertNotIn('Content-Disposition', response)
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), CSS)
+
+    def test_identity(self):
+        response = self._get(HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('Content-Disposition', response)
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+
+    def test_if_none_match(self):
+        etag = self._get()['ETag']
+        for header in (etag, f'"other", {etag}', f'W/{etag}', '*'):
+            with self.subTest(if_none_match=header):
+                response = self._get(HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self._get(HTTP_IF_NONE_MATCH='"other", W/"another"').status_code, 200)
+
+    def test_unknown_file_falls_through(self):
+        response = self.middleware(self.factory.get('/static/missing.js'))
+        self.assertEqual(response.content, b'fallback')
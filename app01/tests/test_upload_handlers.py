@@ -0,0 +1,104 @@
+"""
+图片上传流式校验（app01/utils/upload_handlers.py）：python manage.py test app01.tests.test_upload_handlers
+
+直接用 MultiPartParser 解析构造的请求体，记录实际读取的字节数，确认超限/非图片时中途停止读取。
+"""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from django.http.multipartparser import MultiPartParser
+from django.test import SimpleTestCase
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import override_settings
+
+from app01.utils.upload_handlers import MULTIPART_OVERHEAD, ImageUploadHandler
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 4
+MAX_SIZE = 256 * 1024
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+
+class ImageUploadHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        settings_override = override_settings(UPLOAD_TEMP_DIR=self.temp_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def _parse(self, content, field='file', content_length=None):
+        file = io.BytesIO(content)
+        file.name = 'upload.png'
+        body = encode_multipart(BOUNDARY, {'csrfmiddlewaretoken': 'x', field: file})
+        stream = CountingStream(body)
+        handler = ImageUploadHandler(None, 'file', MAX_SIZE)
+        meta = {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': content_length or len(body)}
+        post, files = MultiPartParser(meta, stream, [handler], 'utf-8').parse()
+        return handler, post, files, stream, len(body)
+
+    def _leftovers(self):
+        return os.listdir(self.temp_dir)
+
+    def test_valid_image(self):
+        content = PNG + os.urandom(100 * 1024)
+        handler, post, files, _, _ = self._parse(content)
+        self.assertEqual(handler.error, '')
+        uploaded = files['file']
+        self.assertEqual(uploaded.image_ext, '.png')
+        self.assertEqual(uploaded.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(uploaded.size, len(content))
+        # 已落盘在上传临时目录，file_store 可直接 rename
+        self.assertEqual(os.path.dirname(uploaded.temporary_file_path()), self.temp_dir)
+        self.assertEqual(post['csrfmiddlewaretoken'], 'x')
+        uploaded.close()
+        self.assertEqual(self._leftovers(), [])
+
+    def test_oversize_stops_mid_stream(self):
+        handler, _, files, stream, total = self._parse(PNG + b'\x00' * (4 * MAX_SIZE))
+        self.assertIn('文件大小不能超过', handler.error)
+        self.assertNotIn('file', files)
+        self.assertLess(stream.consumed, MAX_SIZE + MULTIPART_OVERHEAD + ImageUploadHandler.chunk_size)
+        self.assertLess(stream.consumed, total // 2)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_declared_length_over_limit_stops_before_file_data(self):
+        content = PNG + b'\x00' * 1024
+        handler, post, files, stream, _ = self._parse(content, content_length=MAX_SIZE + MULTIPART_OVERHEAD + 1)
+        self.assertIn('文件大小不能超过', handler.error)
+        self.assertNotIn('file', files)
+        # 文件前的普通字段照常解析
+        self.assertEqual(post['csrfmiddlewaretoken'], 'x')
+        self.assertEqual(self._leftovers(), [])
+
+    def test_bad_magic_bytes_stop_after_first_chunk(self):
+        content = b'<?php echo 1; ?>' + b'\x00' * (MAX_SIZE - 1024)
+        handler, _, files, stream, total = self._parse(content)
+        self.assertIn('不是 jpg/png/gif/webp', handler.error)
+        self.assertNotIn('file', files)
+        self.assertLessEqual(stream.consumed, 2 * ImageUploadHandler.chunk_size)
+        self.assertLess(stream.consumed, total)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_file_shorter_than_header(self):
+        handler, _, files, _, _ = self._parse(b'GIF8')
+        self.assertIn('不是 jpg/png/gif/webp', handler.error)
+        self.assertNotIn('file', files)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_unexpected_field(self):
+        handler, _, files, _, _ = self._parse(PNG, field='other')
+        self.assertEqual(handler.error, '不支持的上传字段')
+        self.assertEqual(files, {})
@@ -0,0 +1,39 @@
+"""
+就绪探针（app01/utils/warmup.py）：python manage.py test app01.tests.test_warmup
+"""
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import SimpleTestCase
+
+from app01.utils import warmup
+
+
+def _db_down():
+    raise OperationalError('Connection refused')
+
+
+class ReadyViewTests(SimpleTestCase):
+    def _state(self, **errors):
+        return mock.patch.dict(warmup._state, ready=True, steps={'total': 1.0}, errors=dict(errors))
+
+    def test_ready(self):
+        with self._state():
+            self.assertEqual(self.client.get('/readyz').status_code, 200)
+
+    def test_optional_step_failure_is_still_ready(self):
+        with self._state(redis='ConnectionError: refused'):
+            self.assertEqual(self.client.get('/readyz').status_code, 200)
+
+    def test_db_failure_is_not_ready_until_it_recovers(self):
+        steps = tuple((name, _db_down if name == 'db' else func) for name, func in warmup.STEPS)
+        with self._state(db='OperationalError: Connection refused'):
+            with mock.patch.object(warmup, 'STEPS', steps):
+                response = self.client.get('/readyz')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.json()['failed'], ['db'])
+
+            with mock.patch.object(warmup, 'STEPS', tuple((name, lambda: None) for name, _ in warmup.STEPS)):
+                response = self.client.get('/readyz')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('db', response.json()['errors'])
@@ -1,24 +1,43 @@
-﻿from django.contrib import admin
-from django.urls import path
-from app01 import views
-from app01.utils import send_code
+﻿import re
+
+from django.contrib import admin
+from django.urls import path, re_path
+from app01 import async_views, views
+from app01.utils import feeds, media_server, metrics, send_code, warmup
 from django.conf import settings
-from django.conf.urls.static import static
+
+# ASGI 部署时高频只读页面切换为异步视图
+if getattr(settings, 'ASYNC_VIEWS', False):
+    index_view = async_views.AsyncIndexView
+    article_detail_view = async_views.AsyncArticleDetailView
+    dashboard_view = async_views.AsyncDataDashboardView
+else:
+    index_view = views.IndexView
+    article_detail_view = views.ArticleDetailView
+    dashboard_view = views.DataDashboardView
 
 urlpatterns = [
-    path('', views.IndexView.as_view(), name='index'),
-    path('article/<int:article_id>/', views.ArticleDetailView.as_view(), name='article_detail'),
+    path('', index_view.as_view(), name='index'),
+    path('article/<int:article_id>/', article_detail_view.as_view(), name='article_detail'),
     path('article/<int:article_id>/edit/', views.EditArticleView.as_view(), name='edit_article'),
     path('article/<int:article_id>/delete/', views.DeleteArticleView.as_view(), name='delete_article'),
     path('article/pub/', views.PubArticleView.as_view(), name='pub_article'),
+    path('article/autosave/', views.autosave_draft, name='autosave_draft'),
+    path('article/bulk/', views.bulk_article_action, name='bulk_article_action'),
     path('article/upload_image/', views.upload_article_image, name='upload_article_image'),
     path('tag/create/', views.create_tag, name='create_tag'),
     path('register/', views.RegisterView.as_view(), name='register'),
     path('login/', views.LoginView.as_view(), name='login'),
     path('profile/', views.PersonalCenterView.as_view(), name='profile'),
-    path('dashboard/', views.DataDashboardView.as_view(), name='dashboard'),
+    path('dashboard/', dashboard_view.as_view(), name='dashboard'),
     path('logout/', views.logout, name='logout'),
+    path('metrics', metrics.metrics_view, name='metrics'),
+    path('readyz', warmup.ready_view, name='readyz'),
+    path('suggest/', views.suggest, name='suggest'),
+    path('live_state/', views.live_state, name='live_state'),
     path('send_email_captcha/', send_code.send_email_captcha, name='send_email_captcha'),
+    # 订阅和站点地图：生产环境由 Nginx 直接发送 FEEDS_ROOT 下的文件，这里是兜底
+    re_path(r'^(?P<path>rss\.xml|atom\.xml|sitemap\.xml|sitemaps/[\w-]+\.xml)$', feeds.serve_feed, name='feeds'),
+    # media 文件：支持 X-Accel-Redirect/X-Sendfile 转交、Range 与缓存头（见 MEDIA_ACCEL）
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), media_server.serve_media, name='media'),
 ]
-
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,146 @@
+"""
+后台大表列表页（评论、用户可到百万行）：
+
+- 计数：默认的 ChangeList 每页执行两次精确 COUNT(*)（筛选后 + 全表）。EstimatedCountPaginator 改为：
+  - 无筛选时读 MySQL 表统计（information_schema.TABLES.TABLE_ROWS，InnoDB 为估算值）
+  - 有筛选时只数到 ADMIN_COUNT_THRESHOLD + 1 行（COUNT 套 LIMIT 子查询）
+  - 超过阈值时标记为估算值，页面显示“约 N”或“超过 N”
+  配合 ModelAdmin.show_full_result_count = False，去掉全表计数
+- 翻页：计数为估算值且按主键倒序（默认排序）时，CursorChangeList 改用游标翻页，
+  ?after=<id> 取 id 更小的一页，?before=<id> 取 id 更大的一页，每页一条走主键索引的 LIMIT 查询，
+  不再用越翻越慢的 OFFSET；其它排序仍按页码翻页
+- list_defer：列表页不需要的大字段（如正文），只在列表查询中延迟加载
+- 去掉默认的“删除所选”：它加载全部选中对象及级联对象生成确认页、逐条写日志，改由各模型提供批量 UPDATE/DELETE 的动作
+"""
+from django.conf import settings
+from django.contrib.admin import ModelAdmin
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+
+
+def _threshold():
+    return int(getattr(settings, 'ADMIN_COUNT_THRESHOLD', 10000))
+
+
+def table_row_estimate(model, using):
+    """表行数的统计估算值；非 MySQL 或取不到时返回 None。"""
+    connection = connections[using]
+    if connection.vendor != 'mysql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+class EstimatedCountPaginator(Paginator):
+    # 计数来源：None 为精确值；'table' 为表统计估算；'bound' 为下限（实际超过阈值）
+    approximate = None
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        threshold = _threshold()
+        if not queryset.query.where:
+            estimate = table_row_estimate(queryset.model, queryset.db)
+            if estimate is not None and estimate > threshold:
+                self.approximate = 'table'
+                return estimate
+        bounded = queryset.order_by()[:threshold + 1].count()
+        if bounded > threshold:
+            self.approximate = 'bound'
+            return threshold
+        return bounded
+
+
+def _cursor_value(request, name):
+    try:
+        return int(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class CursorChangeList(ChangeList):
+    def __init__(self, request, *args, **kwargs):
+        self.cursor_after = _cursor_value(request, AFTER_VAR)
+        self.cursor_before = _cursor_value(request, BEFORE_VAR)
+        self.cursor_mode = False
+        self.first_page_url = self.prev_page_url = self.next_page_url = None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        lookup_params.pop(BEFORE_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # 筛选、排序、搜索等链接都回到第一页
+        return super().get_query_string(new_params, [*(remove or ()), AFTER_VAR, BEFORE_VAR])
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        list_defer = getattr(self.model_admin, 'list_defer', ())
+        return queryset.defer(*list_defer) if list_defer else queryset
+
+    def _keyset_ordering(self):
+        # ModelAdmin.get_queryset 和 ChangeList 都会加上默认排序，可能重复出现
+        order_by = set(self.queryset.query.order_by)
+        return (
+            ORDER_VAR not in self.params
+            and bool(order_by) and order_by <= {'-pk', f'-{self.lookup_opts.pk.name}'}
+            and not self.list_editable
+        )
+
+    def get_results(self, request):
+        # super() 只计数，object_list 是惰性的切片查询，游标模式下不会执行
+        super().get_results(request)
+        if self.paginator.approximate is None or self.show_all or not self._keyset_ordering():
+            return
+        self.cursor_mode = True
+        pk_name = self.lookup_opts.pk.name
+        size = self.list_per_page
+        if self.cursor_before is not None:
+            rows = list(self.queryset.filter(**{f'{pk_name}__gt': self.cursor_before}).order_by(pk_name)[:size + 1])
+            has_prev, has_next = len(rows) > size, True
+            rows = rows[:size][::-1]
+        else:
+            queryset = self.queryset
+            if self.cursor_after is not None:
+                queryset = queryset.filter(**{f'{pk_name}__lt': self.cursor_after})
+            rows = list(queryset[:size + 1])
+            has_prev, has_next = self.cursor_after is not None, len(rows) > size
+            rows = rows[:size]
+
+        self.result_list = rows
+        if has_prev:
+            self.first_page_url = self.get_query_string(remove=[PAGE_VAR])
+            if rows:
+                self.prev_page_url = self.get_query_string({BEFORE_VAR: rows[0].pk}, [PAGE_VAR])
+        if has_next and rows:
+            self.next_page_url = self.get_query_string({AFTER_VAR: rows[-1].pk}, [PAGE_VAR])
+
+
+class ScalableModelAdmin(ModelAdmin):
+    """大表用的 ModelAdmin：估算计数、游标翻页、不做全表计数。"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    # 列表查询中延迟加载的字段
+    list_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        return CursorChangeList
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
@@ -0,0 +1,215 @@
+"""
+简单的压测工具，不依赖第三方库：
+- run_load：asyncio + 原始 HTTP/1.1 keep-alive 连接，压测本机启动的服务器
+- run_client_load：多线程 + Django 测试客户端，进程内直接调用视图
+
+每个请求的 SQL 条数取自 MetricsMiddleware 写入的 Server-Timing 响应头。
+只用于对比同一台机器上不同部署方式 / 不同提交之间的相对差异，
+绝对数值请以 wrk、ab 等专业工具为准。
+"""
+import asyncio
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.db import connections
+from django.test import Client
+
+_QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+# 模拟浏览器：空 UA 或脚本 UA 会被 bot_detect 识别为爬虫，跳过计数，测不到正常访问的开销
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+
+
+async def _read_response(reader):
+    # 读取一个完整响应（只支持 Content-Length 和 chunked）
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers, headers.get('connection', '').lower() != 'close'
+
+
+def _query_count(server_timing):
+    match = _QUERIES_RE.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+class _Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.errors = []
+        self.queries = []
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def add(self, latency, status, server_timing):
+        queries = _query_count(server_timing)
+        with self._lock:
+            self.latencies.append(latency)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if status >= 400:
+                self.errors.append(status)
+            if queries is not None:
+                self.queries.append(queries)
+
+    def error(self, reason):
+        with self._lock:
+            self.errors.append(reason)
+
+    def summary(self, elapsed):
+        ordered = sorted(self.latencies)
+        return {
+            'requests': len(ordered),
+            'errors': len(self.errors),
+            'statuses': {str(code): count for code, count in sorted(self.statuses.items())},
+            'rps': len(ordered) / elapsed if elapsed else 0.0,
+            'p50': _percentile(ordered, 50) * 1000,
+            'p95': _percentile(ordered, 95) * 1000,
+            'p99': _percentile(ordered, 99) * 1000,
+            'mean': (statistics.fmean(ordered) * 1000) if ordered else 0.0,
+            'queries': statistics.fmean(self.queries) if self.queries else None,
+        }
+
+
+async def _worker(host, port, paths, deadline, recorder, extra_headers):
+    reader = writer = None
+    index = 0
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            request = f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: keep-alive\r\n{extra_headers}\r\n'
+            start = time.perf_counter()
+            writer.write(request.encode('latin-1'))
+            status, headers, keep_alive = await _read_response(reader)
+            recorder.add(time.perf_counter() - start, status, headers.get('server-timing'))
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            recorder.error(type(exc).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+
+def run_load(base_url, paths, concurrency=20, duration=10.0, cookies=None):
+    """
+    对 base_url 下的 paths 轮流发 GET，返回
+    {requests, errors, statuses, rps, p50, p95, p99, mean（毫秒）, queries（平均 SQL 条数）}。
+    """
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    recorder = _Recorder()
+    extra_headers = f'User-Agent: {USER_AGENT}\r\n'
+    if cookies:
+        extra_headers += 'Cookie: ' + '; '.join(f'{key}={value}' for key, value in cookies.items()) + '\r\n'
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            _worker(host, port, paths, deadline, recorder, extra_headers) for _ in range(concurrency)
+        ))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return recorder.summary(time.perf_counter() - started)
+
+
+def run_client_load(paths, concurrency=4, duration=5.0, user=None):
+    """用 Django 测试客户端在进程内压测（每个线程一个客户端、一个数据库连接），返回值同 run_load。"""
+    recorder = _Recorder()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        client = Client(raise_request_exception=False, HTTP_USER_AGENT=USER_AGENT)
+        if user is not None:
+            client.force_login(user)
+        index = 0
+        try:
+            while time.perf_counter() < deadline:
+                path = paths[index % len(paths)]
+                index += 1
+                start = time.perf_counter()
+                response = client.get(path)
+                recorder.add(time.perf_counter() - start, response.status_code, response.get('Server-Timing'))
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.summary(time.perf_counter() - started)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_server(args, port, env=None):
+    """启动被测服务器子进程，端口可连接后返回 Popen；启动失败抛 RuntimeError。"""
+    # runserver 每个请求都写一行日志，输出到临时文件而不是管道，避免管道写满阻塞服务器
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen([sys.executable, *args], env=env, stdout=log, stderr=subprocess.STDOUT)
+    if not wait_for_port(port):
+        process.kill()
+        process.wait()
+        log.seek(0)
+        raise RuntimeError(log.read().decode('utf-8', 'replace')[-2000:] or '服务器启动超时')
+    process.log = log
+    return process
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    process.log.close()
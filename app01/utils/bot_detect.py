@@ -0,0 +1,127 @@
+"""
+爬虫/监控请求识别：识别出的请求不计阅读量、访问量，也不写去重 key。
+
+- User-Agent：预编译的一条正则（每类一个命名分组），按 UA 字符串 LRU 缓存分类结果；
+  空 UA 也按爬虫处理（健康检查、脚本请求大多不带 UA）
+- IP：BOT_IP_RANGES 中的网段（如监控服务的出口地址）按前缀长度分组，
+  每个前缀长度一次集合查找，网段再多也只查几次
+- 结果缓存在 request 上，一个请求内多次判断只分类一次
+- 识别出的请求按类别计入 blog_bot_requests_total（/metrics），不做任何 I/O
+
+BOT_USER_AGENT_PATTERNS 可追加正则（归为 custom 类）；BOT_DETECTION_ENABLED=False 关闭识别。
+"""
+import ipaddress
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from app01.utils.metrics import BOT_REQUESTS
+
+UA_PATTERNS = (
+    ('google', r'googlebot|google-inspectiontool|adsbot-google|mediapartners-google|apis-google'),
+    ('bing', r'bingbot|msnbot|bingpreview'),
+    ('baidu', r'baiduspider'),
+    # 只匹配搜狗爬虫；搜狗浏览器（SogouMobileBrowser、SogouMSE、MetaSr）是真实访客
+    ('sogou', r'sogou(?: (?:web|inst|pic|news|video|orion))?[ -]spider|sogou-test-spider'),
+    ('so360', r'360spider|haosouspider'),
+    ('bytedance', r'bytespider'),
+    ('yandex', r'yandex(bot|images|mobilebot)'),
+    ('social', r'facebookexternalhit|twitterbot|slackbot|telegrambot|discordbot|linkedinbot|whatsapp'),
+    ('seo', r'ahrefsbot|semrushbot|mj12bot|dotbot|petalbot|dataforseobot'),
+    ('monitor', r'uptimerobot|pingdom|statuscake|site24x7|newrelicpinger|datadog|kube-probe|elb-healthchecker'
+                r'|blackbox|prometheus|zabbix|nagios|check_http'),
+    ('http_client', r'curl/|wget/|python-requests|python-urllib|aiohttp|httpx|go-http-client|okhttp|java/'
+                    r'|libwww-perl|apache-httpclient|node-fetch|axios/|scrapy'),
+    ('headless', r'headlesschrome|phantomjs|puppeteer|playwright'),
+    # bot 只认 XxxBot/1.0、XxxBot; 这类爬虫写法，避免误伤机型名（如 CUBOT X30）；+http:// 是爬虫 UA 里的说明链接
+    ('generic', r'bot[/;]|\+https?://|crawl|spider|slurp|archiver|scanner'),
+)
+# 超长 UA 只看前面这一段，也避免缓存巨大的 key
+UA_MAX_LENGTH = 512
+
+
+class BotClassifier:
+    def __init__(self, extra_patterns=(), ip_ranges=(), cache_size=4096):
+        patterns = list(UA_PATTERNS)
+        if extra_patterns:
+            patterns.insert(0, ('custom', '|'.join(f'(?:{pattern})' for pattern in extra_patterns)))
+        self._ua_re = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in patterns), re.IGNORECASE)
+        self.classify_user_agent = lru_cache(maxsize=cache_size)(self._classify_user_agent)
+        # IP 版本 -> {前缀长度: 网段号集合}
+        self._networks = {4: {}, 6: {}}
+        for cidr in ip_ranges:
+            network = ipaddress.ip_network(cidr, strict=False)
+            shift = network.max_prefixlen - network.prefixlen
+            self._networks[network.version].setdefault(network.prefixlen, set()).add(
+                int(network.network_address) >> shift
+            )
+
+    def _classify_user_agent(self, user_agent):
+        if not user_agent.strip():
+            return 'empty'
+        match = self._ua_re.search(user_agent)
+        return match.lastgroup if match else None
+
+    def classify_ip(self, ip):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        value = int(address)
+        for prefixlen, networks in self._networks[address.version].items():
+            if value >> (address.max_prefixlen - prefixlen) in networks:
+                return 'ip'
+        return None
+
+    def classify(self, request):
+        """返回爬虫类别，正常访问返回 None。"""
+        family = self.classify_user_agent(request.META.get('HTTP_USER_AGENT', '')[:UA_MAX_LENGTH])
+        if family is None and (self._networks[4] or self._networks[6]):
+            family = self.classify_ip(_get_request_ip(request))
+        return family
+
+
+def _get_request_ip(request):
+    xff = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if xff:
+        return xff.split(',')[0].strip()
+    return (request.META.get('REMOTE_ADDR') or '').strip()
+
+
+@lru_cache(maxsize=None)
+def get_classifier():
+    return BotClassifier(
+        extra_patterns=tuple(getattr(settings, 'BOT_USER_AGENT_PATTERNS', ())),
+        ip_ranges=tuple(getattr(settings, 'BOT_IP_RANGES', ())),
+        cache_size=int(getattr(settings, 'BOT_UA_CACHE_SIZE', 4096)),
+    )
+
+
+@receiver(setting_changed)
+def _reset_classifier(setting, **kwargs):
+    if setting in ('BOT_USER_AGENT_PATTERNS', 'BOT_IP_RANGES', 'BOT_UA_CACHE_SIZE'):
+        get_classifier.cache_clear()
+
+
+def bot_family(request):
+    """请求的爬虫类别（结果缓存在 request 上），正常访问或关闭识别时返回 None。"""
+    if not getattr(settings, 'BOT_DETECTION_ENABLED', True):
+        return None
+    try:
+        return request._bot_family
+    except AttributeError:
+        family = request._bot_family = get_classifier().classify(request)
+        # 每个请求只在首次识别时计入 blog_bot_requests_total（同一请求可能多次判断，如 live_state 同时查阅读和访问）
+        if family is not None:
+            BOT_REQUESTS.inc(family)
+        return family
+
+
+def skip_counting(request):
+    """爬虫请求返回 True，调用方不再计数、不写去重 key。"""
+    return bot_family(request) is not None
@@ -0,0 +1,104 @@
+"""
+文章批量操作：发布、撤回为草稿、删除、加/减/设置标签。
+
+- 一个事务内完成：状态类操作一条 UPDATE（只改状态确实变化的行），
+  标签类操作对关联表一次 bulk_create（ignore_conflicts）/ 一次 DELETE；涉及的文章 update_time 一并更新
+  （静态导出、站点地图按 update_time 判断变化）
+- QuerySet.update() 和关联表的批量写入不触发 post_save / m2m_changed 信号，
+  提交后手动执行单篇修改时由信号触发的更新：订阅/站点地图、相关文章、搜索提示索引、草稿缓冲；
+  这些更新放到响应发出之后执行（见 deferred）
+- apply() 只处理 user 自己的未删除文章；后台动作用 apply_to() 处理选中的文章
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from app01.models import Article, Tag
+from app01.utils import drafts, feeds, related, search_suggest
+from app01.utils.deferred import defer
+
+ArticleTag = Article.tags.through
+
+STATUS_OPERATIONS = {
+    # 操作 -> (筛选条件, 更新字段)
+    'publish': ({'status': 0}, {'status': 1}),
+    'unpublish': ({'status': 1}, {'status': 0}),
+    'delete': ({}, {'is_delete': True}),
+}
+TAG_OPERATIONS = ('add_tags', 'remove_tags', 'set_tags')
+OPERATIONS = tuple(STATUS_OPERATIONS) + TAG_OPERATIONS
+
+
+def apply(user, operation, article_ids, tag_ids=()):
+    """执行批量操作，返回 (匹配的文章数, 实际变化的文章 id 列表)。"""
+    return apply_to(Article.objects.filter(id__in=set(article_ids), user=user), operation, tag_ids)
+
+
+def apply_to(queryset, operation, tag_ids=()):
+    """
+    对 queryset 中未删除的文章执行批量操作，返回值同 apply()。
+    queryset 需是不含 distinct/切片的简单筛选（后台动作传入 Article.objects.filter(pk__in=...)）。
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f'不支持的操作：{operation}')
+    if operation in TAG_OPERATIONS and operation != 'set_tags' and not tag_ids:
+        raise ValueError('请选择标签')
+
+    with transaction.atomic():
+        queryset = queryset.filter(is_delete=False)
+        # 锁定涉及的文章行，避免与单篇编辑交错
+        matched = list(queryset.select_for_update().values_list('id', flat=True))
+        if not matched:
+            return 0, []
+        now = timezone.now()
+
+        if operation in STATUS_OPERATIONS:
+            condition, values = STATUS_OPERATIONS[operation]
+            changed = list(queryset.filter(**condition).values_list('id', flat=True))
+            Article.objects.filter(id__in=changed).update(update_time=now, **values)
+        else:
+            valid_tag_ids = set(Tag.objects.filter(id__in=tag_ids).values_list('id', flat=True))
+            changed = _apply_tags(operation, matched, valid_tag_ids)
+            Article.objects.filter(id__in=changed).update(update_time=now)
+
+        if changed:
+            transaction.on_commit(lambda: defer(_after_commit, operation, changed))
+    return len(matched), changed
+
+
+def _apply_tags(operation, article_ids, tag_ids):
+    """修改关联表，返回标签确实有变化的文章 id。"""
+    existing = set(
+        ArticleTag.objects.filter(article_id__in=article_ids).values_list('article_id', 'tag_id')
+    )
+    wanted = existing
+    if operation == 'add_tags':
+        wanted = existing | {(article_id, tag_id) for article_id in article_ids for tag_id in tag_ids}
+    elif operation == 'remove_tags':
+        wanted = {(article_id, tag_id) for article_id, tag_id in existing if tag_id not in tag_ids}
+    elif operation == 'set_tags':
+        wanted = {(article_id, tag_id) for article_id in article_ids for tag_id in tag_ids}
+
+    removed = existing - wanted
+    added = wanted - existing
+    if removed:
+        # 被移除的标签在这批文章上都要移除，一条 DELETE
+        ArticleTag.objects.filter(
+            article_id__in=article_ids, tag_id__in={tag_id for _, tag_id in removed},
+        ).delete()
+    if added:
+        ArticleTag.objects.bulk_create(
+            [ArticleTag(article_id=article_id, tag_id=tag_id) for article_id, tag_id in sorted(added)],
+            ignore_conflicts=True,
+        )
+    return sorted({article_id for article_id, _ in removed | added})
+
+
+def _after_commit(operation, article_ids):
+    feeds.refresh_articles(article_ids)
+    related.refresh_articles(article_ids)
+    if operation in STATUS_OPERATIONS:
+        # 标题列表随发布状态变化；标签关联不在索引中
+        search_suggest.publish_change()
+    if operation == 'delete':
+        for article_id in article_ids:
+            drafts.discard(article_id)
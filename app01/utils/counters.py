@@ -0,0 +1,68 @@
+"""
+冗余计数校正：Article.comment_count 只在发表评论时 +1，评论被级联删除、后台删除时不会减少。
+
+按主键分块扫描文章，每块一条分组查询统计实际评论数，只回写有差异的行。
+每块在单独的短事务里完成：读取在 InnoDB 下是一致性快照读，不加锁；
+回写用 comment_count = comment_count + 差值，快照之后并发发表的评论（+1）不会被覆盖。
+
+refresh_comment_counts()：批量删除评论后，对涉及的文章用一条带子查询的 UPDATE 重算评论数。
+"""
+import time
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from app01.models import Article, Comment
+
+
+def reconcile_comment_counts(chunk_size=500, dry_run=False, pause=0.0, on_chunk=None):
+    """
+    返回 (扫描文章数, 修正文章数)。
+    pause：每块之间休眠的秒数，给线上写入让路；on_chunk(last_id, changed_rows) 用于输出进度。
+    """
+    scanned = fixed = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Article.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'comment_count')[:chunk_size]
+            )
+            if not rows:
+                break
+            first_id, last_id = rows[0][0], rows[-1][0]
+            actual = dict(
+                Comment.objects.filter(article_id__gte=first_id, article_id__lte=last_id)
+                .values_list('article_id')
+                .annotate(total=Count('id'))
+                .order_by()
+            )
+            changed = []
+            for article_id, stored in rows:
+                delta = actual.get(article_id, 0) - stored
+                if delta:
+                    changed.append((article_id, stored, stored + delta))
+            if changed and not dry_run:
+                Article.objects.bulk_update(
+                    [Article(id=article_id, comment_count=F('comment_count') + (real - stored))
+                     for article_id, stored, real in changed],
+                    ['comment_count'],
+                )
+        scanned += len(rows)
+        fixed += len(changed)
+        if on_chunk is not None:
+            on_chunk(last_id, changed)
+        if len(rows) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return scanned, fixed
+
+
+def refresh_comment_counts(article_ids):
+    """按实际评论数重写这些文章的 comment_count，返回更新的行数。"""
+    actual = (
+        Comment.objects.filter(article_id=OuterRef('pk'))
+        .order_by().values('article_id').annotate(total=Count('id')).values('total')
+    )
+    return Article.objects.filter(id__in=article_ids).update(comment_count=Coalesce(Subquery(actual), 0))
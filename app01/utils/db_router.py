@@ -0,0 +1,226 @@
+"""
+读写分离：读请求走从库，写入和“刚写过”的客户端走主库。
+
+- ReplicaRouter：写入一律 default；读取在请求内按下面的规则选库，请求之外（管理命令、后台线程）一律 default
+- ReplicaPinMiddleware：
+  - POST 等非安全方法整个请求走主库（表单唯一性校验、先查后改都要读到最新数据）
+  - 请求中一旦在主库执行过写 SQL，本请求后续的读都回到主库（如计数 +1 后 refresh_from_db）
+  - 非安全方法产生了写入时下发 db_pin Cookie，REPLICA_PIN_SECONDS 内该客户端的读都走主库（读到自己刚写的数据）
+- 从库健康检查：每 REPLICA_HEALTH_CHECK_INTERVAL 秒最多检查一次（SELECT 1，MySQL 额外检查复制延迟），
+  查询出错或检查失败的从库暂时摘除，全部不可用时回退主库
+
+settings.DATABASE_REPLICAS 为空时路由器不做任何事，全部走 default。
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError, InterfaceError, OperationalError, connections
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+PIN_COOKIE_NAME = 'db_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# 当前请求的路由状态；不在请求内时为 None（全部走主库）
+_state = ContextVar('db_route_state', default=None)
+
+
+class _RouteState:
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+class _ReplicaHealth:
+    """从库健康状态：别名 -> 摘除截止时间；检查结果按间隔缓存，检查本身不阻塞其他线程。"""
+
+    def __init__(self):
+        self._down_until = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self._down_until.clear()
+        self._checked_at.clear()
+
+    def mark_down(self, alias, reason):
+        interval = getattr(settings, 'REPLICA_HEALTH_CHECK_INTERVAL', 5)
+        if self._down_until.get(alias, 0) <= time.monotonic():
+            logger.warning('从库 %s 暂时摘除 %ss：%s', alias, interval, reason)
+        self._down_until[alias] = time.monotonic() + interval
+
+    def is_up(self, alias):
+        now = time.monotonic()
+        if self._down_until.get(alias, 0) > now:
+            return False
+        interval = getattr(settings, 'REPLICA_HEALTH_CHECK_INTERVAL', 5)
+        if now - self._checked_at.get(alias, 0) >= interval and self._lock.acquire(blocking=False):
+            try:
+                self._checked_at[alias] = now
+                self._check(alias)
+            finally:
+                self._lock.release()
+        return self._down_until.get(alias, 0) <= time.monotonic()
+
+    def _check(self, alias):
+        try:
+            connection = connections[alias]
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                lag = self._replication_lag(connection, cursor)
+        except DatabaseError as exc:
+            connections[alias].close()
+            self.mark_down(alias, exc)
+            return
+        max_lag = getattr(settings, 'REPLICA_MAX_LAG_SECONDS', None)
+        if max_lag is not None and lag is not None and lag > max_lag:
+            self.mark_down(alias, f'复制延迟 {lag}s')
+
+    @staticmethod
+    def _replication_lag(connection, cursor):
+        if connection.vendor != 'mysql' or getattr(settings, 'REPLICA_MAX_LAG_SECONDS', None) is None:
+            return None
+        try:
+            cursor.execute('SHOW REPLICA STATUS')
+        except DatabaseError:
+            # MySQL 8.0.22 之前的语法
+            cursor.execute('SHOW SLAVE STATUS')
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [col[0] for col in cursor.description]
+        status = dict(zip(columns, row))
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        # NULL 表示复制线程没有在运行
+        return float('inf') if lag is None else lag
+
+
+health = _ReplicaHealth()
+
+
+def _track_errors(execute, sql, params, many, context):
+    try:
+        return execute(sql, params, many, context)
+    except DatabaseError as exc:
+        # 连接类错误才摘除从库；SQL 本身的错误照常抛出。
+        # 包装函数拿到的已是 Django 包装后的异常（django.db.OperationalError），不是驱动的异常类
+        if isinstance(exc, (OperationalError, InterfaceError)):
+            health.mark_down(context['connection'].alias, exc)
+        raise
+
+
+def _track_writes(execute, sql, params, many, context):
+    state = _state.get()
+    # 事务控制语句（SQLite 的 atomic 会执行 BEGIN）不算写入
+    if state is not None and not state.wrote and not sql.lstrip()[:6].upper().startswith(
+        ('SELECT', 'SAVEPO', 'RELEAS', 'BEGIN', 'ROLLBA')
+    ):
+        state.wrote = True
+    return execute(sql, params, many, context)
+
+
+@receiver(setting_changed)
+def _reset_health(setting, **kwargs):
+    if setting in ('DATABASE_REPLICAS', 'REPLICA_HEALTH_CHECK_INTERVAL', 'REPLICA_MAX_LAG_SECONDS'):
+        health.reset()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.pinned or state.wrote:
+            return PRIMARY
+        # 主库事务内（如 select_for_update）必须读主库
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        candidates = [alias for alias in replica_aliases() if health.is_up(alias)]
+        if not candidates:
+            return PRIMARY
+        return random.choice(candidates)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 从库是主库的副本，跨库关联实际上是同一份数据
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def _route_wrappers():
+    stack = ExitStack()
+    # 主库记录是否发生写入，从库记录连接错误
+    stack.enter_context(connections[PRIMARY].execute_wrapper(_track_writes))
+    for alias in replica_aliases():
+        stack.enter_context(connections[alias].execute_wrapper(_track_errors))
+    return stack
+
+
+class ReplicaPinMiddleware:
+    """同步/异步两用：ASGI 下异步视图不必切到线程里执行。"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = _RouteState(pinned=request.method not in SAFE_METHODS or self._has_pin(request))
+        token = _state.set(state)
+        try:
+            with _route_wrappers():
+                response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self._pin(request, response, state)
+
+    async def __acall__(self, request):
+        state = _RouteState(pinned=request.method not in SAFE_METHODS or self._has_pin(request))
+        token = _state.set(state)
+        try:
+            # 与 MetricsMiddleware 相同：包装装在本请求 ORM 所在线程的连接上
+            wrappers = await sync_to_async(_route_wrappers)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(wrappers.close)()
+        finally:
+            _state.reset(token)
+        return self._pin(request, response, state)
+
+    @staticmethod
+    def _pin(request, response, state):
+        if state.wrote and request.method not in SAFE_METHODS:
+            seconds = int(getattr(settings, 'REPLICA_PIN_SECONDS', 10))
+            response.set_cookie(
+                PIN_COOKIE_NAME, str(int(time.time()) + seconds), max_age=seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+    @staticmethod
+    def _has_pin(request):
+        try:
+            return int(request.COOKIES.get(PIN_COOKIE_NAME, 0)) > time.time()
+        except ValueError:
+            return False
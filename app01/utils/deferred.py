@@ -0,0 +1,253 @@
+"""
+延后任务：不影响响应内容的副作用（计数 +1、发邮件等）放到响应发出之后执行。
+
+- defer(func, *args, **kwargs)：请求内先记下，request_finished（响应已发给客户端）时交给后台线程池；
+  不在请求内（管理命令、后台线程）时立即执行
+- defer_batched(func, ids)：同一请求内多次调用合并为一次 func(ids 集合)
+- 线程池 DEFERRED_WORKERS 个线程、队列上限 DEFERRED_MAX_PENDING：队列满时在当前 worker 线程里直接执行，
+  拖慢该 worker 接收下一个请求，形成背压，不会无限堆积
+- 任务内的异常只记日志；后台线程在每个任务前后按请求的规则处理数据库连接（close_old_connections）
+- 进程退出时最多等待 DEFERRED_DRAIN_TIMEOUT 秒让队列中的任务执行完
+- /metrics：blog_deferred_tasks_total{status}、blog_deferred_task_seconds{task}
+- DEFERRED_INLINE=True 时在 request_finished 里同步执行（查询预算检查、调试用）
+
+进程内队列在进程被杀时会丢失。必须执行的任务用 defer_durable()：写入 DeferredTask 表
+（随当前事务提交），由 python manage.py run_deferred_tasks 执行，失败按指数退避重试。
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import close_old_connections, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from app01.models import DeferredTask
+from app01.utils.metrics import DEFERRED_DURATION, DEFERRED_TASKS
+
+logger = logging.getLogger(__name__)
+
+# 当前请求记下的任务；不在请求内时为 None
+_pending = ContextVar('deferred_tasks', default=None)
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def _task_name(func):
+    return f'{func.__module__}.{func.__qualname__}'
+
+
+def _run(func, args, kwargs):
+    start = time.perf_counter()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        DEFERRED_TASKS.inc('failed')
+        logger.exception('延后任务执行失败：%s', _task_name(func))
+    else:
+        DEFERRED_TASKS.inc('done')
+    finally:
+        DEFERRED_DURATION.observe(_task_name(func), time.perf_counter() - start)
+
+
+class _Runner:
+    def __init__(self, workers, max_pending):
+        self.pid = os.getpid()
+        self.closed = False
+        self.queue = queue.Queue(maxsize=max_pending)
+        for index in range(workers):
+            threading.Thread(target=self._work, name=f'deferred-{index}', daemon=True).start()
+
+    def _work(self):
+        while True:
+            func, args, kwargs = self.queue.get()
+            # 与请求相同的连接规则：超过 CONN_MAX_AGE 或出错的连接先关闭，任务结束后再检查一次
+            close_old_connections()
+            try:
+                _run(func, args, kwargs)
+            finally:
+                close_old_connections()
+                self.queue.task_done()
+
+    def submit(self, func, args, kwargs):
+        """放入队列；已关闭或队列已满时返回 False。"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait((func, args, kwargs))
+        except queue.Full:
+            return False
+        return True
+
+    def drain(self, timeout):
+        """不再接收新任务，等待队列清空，返回未完成的任务数。"""
+        self.closed = True
+        with self.queue.all_tasks_done:
+            self.queue.all_tasks_done.wait_for(lambda: self.queue.unfinished_tasks == 0, timeout)
+            return self.queue.unfinished_tasks
+
+
+def _get_runner():
+    """每个进程一个线程池（按 pid 判断，兼容 uWSGI 等 fork 出来的 worker）。"""
+    global _runner
+    if _runner is not None and _runner.pid == os.getpid():
+        return _runner
+    with _runner_lock:
+        if _runner is None or _runner.pid != os.getpid():
+            _runner = _Runner(
+                workers=int(getattr(settings, 'DEFERRED_WORKERS', 4)),
+                max_pending=int(getattr(settings, 'DEFERRED_MAX_PENDING', 1000)),
+            )
+    return _runner
+
+
+def start_workers():
+    """提前启动本进程的线程池（worker 预热时调用）。"""
+    _get_runner()
+
+
+def _submit(func, args, kwargs):
+    if getattr(settings, 'DEFERRED_INLINE', False):
+        _run(func, args, kwargs)
+    elif not _get_runner().submit(func, args, kwargs):
+        # 背压：队列满（或进程正在退出）时由当前线程执行
+        DEFERRED_TASKS.inc('inline')
+        _run(func, args, kwargs)
+
+
+def defer(func, *args, **kwargs):
+    """响应发出之后执行 func(*args, **kwargs)；不在请求内时立即执行。"""
+    tasks = _pending.get()
+    if tasks is None:
+        _run(func, args, kwargs)
+    else:
+        tasks.append((func, args, kwargs))
+
+
+class _Batch(set):
+    """defer_batched 合并的参数集合。"""
+
+
+def defer_batched(func, items):
+    """
+    同 defer，但同一请求内对同一 func 的多次调用合并为一次 func(集合)，
+    用于按 id 增量更新（一次发布会先后触发保存和改标签两次信号）。
+    """
+    tasks = _pending.get()
+    if tasks is None:
+        _run(func, (set(items),), {})
+        return
+    for task_func, args, _ in tasks:
+        if task_func is func and args and isinstance(args[0], _Batch):
+            args[0].update(items)
+            return
+    tasks.append((func, (_Batch(items),), {}))
+
+
+class DeferredTaskMiddleware:
+    """为每个请求准备任务列表，request_finished 时提交。同步/异步两用，ASGI 下不切换线程。"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        _pending.set([])
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        _pending.set([])
+        return await self.get_response(request)
+
+
+@receiver(request_finished)
+def _flush(sender, **kwargs):
+    tasks = _pending.get()
+    _pending.set(None)
+    # 上层中间件提前返回响应时（如预压缩静态文件）本中间件没有执行，没有任务列表
+    if not tasks:
+        return
+    for func, args, kwargs in tasks:
+        _submit(func, args, kwargs)
+
+
+def drain(timeout=None):
+    """等待本进程线程池中的任务执行完（最多 timeout 秒），返回未完成的任务数。"""
+    if _runner is None or _runner.pid != os.getpid():
+        return 0
+    return _runner.drain(timeout)
+
+
+@atexit.register
+def _drain_at_exit():
+    remaining = drain(float(getattr(settings, 'DEFERRED_DRAIN_TIMEOUT', 10)))
+    if remaining:
+        logger.warning('进程退出，%s 个延后任务未执行', remaining)
+
+
+def defer_durable(func, *args, **kwargs):
+    """
+    写入 DeferredTask 表，由 run_deferred_tasks 执行（至少执行一次，任务需可重复执行）。
+    func 必须是模块级函数，参数需可 JSON 序列化；在事务中调用时随事务一起提交或回滚。
+    """
+    name = _task_name(func)
+    if '<' in name:
+        raise ValueError(f'持久化任务只支持模块级函数：{name}')
+    return DeferredTask.objects.create(func=name, payload={'args': list(args), 'kwargs': kwargs})
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(30 * 2 ** attempts, 3600))
+
+
+def run_durable_batch(batch_size=20, lease_seconds=300, max_attempts=5):
+    """
+    领取并执行一批到期的持久化任务，返回 (成功数, 失败数)。
+    领取时把 run_after 推后 lease_seconds（租约）：执行中的进程崩溃后，租约到期任务会被重新领取。
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            DeferredTask.objects.select_for_update(skip_locked=True)
+            .filter(run_after__lte=now, attempts__lt=max_attempts)
+            .order_by('id')[:batch_size]
+        )
+        DeferredTask.objects.filter(id__in=[task.id for task in tasks]).update(
+            run_after=now + timedelta(seconds=lease_seconds)
+        )
+
+    done = failed = 0
+    for task in tasks:
+        start = time.perf_counter()
+        try:
+            import_string(task.func)(*task.payload.get('args', ()), **task.payload.get('kwargs', {}))
+        except Exception as exc:
+            failed += 1
+            DEFERRED_TASKS.inc('failed')
+            logger.exception('持久化任务 %s 执行失败（第 %s 次）', task.id, task.attempts + 1)
+            DeferredTask.objects.filter(id=task.id).update(
+                attempts=task.attempts + 1,
+                run_after=timezone.now() + _backoff(task.attempts),
+                last_error=f'{type(exc).__name__}: {exc}'[:2000],
+            )
+        else:
+            done += 1
+            DEFERRED_TASKS.inc('done')
+            DeferredTask.objects.filter(id=task.id).delete()
+        finally:
+            DEFERRED_DURATION.observe(task.func, time.perf_counter() - start)
+    return done, failed
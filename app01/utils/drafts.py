@@ -0,0 +1,260 @@
+"""
+草稿自动保存：编辑器每隔几秒提交一次当前内容，先写缓冲区，只在空闲或显式保存时写 Article 行。
+
+- 缓冲区：Redis hash blog:draft:<文章 id>（title/content/tags/hash/saved_at，DRAFT_BUFFER_TTL 后过期），
+  待落库的草稿记在有序集合 blog:draft:dirty（分数为最后一次自动保存的时间）；
+  Redis 不可用时退回进程内字典，只由本进程落库
+- 内容哈希（标题 + 正文 + 标签）与缓冲区相同时不写缓冲区；落库时与文章行当前内容相同也不写
+- 空闲落库：最后一次自动保存后 DRAFT_IDLE_SECONDS 秒没有新内容的草稿由 flush_idle() 写回文章行，
+  自动保存请求会在响应后顺带执行（每个进程每 DRAFT_IDLE_SECONDS 秒最多一次），
+  也可以用 python manage.py flush_drafts 定时执行；关闭页面时前端带 flush=1 提交，立即落库
+- 只有草稿（status=0）会被自动落库；已发布文章的修改留在缓冲区，编辑页打开时恢复，
+  点"保存修改"后才写入，避免未完成的修改直接上线
+- 发布/保存修改后清除缓冲区
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+from app01.models import Article, Tag
+from app01.utils.deferred import defer
+from app01.utils.redis_client import get_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'blog:draft:'
+DIRTY_KEY = 'blog:draft:dirty'
+
+
+def content_hash(title, content, tag_ids):
+    payload = json.dumps([title, content, sorted(int(pk) for pk in tag_ids)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class RedisDraftBuffer:
+    def save(self, article_id, draft, track_idle):
+        """内容有变化时写入并返回 True；track_idle 为 True 时记入待落库集合。"""
+        client = get_client()
+        key = f'{KEY_PREFIX}{article_id}'
+        if client.hget(key, 'hash') == draft['hash']:
+            return False
+        pipe = client.pipeline()
+        pipe.hset(key, mapping={**draft, 'tags': json.dumps(draft['tags'])})
+        pipe.expire(key, int(getattr(settings, 'DRAFT_BUFFER_TTL', 7 * 24 * 3600)))
+        if track_idle:
+            pipe.zadd(DIRTY_KEY, {str(article_id): draft['saved_at']})
+        pipe.execute()
+        return True
+
+    def get(self, article_id):
+        data = get_client().hgetall(f'{KEY_PREFIX}{article_id}')
+        if not data:
+            return None
+        data['tags'] = json.loads(data['tags'])
+        data['saved_at'] = float(data['saved_at'])
+        return data
+
+    def idle(self, before, limit):
+        return [int(pk) for pk in get_client().zrangebyscore(DIRTY_KEY, '-inf', before, start=0, num=limit)]
+
+    def done(self, article_id, digest):
+        """已落库：缓冲区内容仍是 digest 时移出待落库集合（落库期间又有新内容则保留）。"""
+        key = f'{KEY_PREFIX}{article_id}'
+
+        def remove_if_unchanged(pipe):
+            current = pipe.hget(key, 'hash')
+            pipe.multi()
+            if current is None or current == digest:
+                pipe.zrem(DIRTY_KEY, str(article_id))
+
+        get_client().transaction(remove_if_unchanged, key)
+
+    def contents(self):
+        client = get_client()
+        for key in client.scan_iter(match=f'{KEY_PREFIX}*', count=500):
+            if key != DIRTY_KEY:
+                yield client.hget(key, 'content') or ''
+
+    def discard(self, article_id):
+        pipe = get_client().pipeline()
+        pipe.delete(f'{KEY_PREFIX}{article_id}')
+        pipe.zrem(DIRTY_KEY, str(article_id))
+        pipe.execute()
+
+
+class LocalDraftBuffer:
+    """Redis 不可用时使用：进程内字典，接口同 RedisDraftBuffer。"""
+
+    def __init__(self):
+        self._drafts = {}
+        self._dirty = {}
+        self._lock = threading.Lock()
+
+    def save(self, article_id, draft, track_idle):
+        with self._lock:
+            current = self._drafts.get(article_id)
+            if current is not None and current['hash'] == draft['hash']:
+                return False
+            self._drafts[article_id] = dict(draft)
+            if track_idle:
+                self._dirty[article_id] = draft['saved_at']
+            return True
+
+    def get(self, article_id):
+        draft = self._drafts.get(article_id)
+        return dict(draft) if draft is not None else None
+
+    def idle(self, before, limit):
+        with self._lock:
+            return [pk for pk, saved_at in self._dirty.items() if saved_at <= before][:limit]
+
+    def done(self, article_id, digest):
+        with self._lock:
+            draft = self._drafts.get(article_id)
+            if draft is None or draft['hash'] == digest:
+                self._dirty.pop(article_id, None)
+
+    def contents(self):
+        with self._lock:
+            return [draft['content'] for draft in self._drafts.values()]
+
+    def discard(self, article_id):
+        with self._lock:
+            self._drafts.pop(article_id, None)
+            self._dirty.pop(article_id, None)
+
+
+redis_buffer = RedisDraftBuffer()
+local_buffer = LocalDraftBuffer()
+_last_sweep = 0.0
+
+
+def autosave(article, title, content, tag_ids, flush=False):
+    """
+    自动保存一次，返回 'unchanged'（与缓冲区相同）/ 'buffered'（只写了缓冲区）/ 'persisted'（已写入文章行）。
+    article 为作者自己的未删除文章（只需 id、status 字段）。
+    """
+    is_draft = article.status == 0
+    draft = {
+        'title': title,
+        'content': content,
+        'tags': sorted(int(pk) for pk in tag_ids),
+        'hash': content_hash(title, content, tag_ids),
+        'saved_at': time.time(),
+    }
+    try:
+        changed = redis_buffer.save(article.id, draft, track_idle=is_draft)
+    except redis.RedisError as exc:
+        logger.warning('草稿写入 Redis 失败，使用进程内缓冲：%s', exc)
+        changed = local_buffer.save(article.id, draft, track_idle=is_draft)
+    _schedule_sweep()
+    if flush and is_draft and persist(article.id, draft):
+        return 'persisted'
+    return 'buffered' if changed else 'unchanged'
+
+
+def load(article_id):
+    """缓冲区中的草稿（Redis 优先），没有返回 None。"""
+    try:
+        draft = redis_buffer.get(article_id)
+    except redis.RedisError:
+        draft = None
+    return draft or local_buffer.get(article_id)
+
+
+def discard(article_id):
+    """发布或保存修改后清除缓冲区。"""
+    local_buffer.discard(article_id)
+    try:
+        redis_buffer.discard(article_id)
+    except redis.RedisError as exc:
+        logger.warning('草稿缓冲清除失败：%s', exc)
+
+
+def buffered_contents():
+    """
+    缓冲区中所有草稿的正文（gc_media --recount 统计图片引用用）。
+    Redis 出错时抛出 redis.RedisError：此时无法确认哪些图片仍被草稿引用，调用方不能当作没有引用。
+    """
+    yield from local_buffer.contents()
+    yield from redis_buffer.contents()
+
+
+def restore(article, tag_ids):
+    """
+    编辑页/发布页的初始内容：缓冲区中有与文章行不同的内容时用缓冲区的。
+    返回 {'title', 'content', 'tags', 'restored'（是否来自缓冲区）, 'saved_at'}。
+    """
+    draft = load(article.id)
+    if draft is None or draft['hash'] == content_hash(article.title, article.content, tag_ids):
+        return {'title': article.title, 'content': article.content, 'tags': list(tag_ids), 'restored': False}
+    return {
+        'title': draft['title'],
+        'content': draft['content'],
+        'tags': draft['tags'],
+        'restored': True,
+        'saved_at': datetime.fromtimestamp(draft['saved_at']),
+    }
+
+
+def persist(article_id, draft):
+    """把缓冲区内容写入草稿文章行；内容与文章行相同时不写。返回是否写入。"""
+    article = Article.objects.filter(id=article_id, status=0, is_delete=False).first()
+    if article is None:
+        # 已发布或已删除：不再自动落库
+        return False
+    tag_ids = list(article.tags.values_list('id', flat=True))
+    if content_hash(article.title, article.content, tag_ids) == draft['hash']:
+        return False
+    # 条件 status=0：落库期间文章被发布时不覆盖发布的内容
+    updated = Article.objects.filter(id=article_id, status=0).update(
+        title=draft['title'], content=draft['content'], update_time=timezone.now(),
+    )
+    if updated and set(tag_ids) != set(draft['tags']):
+        article.tags.set(Tag.objects.filter(id__in=draft['tags']))
+    return bool(updated)
+
+
+def flush_idle(idle_seconds=None, limit=100):
+    """把空闲超过 idle_seconds 秒的草稿写入文章行，返回写入的篇数。"""
+    if idle_seconds is None:
+        idle_seconds = int(getattr(settings, 'DRAFT_IDLE_SECONDS', 30))
+    before = time.time() - idle_seconds
+    pending = []
+    try:
+        pending.append((redis_buffer, redis_buffer.idle(before, limit)))
+    except redis.RedisError as exc:
+        logger.warning('读取待落库草稿失败：%s', exc)
+    pending.append((local_buffer, local_buffer.idle(before, limit)))
+
+    written = 0
+    for buffer, article_ids in pending:
+        for article_id in article_ids:
+            draft = buffer.get(article_id)
+            if draft is None:
+                buffer.done(article_id, None)
+                continue
+            try:
+                written += persist(article_id, draft)
+            except Exception:
+                logger.exception('草稿 %s 落库失败', article_id)
+                continue
+            buffer.done(article_id, draft['hash'])
+    return written
+
+
+def _schedule_sweep():
+    # 每个进程每 DRAFT_IDLE_SECONDS 秒最多安排一次空闲落库，在响应发出后执行
+    global _last_sweep
+    now = time.monotonic()
+    if now - _last_sweep < int(getattr(settings, 'DRAFT_IDLE_SECONDS', 30)):
+        return
+    _last_sweep = now
+    defer(flush_idle)
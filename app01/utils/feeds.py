@@ -0,0 +1,258 @@
+"""
+RSS / Atom 订阅和 XML 站点地图：生成为 FEEDS_ROOT 下的静态文件，由 Nginx 直接发送。
+
+- rss.xml / atom.xml：最近 FEED_ITEMS 篇已发布文章
+- sitemap.xml：站点地图索引；sitemaps/pages.xml 为首页等固定页面，
+  sitemaps/articles-<n>.xml 按文章 id 分片，每片 SITEMAP_SHARD_SIZE 个 id（固定区间，文章修改只影响所在分片）
+- 文章发布、编辑、逻辑删除、改标签时（事务提交后）只重建该文章所在分片、索引和订阅，
+  同一请求内的多次修改合并为一次，在响应发出之后执行（deferred.defer_batched）；
+  QuerySet.update() 等不触发信号的批量修改需调用 refresh_articles(ids)
+- 内容未变化不重写文件，mtime 不变，ETag / Last-Modified 条件请求持续命中 304
+- python manage.py build_feeds 全量重建（部署时、导入数据后执行）
+
+serve_feed 是未配置 Nginx 时的兜底：尚未生成过时先全量生成，再按条件请求返回。
+"""
+import logging
+import os
+import re
+import tempfile
+from io import StringIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Floor
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.http import Http404
+from django.urls import reverse
+from django.utils import feedgenerator, timezone
+
+from app01.models import Article
+from app01.utils.deferred import defer_batched
+from app01.utils.media_server import serve_file
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+_SERVED_RE = re.compile(r'^(rss\.xml|atom\.xml|sitemap\.xml|sitemaps/(pages|articles-\d+)\.xml)$')
+# Markdown 摘要：去掉图片、保留链接文字、去掉标记符号
+_MD_IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)')
+_MD_LINK_RE = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_MD_MARK_RE = re.compile(r'[#>*_`~|-]+')
+
+
+def feeds_root():
+    return str(getattr(settings, 'FEEDS_ROOT', os.path.join(settings.BASE_DIR, 'feeds')))
+
+
+def _site_url(path):
+    return getattr(settings, 'SITE_URL', 'http://127.0.0.1:8000').rstrip('/') + path
+
+
+def _shard_size():
+    return int(getattr(settings, 'SITEMAP_SHARD_SIZE', 5000))
+
+
+def _published():
+    return Article.objects.filter(status=1, is_delete=False)
+
+
+def _aware(value):
+    # USE_TZ=False 时数据库里是本地时间，订阅格式要求带时区
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _w3c(value):
+    return _aware(value).isoformat(timespec='seconds')
+
+
+def _summary(content, length=200):
+    text = _MD_MARK_RE.sub(' ', _MD_LINK_RE.sub(r'\1', _MD_IMAGE_RE.sub('', content or '')))
+    text = ' '.join(text.split())
+    return text if len(text) <= length else text[:length] + '…'
+
+
+def _write(relative_path, content):
+    return write_if_changed(os.path.join(feeds_root(), relative_path), content)
+
+
+def write_if_changed(path, content):
+    """原子写入（先写临时文件再替换）；内容没变时不动文件。返回是否写入。"""
+    data = content.encode('utf-8')
+    try:
+        with open(path, 'rb') as fp:
+            if fp.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return True
+
+
+def _urlset(entries):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<urlset xmlns="{SITEMAP_NS}">']
+    for loc, lastmod in entries:
+        lastmod_tag = f'<lastmod>{lastmod}</lastmod>' if lastmod else ''
+        lines.append(f'<url><loc>{escape(loc)}</loc>{lastmod_tag}</url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def build_feeds():
+    """重建 rss.xml 和 atom.xml。"""
+    articles = list(
+        _published().select_related('user').prefetch_related('tags')
+        .order_by('-create_time')[:int(getattr(settings, 'FEED_ITEMS', 20))]
+    )
+    site_name = getattr(settings, 'SITE_NAME', 'CNR Blog')
+    for name, feed_class in (('rss.xml', feedgenerator.Rss201rev2Feed), ('atom.xml', feedgenerator.Atom1Feed)):
+        feed = feed_class(
+            title=site_name,
+            link=_site_url('/'),
+            description=f'{site_name} 最新文章',
+            language=settings.LANGUAGE_CODE,
+            feed_url=_site_url('/' + name),
+        )
+        for article in articles:
+            link = _site_url(reverse('article_detail', args=[article.id]))
+            feed.add_item(
+                title=article.title,
+                link=link,
+                description=_summary(article.content),
+                unique_id=link,
+                pubdate=_aware(article.create_time),
+                updateddate=_aware(article.update_time),
+                author_name=article.user.first_name or article.user.username,
+                categories=[tag.name for tag in article.tags.all()],
+            )
+        output = StringIO()
+        feed.write(output, 'utf-8')
+        _write(name, output.getvalue())
+
+
+def build_shard(shard):
+    """重建 articles-<shard>.xml；该分片没有已发布文章时删除文件。返回是否还存在。"""
+    size = _shard_size()
+    rows = _published().filter(id__gt=shard * size, id__lte=(shard + 1) * size).order_by('id').values_list(
+        'id', 'update_time'
+    )
+    relative_path = f'sitemaps/articles-{shard}.xml'
+    entries = [(_site_url(reverse('article_detail', args=[pk])), _w3c(updated)) for pk, updated in rows]
+    if not entries:
+        try:
+            os.unlink(os.path.join(feeds_root(), relative_path))
+        except FileNotFoundError:
+            pass
+        return False
+    _write(relative_path, _urlset(entries))
+    return True
+
+
+def build_index():
+    """重建 sitemap.xml 和 sitemaps/pages.xml，返回现有分片号列表。"""
+    size = _shard_size()
+    shard_rows = (
+        _published()
+        .annotate(shard=Floor((F('id') - 1) / size))
+        .values('shard')
+        .annotate(lastmod=Max('update_time'))
+        .order_by('shard')
+    )
+    shards = [(int(row['shard']), row['lastmod']) for row in shard_rows]
+    latest = max((lastmod for _, lastmod in shards), default=None)
+    _write('sitemaps/pages.xml', _urlset([(_site_url(reverse('index')), latest and _w3c(latest))]))
+
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<sitemapindex xmlns="{SITEMAP_NS}">']
+    pages_lastmod = f'<lastmod>{_w3c(latest)}</lastmod>' if latest else ''
+    lines.append(f'<sitemap><loc>{escape(_site_url("/sitemaps/pages.xml"))}</loc>{pages_lastmod}</sitemap>')
+    for shard, lastmod in shards:
+        loc = escape(_site_url(f'/sitemaps/articles-{shard}.xml'))
+        lines.append(f'<sitemap><loc>{loc}</loc><lastmod>{_w3c(lastmod)}</lastmod></sitemap>')
+    lines.append('</sitemapindex>')
+    _write('sitemap.xml', '\n'.join(lines) + '\n')
+    return [shard for shard, _ in shards]
+
+
+def build_all():
+    """全量重建，并删除已经没有文章的旧分片文件。返回分片数。"""
+    shards = build_index()
+    for shard in shards:
+        build_shard(shard)
+    shard_dir = os.path.join(feeds_root(), 'sitemaps')
+    for name in os.listdir(shard_dir):
+        match = re.fullmatch(r'articles-(\d+)\.xml', name)
+        if match and int(match.group(1)) not in shards:
+            os.unlink(os.path.join(shard_dir, name))
+    build_feeds()
+    return len(shards)
+
+
+def refresh_articles(article_ids):
+    """文章变化后增量更新：所在分片、索引和订阅。"""
+    if not getattr(settings, 'FEEDS_ENABLED', True):
+        return
+    size = _shard_size()
+    try:
+        for shard in sorted({(int(pk) - 1) // size for pk in article_ids}):
+            build_shard(shard)
+        build_index()
+        build_feeds()
+    except OSError as exc:
+        # 写文件失败不影响已经提交的修改，下次变化或 build_feeds 时会重新生成
+        logger.warning('订阅/站点地图更新失败：%s', exc)
+
+
+def _schedule_refresh(article_ids):
+    # 提交后记下，同一请求内的多次修改合并为一次更新，在响应发出之后执行
+    transaction.on_commit(lambda: defer_batched(refresh_articles, article_ids))
+
+
+@receiver([post_save, post_delete], sender=Article)
+def _article_changed(sender, instance, **kwargs):
+    _schedule_refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def _article_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # 标签进入订阅的分类；从标签一侧修改（tag.articles.add）时 pk_set 是文章 id
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action != 'post_clear' and not pk_set:
+        # tags.set() 标签没变时也会发出空的 post_add
+        return
+    if not reverse:
+        _schedule_refresh([instance.pk])
+    elif pk_set:
+        _schedule_refresh(list(pk_set))
+
+
+def serve_feed(request, path):
+    if not _SERVED_RE.match(path):
+        raise Http404
+    full_path = os.path.join(feeds_root(), path)
+    try:
+        stat = os.stat(full_path)
+    except FileNotFoundError:
+        # 首次访问（尚未执行 build_feeds）时全量生成；已生成过（有 sitemap.xml）时不存在的分片直接 404，
+        # 避免请求任意分片名触发全量重建
+        if path.startswith('sitemaps/') and os.path.exists(os.path.join(feeds_root(), 'sitemap.xml')):
+            raise Http404
+        build_all()
+        try:
+            stat = os.stat(full_path)
+        except FileNotFoundError:
+            raise Http404
+    max_age = int(getattr(settings, 'FEEDS_MAX_AGE', 600))
+    return serve_file(request, full_path, stat, f'public, max-age={max_age}')
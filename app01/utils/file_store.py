@@ -0,0 +1,199 @@
+"""
+内容寻址的上传文件存储。
+
+上传文件边写临时文件边计算 SHA-256，最终路径由哈希决定：
+相同内容只保存一份，StoredFile.ref_count 记录引用次数，
+引用归零的文件由 gc_media 命令分批回收。
+
+头像更换时释放旧头像的引用；文章图片只在上传时计一次引用，编辑删掉图片、删除文章都不会释放，
+这部分文件需要 gc_media --recount 按正文重新计数后才能回收。
+每次引用变化（含重新计数）都会刷新 update_time，回收前至少保留 grace 时长，
+刚上传、还只在编辑器里的图片不会被立即删除。
+"""
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from app01.models import Article, StoredFile, User
+from app01.utils import drafts, image_variants
+from app01.utils.upload_handlers import upload_temp_dir
+
+
+class _TempFile(File):
+    # 提供 temporary_file_path，FileSystemStorage 会直接 move 而不是再拷贝一遍
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def _hash_to_temp(uploaded_file):
+    """边读边写临时文件边计算哈希，返回 (临时文件路径, sha256, 大小)。"""
+    digest = hashlib.sha256()
+    size = 0
+    tmp = tempfile.NamedTemporaryFile(dir=upload_temp_dir(), delete=False)
+    try:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            tmp.write(chunk)
+            size += len(chunk)
+    finally:
+        tmp.close()
+    return tmp.name, digest.hexdigest(), size
+
+
+def build_name(prefix, sha256, ext):
+    # 按哈希前两位分目录，避免单目录文件过多
+    return f"{prefix}/{sha256[:2]}/{sha256}{ext}"
+
+
+def save_upload(uploaded_file, prefix, ext):
+    """
+    保存上传文件并增加一次引用，返回 StoredFile。
+    内容已存在时直接复用已有文件，不会再写一份。
+    """
+    sha256 = getattr(uploaded_file, 'sha256', None)
+    if sha256 and hasattr(uploaded_file, 'temporary_file_path'):
+        # ImageUploadHandler 接收时已算好哈希并落盘，直接 rename 到最终位置
+        tmp_path, size = uploaded_file.temporary_file_path(), uploaded_file.size
+    else:
+        tmp_path, sha256, size = _hash_to_temp(uploaded_file)
+    try:
+        return _store(tmp_path, sha256, size, build_name(prefix, sha256, ext))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _store(tmp_path, sha256, size, name):
+    with transaction.atomic():
+        stored, created = StoredFile.objects.select_for_update().get_or_create(
+            sha256=sha256,
+            defaults={'name': name, 'size': size, 'ref_count': 1},
+        )
+        if not created:
+            # 刷新 update_time：复用的旧文件同样要从现在起计算回收保留期
+            StoredFile.objects.filter(id=stored.id).update(ref_count=F('ref_count') + 1, update_time=timezone.now())
+            stored.ref_count += 1
+        # 路径由哈希决定：已有记录且文件在 media/ 下就直接复用。
+        # 新建的记录总是重新写文件：同名文件可能是刚被 gc 删除了记录、正要删除的旧文件，不能复用
+        if created and default_storage.exists(stored.name):
+            default_storage.delete(stored.name)
+        if created or not default_storage.exists(stored.name):
+            with open(tmp_path, 'rb') as fp:
+                saved_name = default_storage.save(stored.name, _TempFile(fp))
+            if saved_name != stored.name:
+                stored.name = saved_name
+                stored.save(update_fields=['name', 'update_time'])
+    return stored
+
+
+def release(name, count=1):
+    """减少一次引用；name 不在表中（如默认头像）时忽略。"""
+    if not name:
+        return 0
+    return StoredFile.objects.filter(name=name).update(
+        ref_count=F('ref_count') - count,
+        update_time=timezone.now(),
+    )
+
+
+def _count_references(chunk_size):
+    counter = Counter()
+    avatar_rows = User.objects.exclude(avatar='').exclude(avatar__isnull=True).values('avatar').annotate(
+        total=Count('id')
+    )
+    for row in avatar_rows:
+        counter[row['avatar']] += row['total']
+
+    # 文章正文中引用的 media 路径，如 ![](/media/article/ab/ab12...ef.png)
+    pattern = re.compile(re.escape(settings.MEDIA_URL) + r'([\w\-./]+)')
+    # 已软删除的文章也算引用：恢复后图片要能正常显示
+    last_id = 0
+    while True:
+        rows = list(
+            Article.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'content')[:chunk_size]
+        )
+        if not rows:
+            break
+        for article_id, content in rows:
+            counter.update(set(pattern.findall(content or '')))
+        last_id = rows[-1][0]
+
+    # 自动保存缓冲区中尚未落库的草稿/修改
+    for content in drafts.buffered_contents():
+        counter.update(set(pattern.findall(content)))
+    return counter
+
+
+def recount_references(chunk_size=500, dry_run=False):
+    """
+    按实际引用重新计算 ref_count：
+    头像按 User.avatar 分组计数，文章图片按主键分块扫描正文（含已软删除的文章和草稿缓冲区）。
+    先记下各记录当前的 ref_count 再统计，修正时按差值 F('ref_count') + delta 更新，
+    统计期间并发上传增加的引用不会被覆盖（最多暂时多算，下次重新计数时修正）。dry_run 时只统计不写入。
+    返回被修正（或 dry_run 时将修正）的记录数。
+    """
+    observed = dict(StoredFile.objects.values_list('name', 'ref_count').iterator(chunk_size=chunk_size))
+    counter = _count_references(chunk_size)
+
+    deltas = {name: counter.get(name, 0) - ref_count for name, ref_count in observed.items()}
+    names = [name for name, delta in deltas.items() if delta]
+    if dry_run:
+        return len(names)
+    for start in range(0, len(names), chunk_size):
+        batch = names[start:start + chunk_size]
+        with transaction.atomic():
+            list(StoredFile.objects.select_for_update().filter(name__in=batch).values_list('id'))
+            now = timezone.now()
+            for name in batch:
+                # 刷新 update_time：刚归零的文件从现在起保留 grace 时长
+                StoredFile.objects.filter(name=name).update(
+                    ref_count=F('ref_count') + deltas[name], update_time=now,
+                )
+    return len(names)
+
+
+def collect_garbage(batch_size=200, grace_seconds=24 * 3600, dry_run=False):
+    """
+    分批删除无引用的文件。
+    grace_seconds：引用归零后至少保留这么久，避免刚上传、尚未保存到文章里的图片被误删。
+    返回删除（或 dry_run 时将删除）的文件数。
+    """
+    deadline = timezone.now() - timedelta(seconds=grace_seconds)
+    deleted = 0
+    last_id = 0
+    while True:
+        batch = list(
+            StoredFile.objects.filter(id__gt=last_id, ref_count__lte=0, update_time__lt=deadline)
+            .order_by('id')
+            .values_list('id', 'name')[:batch_size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        if dry_run:
+            deleted += len(batch)
+            continue
+        ids = [file_id for file_id, _ in batch]
+        with transaction.atomic():
+            # 再次确认仍无引用（期间可能又被上传复用）
+            orphan_rows = list(
+                StoredFile.objects.select_for_update().filter(id__in=ids, ref_count__lte=0).values_list('id', 'name')
+            )
+            # 在持有行锁、删除记录提交之前删文件：同内容的并发上传会等锁释放，
+            # 之后记录已不存在，上传会新建记录并重新写文件，不会引用到已删除的文件
+            for _, name in orphan_rows:
+                default_storage.delete(name)
+                image_variants.delete_variants(name)
+            StoredFile.objects.filter(id__in=[file_id for file_id, _ in orphan_rows]).delete()
+        deleted += len(orphan_rows)
+    return deleted
@@ -0,0 +1,212 @@
+"""
+派生图片：头像缩略图、文章图片的多宽度版本（WebP + JPEG）。
+
+上传后把生成任务丢进线程池，请求本身不等待；
+模板通过 avatar_thumb / responsive_images 过滤器引用派生图，
+派生图还没生成好（或未安装 Pillow）时自动回退原图。
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow 为可选依赖
+    Image = None
+
+VARIANT_DIR = 'variants'
+FORMATS = ('webp', 'jpg')
+
+_executor = None
+# 派生图是否存在的本进程缓存：name -> (过期时刻, 是否存在)，按 LRU 保留 IMAGE_VARIANT_CACHE_SIZE 条。
+# “存在”IMAGE_VARIANT_HIT_TTL 秒后重新检查：gc_media 在别的进程里删除派生图，本进程收不到通知，最多晚这么久停止引用；
+# “不存在”（默认头像、动图、历史图片等）IMAGE_VARIANT_MISS_TTL 秒后重新检查，其它进程生成的派生图最多晚这么久生效
+_known_variants = OrderedDict()
+_known_lock = threading.Lock()
+
+
+def avatar_sizes():
+    return tuple(getattr(settings, 'IMAGE_AVATAR_SIZES', (96, 160)))
+
+
+def article_widths():
+    return tuple(getattr(settings, 'IMAGE_ARTICLE_WIDTHS', (480, 960, 1440)))
+
+
+def variant_name(name, size, fmt):
+    # avatar/ab/abcd.png -> variants/avatar/ab/abcd_96.webp
+    base, _ = os.path.splitext(name)
+    return f"{VARIANT_DIR}/{base}_{size}.{fmt}"
+
+
+def _remember(name, exists):
+    if exists:
+        ttl = int(getattr(settings, 'IMAGE_VARIANT_HIT_TTL', 600))
+    else:
+        ttl = int(getattr(settings, 'IMAGE_VARIANT_MISS_TTL', 60))
+    expires = time.monotonic() + ttl
+    with _known_lock:
+        _known_variants[name] = (expires, exists)
+        _known_variants.move_to_end(name)
+        while len(_known_variants) > int(getattr(settings, 'IMAGE_VARIANT_CACHE_SIZE', 10000)):
+            _known_variants.popitem(last=False)
+
+
+def _forget(name):
+    with _known_lock:
+        _known_variants.pop(name, None)
+
+
+def variant_exists(name):
+    with _known_lock:
+        item = _known_variants.get(name)
+        if item is not None and item[0] > time.monotonic():
+            _known_variants.move_to_end(name)
+            return item[1]
+    exists = default_storage.exists(name)
+    _remember(name, exists)
+    return exists
+
+
+def delete_variants(name):
+    # 原图被回收时一并删除派生图
+    for size in set(avatar_sizes()) | set(article_widths()):
+        for fmt in FORMATS:
+            target = variant_name(name, size, fmt)
+            _forget(target)
+            default_storage.delete(target)
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=80, method=4)
+    else:
+        image.convert('RGB').save(buffer, 'JPEG', quality=82, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def _save_variant(image, name, size, fmt):
+    target = variant_name(name, size, fmt)
+    if not default_storage.exists(target):
+        default_storage.save(target, ContentFile(_encode(image, fmt)))
+    _remember(target, True)
+
+
+def _open(name):
+    with default_storage.open(name, 'rb') as fp:
+        image = Image.open(fp)
+        # 动图缩放会丢帧，保持原图
+        if getattr(image, 'is_animated', False):
+            return None
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    return image
+
+
+def generate_avatar_variants(name):
+    image = _open(name)
+    if image is None:
+        return
+    for size in avatar_sizes():
+        # 居中裁成正方形再缩放
+        thumb = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for fmt in FORMATS:
+            _save_variant(thumb, name, size, fmt)
+
+
+def generate_article_variants(name):
+    image = _open(name)
+    if image is None:
+        return
+    for width in article_widths():
+        # 只生成比原图窄的版本
+        if width >= image.width:
+            continue
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for fmt in FORMATS:
+            _save_variant(resized, name, width, fmt)
+
+
+def _run(func, name):
+    try:
+        func(name)
+    except Exception:
+        logger.exception('生成派生图片失败: %s', name)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2),
+            thread_name_prefix='image-variants',
+        )
+    return _executor
+
+
+def schedule(name, kind):
+    """上传后调用：后台生成派生图。kind 为 'avatar' 或 'article'。"""
+    if Image is None or not name:
+        return None
+    func = generate_avatar_variants if kind == 'avatar' else generate_article_variants
+    return _get_executor().submit(_run, func, name)
+
+
+def avatar_url(name, display_size=40):
+    """返回适合 display_size（CSS 像素）显示的头像地址，按 2 倍图挑选。"""
+    if not name:
+        return ''
+    wanted = display_size * 2
+    sizes = sorted(avatar_sizes())
+    size = next((s for s in sizes if s >= wanted), sizes[-1] if sizes else None)
+    if size is not None:
+        target = variant_name(name, size, 'webp')
+        if variant_exists(target):
+            return default_storage.url(target)
+    return default_storage.url(name)
+
+
+def _picture_html(match):
+    alt, name = match.group(1), match.group(2)
+    sources = {}
+    for fmt in FORMATS:
+        candidates = []
+        for width in article_widths():
+            target = variant_name(name, width, fmt)
+            if variant_exists(target):
+                candidates.append(f"{default_storage.url(target)} {width}w")
+        sources[fmt] = ', '.join(candidates)
+    if not sources['webp']:
+        return match.group(0)
+    alt = alt.replace('"', '&quot;')
+    return (
+        '<picture>'
+        f'<source type="image/webp" srcset="{sources["webp"]}" sizes="(max-width: 768px) 100vw, 768px">'
+        f'<img src="{default_storage.url(name)}" srcset="{sources["jpg"]}" '
+        f'sizes="(max-width: 768px) 100vw, 768px" alt="{alt}" loading="lazy">'
+        '</picture>'
+    )
+
+
+def responsive_markdown(content):
+    """把正文里的站内图片替换成带 srcset 的 <picture>，由前端 marked 原样输出。"""
+    if not content or settings.MEDIA_URL not in content:
+        return content
+    # Markdown 图片：![alt](/media/article/ab/abcd.png)
+    pattern = r'!\[([^\]]*)\]\(' + re.escape(settings.MEDIA_URL) + r'(article/[\w\-./]+)\)'
+    return re.sub(pattern, _picture_html, content)
@@ -0,0 +1,223 @@
+"""
+去重/限流原语的可插拔后端。
+
+限流器只依赖三个操作：
+- set_if_absent(key, ttl)：key 不存在才写入并设置过期时间，写入成功返回 True
+- incr(key, ttl=None)：计数 +1 并返回新值；首次创建时设置过期时间
+- expire(key, ttl)：重新设置过期时间
+
+异步视图使用 aset_if_absent；默认放到线程里执行同步实现，Redis 后端使用 redis.asyncio。
+
+通过 settings.LIMITER_BACKEND 选择实现：
+- RedisLimiterBackend：多进程/多机部署（默认）
+- LocalLimiterBackend：单机部署、测试环境，进程内分片字典 + 时间轮过期
+- CacheLimiterBackend：复用 Django cache 框架
+"""
+import itertools
+import threading
+import time
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from app01.utils.redis_client import get_async_client, get_client
+
+
+class LimiterBackend:
+    def set_if_absent(self, key, ttl):
+        raise NotImplementedError
+
+    def incr(self, key, ttl=None):
+        raise NotImplementedError
+
+    def expire(self, key, ttl):
+        raise NotImplementedError
+
+    async def aset_if_absent(self, key, ttl):
+        return await sync_to_async(self.set_if_absent, thread_sensitive=False)(key, ttl)
+
+
+class RedisLimiterBackend(LimiterBackend):
+    def set_if_absent(self, key, ttl):
+        # set nx ex：key 不存在才写入并设置过期时间
+        return bool(get_client().set(key, 1, ex=ttl, nx=True))
+
+    async def aset_if_absent(self, key, ttl):
+        return bool(await get_async_client().set(key, 1, ex=ttl, nx=True))
+
+    def incr(self, key, ttl=None):
+        client = get_client()
+        value = client.incr(key)
+        if ttl and value == 1:
+            client.expire(key, ttl)
+        return value
+
+    def expire(self, key, ttl):
+        return bool(get_client().expire(key, ttl))
+
+
+class CacheLimiterBackend(LimiterBackend):
+    def __init__(self, alias=None):
+        self.alias = alias or getattr(settings, 'LIMITER_CACHE_ALIAS', 'default')
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def set_if_absent(self, key, ttl):
+        # cache.add：key 已存在时不覆盖，返回 False
+        return bool(self.cache.add(key, 1, timeout=ttl))
+
+    async def aset_if_absent(self, key, ttl):
+        return bool(await self.cache.aadd(key, 1, timeout=ttl))
+
+    def incr(self, key, ttl=None):
+        cache = self.cache
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # key 不存在：先 add 再 incr，并发下只有一个 add 会成功
+            cache.add(key, 0, timeout=ttl)
+            return cache.incr(key)
+
+    def expire(self, key, ttl):
+        return bool(self.cache.touch(key, timeout=ttl))
+
+
+class _Entry:
+    __slots__ = ('expire_at', 'counter')
+
+    def __init__(self, expire_at):
+        self.expire_at = expire_at
+        # itertools.count 的 next() 在 CPython 中是原子操作，计数无需加锁
+        self.counter = itertools.count(1)
+
+
+class LocalLimiterBackend(LimiterBackend):
+    """
+    进程内实现：key 按哈希分散到多个字典分片，过期由时间轮批量清理。
+
+    热路径只用到 dict.get / dict.setdefault / list.append，
+    它们在 GIL 下都是原子的，所以不需要加锁；
+    只有推进时间轮的线程会 try-acquire 一把非阻塞锁，其它线程直接跳过。
+    """
+
+    def __init__(self, shards=None, wheel_size=None):
+        self.shard_count = shards or getattr(settings, 'LIMITER_LOCAL_SHARDS', 16)
+        self.wheel_size = wheel_size or getattr(settings, 'LIMITER_LOCAL_WHEEL_SIZE', 512)
+        self._shards = [{} for _ in range(self.shard_count)]
+        # 时间轮：每个槽位 1 秒，存放 (分片下标, key) 待检查项
+        self._wheel = [[] for _ in range(self.wheel_size)]
+        self._tick = int(time.monotonic())
+        self._sweep_lock = threading.Lock()
+
+    def _shard(self, key):
+        return self._shards[hash(key) % self.shard_count]
+
+    def _schedule(self, key, expire_at):
+        # 挂到过期时刻之后的下一个槽位，保证扫到时一定已经过期
+        slot = (int(expire_at) + 1) % self.wheel_size
+        self._wheel[slot].append((hash(key) % self.shard_count, key))
+
+    def _advance(self, now):
+        now_tick = int(now)
+        if now_tick <= self._tick or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            start = self._tick + 1
+            # 停顿超过一整圈时，每个槽位最多扫一次
+            if now_tick - start >= self.wheel_size:
+                start = now_tick - self.wheel_size + 1
+            for tick in range(start, now_tick + 1):
+                slot = tick % self.wheel_size
+                bucket, self._wheel[slot] = self._wheel[slot], []
+                for shard_index, key in bucket:
+                    shard = self._shards[shard_index]
+                    entry = shard.get(key)
+                    if entry is None:
+                        continue
+                    if entry.expire_at <= now:
+                        # 只删除仍是同一对象的项，避免误删其它线程刚写入的新值
+                        if shard.get(key) is entry:
+                            shard.pop(key, None)
+                    else:
+                        # TTL 超过一圈或被 expire 延长：重新挂到对应槽位
+                        self._schedule(key, entry.expire_at)
+            self._tick = now_tick
+        finally:
+            self._sweep_lock.release()
+
+    def _get_live(self, shard, key, now):
+        entry = shard.get(key)
+        if entry is not None and entry.expire_at <= now:
+            # 惰性淘汰：已过期但时间轮还没扫到
+            if shard.get(key) is entry:
+                shard.pop(key, None)
+            entry = None
+        return entry
+
+    def set_if_absent(self, key, ttl):
+        now = time.monotonic()
+        self._advance(now)
+        shard = self._shard(key)
+        if self._get_live(shard, key, now) is not None:
+            return False
+        new_entry = _Entry(now + ttl)
+        if shard.setdefault(key, new_entry) is not new_entry:
+            return False
+        self._schedule(key, new_entry.expire_at)
+        return True
+
+    async def aset_if_absent(self, key, ttl):
+        # 纯内存操作，不会阻塞事件循环
+        return self.set_if_absent(key, ttl)
+
+    def incr(self, key, ttl=None):
+        now = time.monotonic()
+        self._advance(now)
+        shard = self._shard(key)
+        entry = self._get_live(shard, key, now)
+        if entry is None:
+            new_entry = _Entry(now + ttl if ttl else float('inf'))
+            entry = shard.setdefault(key, new_entry)
+            if entry is new_entry and ttl:
+                self._schedule(key, new_entry.expire_at)
+        return next(entry.counter)
+
+    def expire(self, key, ttl):
+        now = time.monotonic()
+        entry = self._get_live(self._shard(key), key, now)
+        if entry is None:
+            return False
+        entry.expire_at = now + ttl
+        self._schedule(key, entry.expire_at)
+        return True
+
+    def clear(self):
+        for shard in self._shards:
+            shard.clear()
+        for bucket in self._wheel:
+            bucket.clear()
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """按 settings.LIMITER_BACKEND 实例化后端（进程内单例）。"""
+    backend_path = getattr(
+        settings,
+        'LIMITER_BACKEND',
+        'app01.utils.limiter_backends.RedisLimiterBackend',
+    )
+    return import_string(backend_path)()
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    # override_settings 切换后端时丢弃旧实例
+    if setting.startswith('LIMITER_'):
+        get_backend.cache_clear()
@@ -0,0 +1,143 @@
+"""
+生产环境的 media 文件服务（头像、文章图片）。
+
+settings.MEDIA_ACCEL 选择发送方式：
+- None：FileResponse 直接返回（WSGI 服务器支持时走 wsgi.file_wrapper / sendfile 零拷贝）
+- 'x-accel-redirect'：交给 Nginx internal location（MEDIA_ACCEL_PREFIX）发送
+- 'x-sendfile'：交给 Apache mod_xsendfile / lighttpd 发送
+
+支持 ETag / Last-Modified 条件请求和单段 Range；
+内容寻址的文件（文件名即 SHA-256）内容永不变化，返回一年 immutable 缓存头。
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+# article/ab/<sha256>.png、variants/avatar/ab/<sha256>_96.webp
+_CONTENT_ADDRESSED_RE = re.compile(r'^(variants/)?[\w-]+/[0-9a-f]{2}/[0-9a-f]{64}(_\d+)?\.\w+$')
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _cache_control(path):
+    if _CONTENT_ADDRESSED_RE.match(path):
+        return 'public, max-age=31536000, immutable'
+    return f"public, max-age={int(getattr(settings, 'MEDIA_MAX_AGE', 86400))}"
+
+
+def _parse_range(header, size):
+    """解析单段 Range，返回 (start, end)；不支持/无效返回 None，不可满足返回 False。"""
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # bytes=-500：最后 500 字节
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as fp:
+        fp.seek(start)
+        while length > 0:
+            chunk = fp.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def serve_media(request, path):
+    # 上传临时目录等隐藏文件不对外
+    if any(part.startswith('.') for part in path.split('/')):
+        raise Http404
+    try:
+        full_path = safe_join(str(settings.MEDIA_ROOT), path)
+    except ValueError:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    accel = getattr(settings, 'MEDIA_ACCEL', None)
+    accel_path = None
+    if accel == 'x-accel-redirect':
+        accel_path = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/') + path
+    elif accel == 'x-sendfile':
+        accel_path = full_path
+    return serve_file(request, full_path, stat, _cache_control(path), accel, accel_path)
+
+
+def serve_file(request, full_path, stat, cache_control, accel=None, accel_path=None):
+    """按 ETag / Last-Modified 处理条件请求后返回文件（media 与 feeds 共用）。"""
+    size, mtime = stat.st_size, stat.st_mtime
+    etag = f'"{int(mtime):x}-{size:x}"'
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    if _not_modified(request, etag, mtime):
+        response = HttpResponseNotModified()
+    elif accel == 'x-accel-redirect':
+        # Nginx 负责发送文件（含 Range），Python 只返回响应头
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_path
+    elif accel == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = accel_path
+    else:
+        response = _file_response(request, full_path, size, content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _file_response(request, full_path, size, content_type):
+    range_header = request.META.get('HTTP_RANGE')
+    byte_range = _parse_range(range_header, size) if range_header and size else None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        # 整个文件：FileResponse 会交给 wsgi.file_wrapper（可用时为 sendfile 零拷贝）
+        return FileResponse(open(full_path, 'rb'), content_type=content_type)
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_iter_range(full_path, start, length), status=206, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,277 @@
+"""
+请求级性能统计。
+
+MetricsMiddleware 为每个请求记录：
+- SQL 条数和耗时（connection.execute_wrapper），超过 SLOW_QUERY_MS 的 SQL 打 warning 日志
+- Redis 命令数和耗时（redis_client 返回的客户端自带计时）
+- 模板渲染耗时（TimedDjangoTemplates 模板后端）
+
+结果写入响应头 Server-Timing（浏览器开发者工具 Timing 面板可直接查看），
+并按 URL name 汇总成直方图，由 /metrics 以 Prometheus 文本格式输出。
+直方图保存在进程内存里，多进程部署时每个进程各自统计、各自被抓取。
+"""
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+# 当前请求的统计对象；不在请求内（管理命令、后台线程）时为 None
+_current = ContextVar('request_stats', default=None)
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class _RequestStats:
+    __slots__ = ('sql_count', 'sql_time', 'slow_queries', 'redis_count', 'redis_time', 'template_time')
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.slow_queries = 0
+        self.redis_count = 0
+        self.redis_time = 0.0
+        self.template_time = 0.0
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label='view'):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label = label
+        # view -> [各桶计数..., +Inf 计数, sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = {view: list(series) for view, series in self._series.items()}
+        for view, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{self.label}="{view}",le="{bound}"}} {cumulative}')
+            cumulative += series[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{self.label}="{view}",le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{self.label}="{view}"}} {series[-1]:.6f}')
+            lines.append(f'{self.name}_count{{{self.label}="{view}"}} {cumulative}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label='view'):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, view, amount=1):
+        with self._lock:
+            self._values[view] = self._values.get(view, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            snapshot = dict(self._values)
+        for view, value in sorted(snapshot.items()):
+            lines.append(f'{self.name}{{{self.label}="{view}"}} {value}')
+        return lines
+
+
+REQUEST_DURATION = Histogram('blog_request_duration_seconds', '请求总耗时', DURATION_BUCKETS)
+SQL_QUERIES = Histogram('blog_sql_queries_per_request', '每个请求的 SQL 条数', COUNT_BUCKETS)
+SQL_DURATION = Histogram('blog_sql_duration_seconds', '每个请求的 SQL 总耗时', DURATION_BUCKETS)
+REDIS_COMMANDS = Histogram('blog_redis_commands_per_request', '每个请求的 Redis 命令数', COUNT_BUCKETS)
+REDIS_DURATION = Histogram('blog_redis_duration_seconds', '每个请求的 Redis 总耗时', DURATION_BUCKETS)
+TEMPLATE_DURATION = Histogram('blog_template_render_seconds', '每个请求的模板渲染耗时', DURATION_BUCKETS)
+SLOW_QUERIES = Counter('blog_slow_queries_total', '超过 SLOW_QUERY_MS 的 SQL 条数')
+# 爬虫/监控请求按类别计数（这些请求不计阅读量、访问量，见 bot_detect）
+BOT_REQUESTS = Counter('blog_bot_requests_total', '识别为爬虫/监控、跳过计数的请求数', label='family')
+# 延后任务（见 deferred）：按结果计数（done/failed/inline：队列满时当场执行），按任务函数统计耗时
+DEFERRED_TASKS = Counter('blog_deferred_tasks_total', '延后任务数', label='status')
+DEFERRED_DURATION = Histogram('blog_deferred_task_seconds', '延后任务执行耗时', DURATION_BUCKETS, label='task')
+
+REGISTRY = (
+    REQUEST_DURATION, SQL_QUERIES, SQL_DURATION, REDIS_COMMANDS, REDIS_DURATION, TEMPLATE_DURATION, SLOW_QUERIES,
+    BOT_REQUESTS, DEFERRED_TASKS, DEFERRED_DURATION,
+)
+
+
+def record_redis(seconds):
+    stats = _current.get()
+    if stats is not None:
+        stats.redis_count += 1
+        stats.redis_time += seconds
+
+
+def record_template(seconds):
+    stats = _current.get()
+    if stats is not None:
+        stats.template_time += seconds
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        stats = _current.get()
+        if stats is not None:
+            stats.sql_count += 1
+            stats.sql_time += duration
+        if duration * 1000 >= getattr(settings, 'SLOW_QUERY_MS', 100):
+            if stats is not None:
+                stats.slow_queries += 1
+            logger.warning('慢查询 %.1fms: %s', duration * 1000, sql[:1000])
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record_template(time.perf_counter() - start)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates 模板后端，额外统计每次 render 的耗时。"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def _view_label(request):
+    # 只用 URL name 作为标签，避免把带 id 的路径写进指标导致序列数无限增长
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.view_name or 'unnamed'
+
+
+def _server_timing(stats, total):
+    return ', '.join([
+        f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.sql_count} queries"',
+        f'redis;dur={stats.redis_time * 1000:.1f};desc="{stats.redis_count} commands"',
+        f'tpl;dur={stats.template_time * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ])
+
+
+def _sql_wrappers():
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(_sql_wrapper))
+    return stack
+
+
+class MetricsMiddleware:
+    """同步/异步两用：ASGI 下异步视图不必切到线程里执行。"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING_HEADER', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = _RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with _sql_wrappers():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        # 数据库连接按线程区分：ASGI 下本请求的 ORM 调用都在同一个 thread_sensitive 线程里执行，
+        # SQL 计时包装要装在那个线程的连接上；该线程复制当前上下文，统计仍记到本请求
+        stats = _RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            wrappers = await sync_to_async(_sql_wrappers)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(wrappers.close)()
+        finally:
+            _current.reset(token)
+        return self._record(request, response, stats, time.perf_counter() - start)
+
+    def _record(self, request, response, stats, total):
+        view = _view_label(request)
+        REQUEST_DURATION.observe(view, total)
+        SQL_QUERIES.observe(view, stats.sql_count)
+        SQL_DURATION.observe(view, stats.sql_time)
+        REDIS_COMMANDS.observe(view, stats.redis_count)
+        REDIS_DURATION.observe(view, stats.redis_time)
+        TEMPLATE_DURATION.observe(view, stats.template_time)
+        if stats.slow_queries:
+            SLOW_QUERIES.inc(view, stats.slow_queries)
+
+        if self.server_timing:
+            response['Server-Timing'] = _server_timing(stats, total)
+        return response
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def _has_token(request):
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    scheme, _, value = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(value.encode(), token.encode())
+
+
+def metrics_view(request):
+    """
+    Prometheus 抓取地址：带 METRICS_TOKEN 的 Bearer 凭据、来自 METRICS_ALLOWED_IPS（默认为空）或超级管理员可访问。
+    不默认信任回环地址：同机反向代理转发的请求 REMOTE_ADDR 都是 127.0.0.1。
+    """
+    allowed = (
+        _has_token(request)
+        or request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', ())
+        or request.user.is_superuser
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,160 @@
+"""
+线上单个请求的按需性能剖析。
+
+超级管理员在请求上带 ?_profile=1 或请求头 X-Profile: 1 时，
+ProfilerMiddleware 用 cProfile 执行这个请求，结果（pstats 格式，可用 snakeviz /
+flameprof / gprof2dot 查看或生成火焰图）写入 PROFILER_DIR，只保留最近 PROFILER_MAX_FILES 个。
+响应头 X-Profile-Id 返回文件名；后台 /admin/profiles/ 列出并下载。
+同一进程同时只剖析一个请求，其它请求照常返回，带响应头 X-Profile-Skipped: busy。
+
+默认关闭（PROFILER_ENABLED=False，中间件直接不加载）；开启后普通请求只多一次字典查找。
+ASGI 下普通请求不切换线程；要剖析的请求整条后续处理放到线程里同步执行（cProfile 只统计当前线程），
+异步视图在事件循环线程里执行的部分不会被记录。
+"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import threading
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import render
+
+from app01.utils.permissions import is_site_owner
+
+_NAME_RE = re.compile(r'^[\w.-]+\.prof$')
+_lock = threading.Lock()
+# 同一时刻只剖析一个请求
+_profiling = threading.Lock()
+
+
+def profile_dir():
+    return str(getattr(settings, 'PROFILER_DIR', os.path.join(settings.BASE_DIR, 'profiles')))
+
+
+def _requested(request):
+    return request.META.get('HTTP_X_PROFILE') == '1' or '_profile' in request.GET
+
+
+def _wants_profile(request):
+    return _requested(request) and is_site_owner(request.user)
+
+
+def _label(request):
+    match = getattr(request, 'resolver_match', None)
+    label = (match.url_name if match else None) or 'unmatched'
+    return re.sub(r'[^\w-]', '_', label)
+
+
+def save_profile(profiler, request, elapsed):
+    """写入一份剖析结果，超出 PROFILER_MAX_FILES 时删除最旧的，返回文件名。"""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    # 时间戳在前，按文件名排序即按时间排序
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid4().hex[:4]}_{request.method}_{_label(request)}_{int(elapsed * 1000)}ms.prof"
+    tmp_path = os.path.join(directory, f'.{name}.tmp')
+    profiler.dump_stats(tmp_path)
+    os.replace(tmp_path, os.path.join(directory, name))
+
+    max_files = getattr(settings, 'PROFILER_MAX_FILES', 50)
+    with _lock:
+        names = sorted(n for n in os.listdir(directory) if _NAME_RE.match(n))
+        for old in names[:max(len(names) - max_files, 0)]:
+            try:
+                os.remove(os.path.join(directory, old))
+            except FileNotFoundError:
+                pass
+    return name
+
+
+class ProfilerMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not _wants_profile(request):
+            return self.get_response(request)
+        return self._profile(request, self.get_response)
+
+    async def __acall__(self, request):
+        # 先看请求头/参数，普通请求不为读 request.user 切换线程
+        if not _requested(request) or not await sync_to_async(_wants_profile)(request):
+            return await self.get_response(request)
+        return await sync_to_async(self._profile)(request, async_to_sync(self.get_response))
+
+    @staticmethod
+    def _profile(request, get_response):
+        # Python 3.12 起同一进程同时只能有一个 cProfile 在运行，否则抛 ValueError；
+        # 已有请求在剖析时本请求照常执行、不剖析
+        if not _profiling.acquire(blocking=False):
+            response = get_response(request)
+            response['X-Profile-Skipped'] = 'busy'
+            return response
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            response = profiler.runcall(get_response, request)
+            elapsed = time.perf_counter() - start
+        finally:
+            _profiling.release()
+        response['X-Profile-Id'] = save_profile(profiler, request, elapsed)
+        return response
+
+
+def _list_profiles():
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    items = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not _NAME_RE.match(name):
+            continue
+        stat = os.stat(os.path.join(directory, name))
+        items.append({'name': name, 'size': stat.st_size, 'created': datetime.fromtimestamp(stat.st_mtime)})
+    return items
+
+
+def _check_owner(request):
+    if not is_site_owner(request.user):
+        raise PermissionDenied
+
+
+@admin.site.admin_view
+def profile_list(request):
+    _check_owner(request)
+    context = dict(admin.site.each_context(request), title='请求剖析记录', profiles=_list_profiles())
+    return render(request, 'admin/profiles.html', context)
+
+
+@admin.site.admin_view
+def profile_download(request, name):
+    """下载 .prof 原文件；?format=text 返回按累计耗时排序的前 60 项文本摘要。"""
+    _check_owner(request)
+    if not _NAME_RE.match(name):
+        raise Http404
+    path = os.path.join(profile_dir(), name)
+    if not os.path.isfile(path):
+        raise Http404
+    if request.GET.get('format') == 'text':
+        output = io.StringIO()
+        stats = pstats.Stats(path, stream=output)
+        stats.strip_dirs().sort_stats('cumulative').print_stats(60)
+        return HttpResponse(output.getvalue(), content_type='text/plain; charset=utf-8')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
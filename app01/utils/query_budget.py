@@ -0,0 +1,189 @@
+"""
+视图查询预算：防止模板或视图改动引入 N+1 查询。
+
+每个场景（视图 + 请求方式）有 SQL 条数和 Redis 命令数上限。检查分两轮：
+先造一份小数据集跑一遍所有场景，再把文章/评论/标签扩充到数倍再跑一遍。
+- 任一轮超出上限：列出该请求的全部 SQL（参数归一化后按语句合并计数），重复执行的语句一眼可见
+- 两轮条数不同：说明查询数随数据量增长，列出两轮之间执行次数变化的语句
+
+由 app01/tests/test_query_budgets.py 调用（python manage.py test），在独立的测试数据库中执行。
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from app01.models import Article, CaptchaModel, Comment, DailyVisitStat, Tag, User
+from app01.utils import reference_cache
+from app01.utils.search_suggest import suggest_index
+
+_REDIS_RE = re.compile(r'redis;[^,]*desc="(\d+) commands"')
+# 事务控制语句不计入（SQLite 会显式执行 BEGIN，MySQL 不会，计入会让预算依赖数据库类型）
+_TRANSACTION_RE = re.compile(r'^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE)
+PASSWORD = 'budget123456'
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # path(run) -> 请求路径；data(run) -> POST 数据
+    path: object
+    max_sql: int
+    max_redis: int
+    data: object = None
+    # 'author'：以文章作者登录；'reader'：以普通用户登录；None：匿名
+    login: str = None
+    status: int = 200
+    # warm(run)：请求前的准备（如构建进程内索引），不计入预算
+    warm: object = None
+
+
+@dataclass
+class Result:
+    status: int
+    queries: list
+    redis: int
+    failures: list = field(default_factory=list)
+
+
+# 预算按默认配置（Redis 会话 + Redis 去重）设定：改动后条数下降时同步调低，上升时先确认是否必要
+SCENARIOS = (
+    Scenario('index', 'get', lambda run: '/', max_sql=10, max_redis=1),
+    Scenario('index_search', 'get', lambda run: '/?q=budget&tag=%d&page=2' % run.tag.id, max_sql=10, max_redis=1),
+    # 文章详情含相关文章（RelatedArticle 一次索引查询）
+    Scenario('article_detail', 'get', lambda run: f'/article/{run.article.id}/', max_sql=5, max_redis=1),
+    Scenario('article_detail_login', 'get', lambda run: f'/article/{run.article.id}/',
+             max_sql=5, max_redis=2, login='reader'),
+    Scenario('article_comment', 'post', lambda run: f'/article/{run.article.id}/', max_sql=5, max_redis=1,
+             data=lambda run: {'content': '预算检查评论', 'parent_id': run.reply.id}, login='reader', status=302),
+    # 游客评论会创建/更新游客用户：用户缓存失效（INCR + PUBLISH）
+    Scenario('article_comment_guest', 'post', lambda run: f'/article/{run.article.id}/', max_sql=6, max_redis=2,
+             data=lambda run: {'content': '游客评论', 'guest_name': '游客'}, status=302),
+    Scenario('profile', 'get', lambda run: '/profile/', max_sql=6, max_redis=1, login='author'),
+    Scenario('dashboard', 'get', lambda run: '/dashboard/', max_sql=4, max_redis=0),
+    Scenario('login_page', 'get', lambda run: '/login/', max_sql=0, max_redis=0),
+    # 登录会更新 last_login：用户缓存失效（INCR + PUBLISH）
+    Scenario('login', 'post', lambda run: '/login/', max_sql=3, max_redis=5,
+             data=lambda run: {'username_or_email': run.reader.username, 'password': PASSWORD}),
+    # 输入提示只读进程内索引；每秒最多一次 GET 版本号
+    Scenario('suggest', 'get', lambda run: '/suggest/?q=budget', max_sql=0, max_redis=1,
+             warm=lambda run: suggest_index.rebuild()),
+    Scenario('register_page', 'get', lambda run: '/register/', max_sql=0, max_redis=0),
+    Scenario('register', 'post', lambda run: '/register/', max_sql=5, max_redis=2,
+             data=lambda run: {
+                 'username': f'new_{run.label}', 'email': f'new_{run.label}@example.com', 'captcha': '1234',
+                 'password': PASSWORD, 're_password': PASSWORD,
+             }),
+)
+
+
+class BudgetRun:
+    """一轮检查用到的数据：每轮新建用户、使用不同的客户端 IP，避免去重/限流状态串到下一轮。"""
+
+    def __init__(self, label, index):
+        self.label = label
+        self.ip = f'10.77.{index}.1'
+        self.author = self._user(f'budget_author_{label}', superuser=True)
+        self.reader = self._user(f'budget_reader_{label}')
+        CaptchaModel.objects.update_or_create(email=f'new_{label}@example.com', defaults={'captcha': '1234'})
+        self.tag = self.article = self.reply = None
+
+    @staticmethod
+    def _user(username, superuser=False):
+        return User.objects.create_user(
+            username=username, email=f'{username}@example.com', password=PASSWORD,
+            is_superuser=superuser, is_staff=superuser,
+        )
+
+    def seed(self, articles, comments_per_article, tags):
+        """按固定形状造数据：每篇文章挂 tags 个标签，评论一半是根评论、一半是楼中楼回复。"""
+        tag_objs = [Tag.objects.create(name=f'budget_{self.label}_{i}') for i in range(tags)]
+        commenters = [self.reader, self.author]
+        for i in range(articles):
+            article = Article.objects.create(
+                title=f'budget {self.label} {i}', content='budget **markdown**', user=self.author, status=1,
+            )
+            article.tags.set(tag_objs)
+            root = None
+            for j in range(comments_per_article):
+                parent = root if j % 2 else None
+                comment = Comment.objects.create(
+                    article=article, user=commenters[j % 2], content=f'comment {j}', parent=parent,
+                    root=parent, depth=1 if parent else 0,
+                )
+                root = comment if parent is None else root
+                self.reply = comment
+            Article.objects.filter(id=article.id).update(comment_count=comments_per_article)
+            self.article = article
+        self.tag = tag_objs[0]
+
+
+def seed_common():
+    # 首页会 get_or_create 当天的访问记录，提前建好，避免第一轮多出 INSERT
+    DailyVisitStat.objects.get_or_create(date=date.today())
+
+
+_COLUMNS_RE = re.compile(r'SELECT (DISTINCT )?(?:(?:"?\w+"?\.)?"\w+"(?:, )?)+ FROM')
+
+
+def normalize(sql):
+    """参数替换为 ?、IN 列表合并、纯字段列表缩写为 …，同一语句不同参数归为一类。"""
+    sql = _COLUMNS_RE.sub(lambda m: f"SELECT {m.group(1) or ''}… FROM", sql)
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    return re.sub(r'IN \((\?, )*\?\)', 'IN (...)', sql)
+
+
+def run_scenario(scenario, run):
+    client = Client(REMOTE_ADDR=run.ip, HTTP_USER_AGENT=f'budget-{run.label}')
+    if scenario.login:
+        user = getattr(run, scenario.login)
+        client.force_login(user)
+        # force_login 会更新 last_login 并使用户缓存失效；预热后统计的是登录后常规请求的开销
+        reference_cache.get_user(user.pk)
+    if scenario.warm:
+        scenario.warm(run)
+    path = scenario.path(run)
+    data = scenario.data(run) if scenario.data else None
+    # 延后任务在 request_finished 里同步执行，计入本次请求
+    with override_settings(DEFERRED_INLINE=True), CaptureQueriesContext(connection) as captured:
+        if scenario.method == 'post':
+            response = client.post(path, data)
+        else:
+            response = client.get(path)
+    server_timing = response.get('Server-Timing', '')
+    match = _REDIS_RE.search(server_timing)
+    result = Result(
+        status=response.status_code,
+        queries=[query['sql'] for query in captured.captured_queries if not _TRANSACTION_RE.match(query['sql'])],
+        redis=int(match.group(1)) if match else 0,
+    )
+    if result.status != scenario.status:
+        result.failures.append(f'状态码 {result.status}，期望 {scenario.status}')
+    if len(result.queries) > scenario.max_sql:
+        result.failures.append(f'SQL {len(result.queries)} 条，超出预算 {scenario.max_sql}')
+    if result.redis > scenario.max_redis:
+        result.failures.append(f'Redis {result.redis} 次，超出预算 {scenario.max_redis}')
+    return result
+
+
+def format_queries(queries):
+    """按归一化语句合并计数，重复的语句排在前面。"""
+    counts = Counter(normalize(sql) for sql in queries)
+    return '\n'.join(f'  {count:>3} × {sql}' for sql, count in counts.most_common())
+
+
+def format_growth(small, large):
+    """两轮之间条数有变化的语句：小数据集次数 -> 大数据集次数。"""
+    before = Counter(normalize(sql) for sql in small)
+    after = Counter(normalize(sql) for sql in large)
+    changed = sorted(
+        (sql for sql in before.keys() | after.keys() if before[sql] != after[sql]),
+        key=lambda sql: before[sql] - after[sql],
+    )
+    return '\n'.join(f'  {before[sql]:>3} -> {after[sql]:<3} × {sql}' for sql in changed)
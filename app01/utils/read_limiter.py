@@ -1,20 +1,11 @@
 import hashlib
 import time
 
-import redis
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
-
-def _get_client():
-    return redis.Redis(
-        host=getattr(settings, 'REDIS_HOST', '127.0.0.1'),
-        port=getattr(settings, 'REDIS_PORT', 6379),
-        db=getattr(settings, 'REDIS_DB', 0),
-        password=getattr(settings, 'REDIS_PASSWORD', None),
-        decode_responses=True,
-        socket_connect_timeout=1,
-        socket_timeout=1,
-    )
+from app01.utils.bot_detect import skip_counting
+from app01.utils.limiter_backends import get_backend
 
 
 def _get_request_ip(request):
@@ -35,22 +26,45 @@ def _build_identity(request):
     return f"anon:{ip}:{ua_hash}"
 
 
+def _session_fallback(request, article_id, ttl):
+    # 后端（Redis）不可用时，降级到 session 防刷，避免功能中断
+    now_ts = int(time.time())
+    history = request.session.get('article_read_history', {})
+    last_ts = int(history.get(str(article_id), 0))
+    if now_ts - last_ts < ttl:
+        return False
+    history[str(article_id)] = now_ts
+    request.session['article_read_history'] = history
+    return True
+
+
+def _read_key(request, article_id):
+    return f"blog:article:read:{article_id}:{_build_identity(request)}"
+
+
 def should_increase_read_count(request, article_id):
+    # 爬虫/监控请求不计数，也不写去重 key
+    if skip_counting(request):
+        return False
+    ttl = int(getattr(settings, 'ARTICLE_READ_LIMIT_SECONDS', 3600))
+    redis_key = _read_key(request, article_id)
+
+    try:
+        # set-if-absent：key 不存在才写入并设置过期时间
+        return get_backend().set_if_absent(redis_key, ttl)
+    except Exception:
+        return _session_fallback(request, article_id, ttl)
+
+
+async def ashould_increase_read_count(request, article_id):
+    """异步视图版本；调用前需已解析 request.user。"""
+    if skip_counting(request):
+        return False
     ttl = int(getattr(settings, 'ARTICLE_READ_LIMIT_SECONDS', 3600))
-    identity = _build_identity(request)
-    redis_key = f"blog:article:read:{article_id}:{identity}"
+    redis_key = _read_key(request, article_id)
 
     try:
-        # set nx ex：key 不存在才写入并设置过期时间
-        created = _get_client().set(redis_key, 1, ex=ttl, nx=True)
-        return bool(created)
+        return await get_backend().aset_if_absent(redis_key, ttl)
     except Exception:
-        # Redis 不可用时，降级到 session 防刷，避免功能中断
-        now_ts = int(time.time())
-        history = request.session.get('article_read_history', {})
-        last_ts = int(history.get(str(article_id), 0))
-        if now_ts - last_ts < ttl:
-            return False
-        history[str(article_id)] = now_ts
-        request.session['article_read_history'] = history
-        return True
+        # session 可能需要查库，放到线程里执行
+        return await sync_to_async(_session_fallback)(request, article_id, ttl)
@@ -0,0 +1,92 @@
+import time
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from app01.utils import metrics
+
+# 进程内共享连接池：避免每次请求都新建 TCP 连接
+_pool = None
+# REDIS_CLIENT_FACTORY 创建的替身客户端（如 fakeredis），进程内单例
+_factory_client = None
+# redis.asyncio 连接池：连接绑定创建时的事件循环，只在 ASGI（单事件循环）下使用
+_async_pool = None
+_async_factory_client = None
+
+
+def _connection_kwargs():
+    return {
+        'host': getattr(settings, 'REDIS_HOST', '127.0.0.1'),
+        'port': getattr(settings, 'REDIS_PORT', 6379),
+        'db': getattr(settings, 'REDIS_DB', 0),
+        'password': getattr(settings, 'REDIS_PASSWORD', None),
+        'decode_responses': True,
+        'socket_connect_timeout': 1,
+        'socket_timeout': 1,
+        'max_connections': getattr(settings, 'REDIS_MAX_CONNECTIONS', 50),
+    }
+
+
+@lru_cache(maxsize=None)
+def _timed(cls):
+    """给客户端类加上命令计时，计入当前请求的 Redis 统计。"""
+    class TimedRedis(cls):
+        def execute_command(self, *args, **options):
+            start = time.perf_counter()
+            try:
+                return super().execute_command(*args, **options)
+            finally:
+                metrics.record_redis(time.perf_counter() - start)
+
+    TimedRedis.__name__ = TimedRedis.__qualname__ = f'Timed{cls.__name__}'
+    return TimedRedis
+
+
+@lru_cache(maxsize=None)
+def _async_timed(cls):
+    class AsyncTimedRedis(cls):
+        async def execute_command(self, *args, **options):
+            start = time.perf_counter()
+            try:
+                return await super().execute_command(*args, **options)
+            finally:
+                metrics.record_redis(time.perf_counter() - start)
+
+    AsyncTimedRedis.__name__ = AsyncTimedRedis.__qualname__ = f'Timed{cls.__name__}'
+    return AsyncTimedRedis
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool(**_connection_kwargs())
+    return _pool
+
+
+def get_client():
+    """从共享连接池获取 Redis 客户端（客户端对象本身很轻量）。"""
+    global _factory_client
+    factory_path = getattr(settings, 'REDIS_CLIENT_FACTORY', None)
+    if factory_path:
+        # 本地验证时可指向 Redis 替身，例如 'fakeredis.FakeRedis'
+        if _factory_client is None:
+            _factory_client = _timed(import_string(factory_path))(decode_responses=True)
+        return _factory_client
+    return _timed(redis.Redis)(connection_pool=get_pool())
+
+
+def get_async_client():
+    """redis.asyncio 客户端，供异步视图使用。"""
+    global _async_pool, _async_factory_client
+    factory_path = getattr(settings, 'REDIS_ASYNC_CLIENT_FACTORY', None)
+    if factory_path:
+        # 本地验证时可指向异步替身，例如 'fakeredis.FakeAsyncRedis'
+        if _async_factory_client is None:
+            _async_factory_client = _async_timed(import_string(factory_path))(decode_responses=True)
+        return _async_factory_client
+    if _async_pool is None:
+        _async_pool = aioredis.ConnectionPool(**_connection_kwargs())
+    return _async_timed(aioredis.Redis)(connection_pool=_async_pool)
@@ -0,0 +1,123 @@
+"""
+Redis 会话引擎：SESSION_ENGINE = 'app01.utils.redis_session'
+
+- 会话存放在 Redis（共享连接池），过期交给 key 的 TTL
+- Redis 不可用时降级到数据库会话表；Redis 未命中时也会回查一次数据库，
+  兼容切换引擎前的旧会话和故障期间写入数据库的会话
+- 写回规避：序列化后的内容与加载时一致就不再写回
+- 懒加载沿用 SessionBase：不访问 session 的请求不产生任何存储 I/O
+"""
+import hashlib
+
+import redis
+from django.conf import settings
+from django.contrib.sessions.backends.base import CreateError, SessionBase
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+
+from app01.utils.redis_client import get_client
+
+KEY_PREFIX = 'blog:session:'
+
+
+class SessionStore(SessionBase):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # 最近一次加载/写入时的内容摘要，用来判断是否需要写回
+        self._stored_digest = None
+
+    def _redis_key(self, session_key=None):
+        return KEY_PREFIX + (session_key or self._get_or_create_session_key())
+
+    def _digest(self, session_dict):
+        # 注意不能比较 encode() 的结果：签名里带时间戳，每次都不一样
+        return hashlib.sha1(self.serializer().dumps(session_dict)).hexdigest()
+
+    def _db_store(self):
+        store = DBSessionStore(self._session_key)
+        store._session_cache = getattr(self, '_session_cache', {})
+        return store
+
+    def _load_from_db(self):
+        store = DBSessionStore(self._session_key)
+        session_dict = store.load()
+        # 数据库中也不存在（或已过期）时，DBSessionStore 会把 key 置空
+        self._session_key = store._session_key
+        return session_dict
+
+    def load(self):
+        try:
+            data = get_client().get(self._redis_key(self._session_key))
+        except redis.RedisError:
+            return self._load_from_db()
+
+        if data is None:
+            session_dict = self._load_from_db()
+            if session_dict:
+                # 迁移到 Redis：请求结束时由中间件写回
+                self.modified = True
+            return session_dict
+
+        session_dict = self.decode(data)
+        self._stored_digest = self._digest(session_dict)
+        return session_dict
+
+    def exists(self, session_key):
+        try:
+            return bool(get_client().exists(self._redis_key(session_key)))
+        except redis.RedisError:
+            return DBSessionStore().exists(session_key)
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        session_dict = self._get_session(no_load=must_create)
+        digest = self._digest(session_dict)
+        ttl = self.get_expiry_age()
+
+        try:
+            client = get_client()
+            if not must_create and digest == self._stored_digest:
+                # 内容未变化：跳过写回；需要滑动过期时只刷新 TTL
+                if getattr(settings, 'SESSION_SAVE_EVERY_REQUEST', False):
+                    client.expire(self._redis_key(), ttl)
+                return
+            created = client.set(
+                self._redis_key(),
+                self.encode(session_dict),
+                ex=ttl,
+                nx=must_create,
+            )
+        except redis.RedisError:
+            self._db_store().save(must_create=must_create)
+            return
+
+        if must_create and not created:
+            raise CreateError
+        self._stored_digest = digest
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        try:
+            get_client().delete(self._redis_key(session_key))
+        except redis.RedisError:
+            pass
+        # 同步清理数据库里可能存在的旧会话/降级会话
+        DBSessionStore().delete(session_key)
+
+    @classmethod
+    def clear_expired(cls):
+        # Redis 依赖 TTL 自动过期，这里只清理数据库中的降级会话
+        DBSessionStore.clear_expired()
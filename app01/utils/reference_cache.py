@@ -0,0 +1,63 @@
+"""
+标签列表和用户对象的两级缓存（见 tiered_cache）。
+
+- get_all_tags()：发布/编辑页的标签列表、PubArticleForm 的标签校验
+- CachedModelBackend：认证中间件每个请求按 session 里的用户 id 加载用户，改为从缓存取
+- 保存/删除时通过信号失效（App01Config.ready 中导入本模块注册信号），事务提交后才广播
+- 加载一律读主库：从库有延迟，失效后立刻从从库加载可能把旧数据重新缓存一小时
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app01.models import Tag
+from app01.utils.db_router import PRIMARY
+from app01.utils.tiered_cache import TieredCache
+
+tag_cache = TieredCache('tags', ttl=3600, local_ttl=300)
+user_cache = TieredCache('users', ttl=3600, local_ttl=60, maxsize=5000)
+
+ALL_TAGS = 'all'
+
+
+def get_all_tags():
+    """全部标签，按名称排序。"""
+    return tag_cache.get(ALL_TAGS, lambda: list(Tag.objects.using(PRIMARY).order_by('name')))
+
+
+def get_user(user_id):
+    """按 id 取用户，不存在返回 None。"""
+    return user_cache.get(
+        str(user_id), lambda: get_user_model()._default_manager.using(PRIMARY).filter(pk=user_id).first(),
+    )
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        user = get_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def _invalidate_tags(sender, **kwargs):
+    transaction.on_commit(lambda: tag_cache.invalidate(ALL_TAGS))
+
+
+def invalidate_users(user_ids):
+    """QuerySet.update() 不触发信号，批量修改用户后调用，事务提交后失效。"""
+    keys = [str(pk) for pk in user_ids]
+
+    def invalidate():
+        for key in keys:
+            user_cache.invalidate(key)
+
+    transaction.on_commit(invalidate)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def _invalidate_user(sender, instance, **kwargs):
+    key = str(instance.pk)
+    transaction.on_commit(lambda: user_cache.invalidate(key))
+
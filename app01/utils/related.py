@@ -0,0 +1,234 @@
+"""
+相关文章推荐：按标签相似度预计算每篇已发布文章的前 RELATED_ARTICLES_TOP_K 篇，存入 RelatedArticle。
+
+- 文章 × 标签构成稀疏 0/1 矩阵 A，A·Aᵀ 即两两共有的标签数，
+  再按 RELATED_ARTICLES_METRIC 换算：jaccard = 共有 / (标签数之和 - 共有)，cosine = 共有 / sqrt(标签数之积)
+- 安装了 NumPy/SciPy 时按行分块做稀疏矩阵乘法并向量化取前 K；否则用标签倒排表逐篇计数，结果相同
+- 相似度相同时新文章（id 大）在前；没有共同标签的文章不推荐
+- 文章发布/撤回、逻辑删除、改标签时（事务提交后）只重算受影响的文章：
+  它自己、和它有共同标签的文章、原来推荐了它的文章；只改标题、正文等不重算。
+  同一请求内的多次修改合并为一次，在响应发出之后执行（deferred.defer_batched）
+- python manage.py build_related 全量重建（上线、批量导入数据后执行）
+"""
+import heapq
+import logging
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from app01.models import Article, RelatedArticle
+from app01.utils.deferred import defer_batched
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # NumPy/SciPy 为可选依赖，未安装时用纯 Python 倒排表计算
+    np = sparse = None
+
+logger = logging.getLogger(__name__)
+
+ArticleTag = Article.tags.through
+# 稀疏矩阵乘法每次处理的文章行数，限制 A[rows]·Aᵀ 的内存
+BLOCK_ROWS = 1000
+# 按 id 过滤时每条 SQL 的 IN 列表长度
+IN_CHUNK = 500
+
+
+def _top_k():
+    return int(getattr(settings, 'RELATED_ARTICLES_TOP_K', 5))
+
+
+def _metric():
+    return getattr(settings, 'RELATED_ARTICLES_METRIC', 'jaccard')
+
+
+def _chunks(values, size=IN_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _links(article_ids=None):
+    """已发布文章的 (文章 id, 标签 id)；传入 article_ids 时只取这些文章。"""
+    queryset = ArticleTag.objects.filter(article__status=1, article__is_delete=False)
+    if article_ids is None:
+        return list(queryset.values_list('article_id', 'tag_id'))
+    links = []
+    for chunk in _chunks(article_ids):
+        links.extend(queryset.filter(article_id__in=chunk).values_list('article_id', 'tag_id'))
+    return links
+
+
+def _score(common, size_a, size_b, metric):
+    if metric == 'cosine':
+        return common / math.sqrt(size_a * size_b)
+    return common / (size_a + size_b - common)
+
+
+def _neighbours_python(links, targets, k, metric):
+    tags_of = defaultdict(set)
+    postings = defaultdict(list)
+    for article_id, tag_id in links:
+        tags_of[article_id].add(tag_id)
+        postings[tag_id].append(article_id)
+
+    result = {}
+    for article_id in targets:
+        common = Counter()
+        for tag_id in tags_of.get(article_id, ()):
+            common.update(postings[tag_id])
+        common.pop(article_id, None)
+        size = len(tags_of.get(article_id, ()))
+        scored = (
+            (_score(count, size, len(tags_of[other]), metric), other) for other, count in common.items()
+        )
+        result[article_id] = [(other, score) for score, other in heapq.nlargest(k, scored)]
+    return result
+
+
+def _neighbours_numpy(links, targets, k, metric):
+    if not links:
+        return {article_id: [] for article_id in targets}
+    pairs = np.array(links, dtype=np.int64)
+    ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+    _, cols = np.unique(pairs[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.int32), (rows, cols)), shape=(len(ids), cols.max() + 1)
+    )
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    transposed = matrix.T.tocsc()
+
+    result = {article_id: [] for article_id in targets}
+    target_rows = np.flatnonzero(np.isin(ids, np.fromiter(targets, dtype=np.int64)))
+    for start in range(0, len(target_rows), BLOCK_ROWS):
+        block = target_rows[start:start + BLOCK_ROWS]
+        common = (matrix[block] @ transposed).tocoo()
+        source = block[common.row]
+        other = common.col
+        count = common.data.astype(np.float64)
+        mask = source != other
+        source, other, count = source[mask], other[mask], count[mask]
+        if metric == 'cosine':
+            score = count / np.sqrt(sizes[source] * sizes[other])
+        else:
+            score = count / (sizes[source] + sizes[other] - count)
+        # 每行按相似度降序、id 降序排列，取行内前 k 个
+        order = np.lexsort((-ids[other], -score, source))
+        source, other, score = source[order], other[order], score[order]
+        rank = np.arange(len(source)) - np.searchsorted(source, source, side='left')
+        keep = rank < k
+        for row, col, value in zip(source[keep], other[keep], score[keep]):
+            result[int(ids[row])].append((int(ids[col]), float(value)))
+    return result
+
+
+def compute(links, targets, k=None, metric=None):
+    """返回 {文章 id: [(相关文章 id, 相似度), ...]}，targets 中没有标签的文章为空列表。"""
+    k = _top_k() if k is None else k
+    metric = metric or _metric()
+    if metric not in ('jaccard', 'cosine'):
+        raise ValueError(f'不支持的相似度：{metric}')
+    if np is None:
+        return _neighbours_python(links, targets, k, metric)
+    return _neighbours_numpy(links, targets, k, metric)
+
+
+def _save(neighbours, replace_all=False):
+    rows = [
+        RelatedArticle(article_id=article_id, related_id=related_id, score=score, rank=rank)
+        for article_id, items in neighbours.items()
+        for rank, (related_id, score) in enumerate(items)
+    ]
+    with transaction.atomic():
+        if replace_all:
+            RelatedArticle.objects.all().delete()
+        else:
+            for chunk in _chunks(neighbours):
+                RelatedArticle.objects.filter(article_id__in=chunk).delete()
+        RelatedArticle.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def rebuild_all():
+    """全量重建，返回 (文章数, 推荐条数)。"""
+    links = _links()
+    targets = {article_id for article_id, _ in links}
+    neighbours = compute(links, targets)
+    return len(targets), _save(neighbours, replace_all=True)
+
+
+def refresh_articles(article_ids):
+    """文章标签或状态变化后，只重算受影响的文章。"""
+    article_ids = set(article_ids)
+    if not article_ids:
+        return
+    try:
+        affected = set(article_ids)
+        for chunk in _chunks(article_ids):
+            affected.update(RelatedArticle.objects.filter(related_id__in=chunk).values_list('article_id', flat=True))
+        tag_ids = {tag_id for _, tag_id in _links(article_ids)}
+        for chunk in _chunks(tag_ids):
+            affected.update(
+                ArticleTag.objects.filter(tag_id__in=chunk, article__status=1, article__is_delete=False)
+                .values_list('article_id', flat=True)
+            )
+        # 受影响文章的候选只可能是和它们有共同标签的文章；候选的完整标签数用于计算相似度
+        affected_tags = {tag_id for _, tag_id in _links(affected)}
+        candidates = set(affected)
+        for chunk in _chunks(affected_tags):
+            candidates.update(
+                ArticleTag.objects.filter(tag_id__in=chunk, article__status=1, article__is_delete=False)
+                .values_list('article_id', flat=True)
+            )
+        _save(compute(_links(candidates), affected))
+    except DatabaseError as exc:
+        # 推荐失败不影响已经提交的修改，下次变化或 build_related 时会重新计算
+        logger.warning('相关文章更新失败：%s', exc)
+
+
+def _schedule_refresh(article_ids):
+    transaction.on_commit(lambda: defer_batched(refresh_articles, article_ids))
+
+
+# 推荐只取决于标签、发布状态和是否删除
+_STATE_FIELDS = ('status', 'is_delete')
+
+
+@receiver(pre_save, sender=Article)
+def _remember_state(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    if instance.pk is None or raw:
+        instance._related_changed = True
+    elif update_fields is not None and not set(update_fields) & set(_STATE_FIELDS):
+        instance._related_changed = False
+    else:
+        old = Article.objects.using(using).filter(pk=instance.pk).values_list(*_STATE_FIELDS).first()
+        instance._related_changed = old != tuple(getattr(instance, name) for name in _STATE_FIELDS)
+
+
+@receiver(post_save, sender=Article)
+def _article_saved(sender, instance, **kwargs):
+    if getattr(instance, '_related_changed', True):
+        _schedule_refresh([instance.pk])
+
+
+@receiver(post_delete, sender=Article)
+def _article_deleted(sender, instance, **kwargs):
+    _schedule_refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=ArticleTag)
+def _article_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # 从标签一侧修改（tag.articles.add）时 pk_set 是文章 id
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action != 'post_clear' and not pk_set:
+        # tags.set() 标签没变时也会发出空的 post_add
+        return
+    if not reverse:
+        _schedule_refresh([instance.pk])
+    elif pk_set:
+        _schedule_refresh(list(pk_set))
@@ -0,0 +1,171 @@
+"""
+搜索框输入提示：进程内有序数组前缀索引，请求时只做二分查找，不查数据库。
+
+- 索引内容：已发布文章标题、全部标签名；统一转小写、合并空白
+- 文章标题除整句外，从每个词（按空白和标点切分）开始的后缀也作为键，输入标题中间的词也能匹配
+- 文章和标签各一组有序数组，bisect 定位前缀区间后顺序取前 limit 条
+- 首次查询时同步构建（worker 预热时可提前调用 get_index）；之后的重建在后台线程进行，期间继续使用旧索引
+- 更新：文章/标签保存、删除（事务提交后）标记本进程索引过期，并对 Redis 版本号 INCR；
+  其它进程每 SUGGEST_CHECK_INTERVAL 秒最多读一次版本号，发现变化后重建；
+  Redis 不可用时索引最长 SUGGEST_MAX_AGE 秒后重建
+"""
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+
+import redis
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app01.models import Article, Tag
+from app01.utils.db_router import PRIMARY
+from app01.utils.redis_client import get_client
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'blog:suggest:version'
+# 标题切词：空白和常见中英文标点
+_SPLIT_RE = re.compile(r'[\s\-_/|,.;:!?()\[\]{}<>"\'，。、；：！？（）【】《》“”‘’]+')
+
+
+def _normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+def _title_keys(title):
+    """整句和从每个词开始的后缀。"""
+    normalized = _normalize(title)
+    keys = {normalized}
+    for match in _SPLIT_RE.finditer(normalized):
+        rest = normalized[match.end():]
+        if rest:
+            keys.add(rest)
+    return keys
+
+
+def _sorted_index(items):
+    """items: [(键集合, 条目)] -> (有序键列表, 对应条目列表)；键相同的保持 items 原顺序。"""
+    pairs = sorted(((key, entry) for keys, entry in items for key in keys), key=lambda pair: pair[0])
+    return [key for key, _ in pairs], [entry for _, entry in pairs]
+
+
+def _scan(keys, entries, prefix, limit):
+    result = []
+    seen = set()
+    index = bisect_left(keys, prefix)
+    while index < len(keys) and len(result) < limit and keys[index].startswith(prefix):
+        entry = entries[index]
+        index += 1
+        if entry[0] not in seen:
+            seen.add(entry[0])
+            result.append(entry)
+    return result
+
+
+class SuggestIndex:
+    def __init__(self):
+        # (文章键, 文章条目, 标签键, 标签条目)，整体替换，读取时无需加锁
+        self._data = None
+        self._version = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._stale = False
+        self._lock = threading.Lock()
+        self._builder = None
+
+    def _read_version(self):
+        try:
+            return get_client().get(VERSION_KEY) or '0'
+        except redis.RedisError:
+            return None
+
+    def rebuild(self):
+        # 先读版本号再加载：加载期间发生的修改会让版本号再变，下次检查时重建
+        version = self._read_version()
+        self._stale = False
+        articles = (
+            Article.objects.using(PRIMARY)
+            .filter(status=1, is_delete=False)
+            .order_by('-read_count')
+            .values_list('id', 'title')
+        )
+        article_keys, article_entries = _sorted_index(
+            (_title_keys(title), (pk, title)) for pk, title in articles
+        )
+        tags = Tag.objects.using(PRIMARY).values_list('id', 'name')
+        tag_keys, tag_entries = _sorted_index(({_normalize(name)}, (pk, name)) for pk, name in tags)
+        self._data = (article_keys, article_entries, tag_keys, tag_entries)
+        self._version = version
+        self._built_at = self._checked_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            self._stale = True
+            logger.exception('搜索提示索引重建失败')
+        finally:
+            # 后台线程自己的数据库连接，用完即关
+            connections.close_all()
+
+    def _refresh_if_needed(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < getattr(settings, 'SUGGEST_CHECK_INTERVAL', 1):
+            return
+        self._checked_at = now
+        if not self._stale and now - self._built_at < getattr(settings, 'SUGGEST_MAX_AGE', 300):
+            version = self._read_version()
+            if version is None or version == self._version:
+                return
+        with self._lock:
+            if self._builder is not None and self._builder.is_alive():
+                return
+            self._builder = threading.Thread(target=self._rebuild_in_background, name='suggest-index', daemon=True)
+            self._builder.start()
+
+    def get_index(self):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self.rebuild()
+        else:
+            self._refresh_if_needed()
+        return self._data
+
+    def search(self, keyword, limit=8):
+        """返回 (文章 [(id, 标题)], 标签 [(id, 名称)])。"""
+        prefix = _normalize(keyword)
+        if not prefix:
+            return [], []
+        article_keys, article_entries, tag_keys, tag_entries = self.get_index()
+        return (
+            _scan(article_keys, article_entries, prefix, limit),
+            _scan(tag_keys, tag_entries, prefix, limit),
+        )
+
+    def mark_stale(self):
+        self._stale = True
+
+
+suggest_index = SuggestIndex()
+
+
+def publish_change():
+    """本进程索引标记过期并通知其它进程；QuerySet.update() 批量修改文章后需手动调用。"""
+    suggest_index.mark_stale()
+    try:
+        get_client().incr(VERSION_KEY)
+    except redis.RedisError as exc:
+        # 其它进程的索引只能等 SUGGEST_MAX_AGE 后重建
+        logger.warning('搜索提示版本号更新失败：%s', exc)
+
+
+@receiver([post_save, post_delete], sender=Article)
+@receiver([post_save, post_delete], sender=Tag)
+def _index_changed(sender, **kwargs):
+    # 阅读量、评论数用 update() 更新，不触发信号；保存文章一般意味着标题或状态变化
+    transaction.on_commit(publish_change)
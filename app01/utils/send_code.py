@@ -1,8 +1,11 @@
 from app01.models import CaptchaModel # 验证码表
 from django.http import JsonResponse
 from django.core.mail import send_mail  # django自带的发送邮件模块
+import logging
 import random
 
+logger = logging.getLogger(__name__)
+
 def send_email_captcha(request):
     # ?email=xxx
     email = request.GET.get('email')
@@ -30,6 +33,10 @@ def send_email_captcha(request):
         3. recipient_list 收件人列表（该列表可以同时发送给多个收件人）
         4. from_email 发件人邮箱（默认是settings.EMAIL_HOST_USER）,由于没有默认值参数，需要设置None，自动使用settings.EMAIL_HOST_USER
     """
-    send_mail("乃荣博客注册验证码", captcha, recipient_list=[email], fail_silently=False, from_email=None)
-    print('成功发送邮箱:', captcha)
+    # 在请求内发送：用户在等这封邮件，SMTP 失败要告诉用户，不能放到 defer() 里静默丢掉
+    try:
+        send_mail("乃荣博客注册验证码", captcha, recipient_list=[email], fail_silently=False, from_email=None)
+    except Exception:
+        logger.exception('验证码邮件发送失败：%s', email)
+        return JsonResponse({'code': 500, 'msg': '验证码邮件发送失败，请稍后重试!'})
     return JsonResponse({'code': 200, 'msg': '验证码发送成功!'})
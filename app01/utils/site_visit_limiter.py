@@ -1,19 +1,10 @@
 import time
 
-import redis
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
-
-def _get_client():
-    return redis.Redis(
-        host=getattr(settings, 'REDIS_HOST', '127.0.0.1'),
-        port=getattr(settings, 'REDIS_PORT', 6379),
-        db=getattr(settings, 'REDIS_DB', 0),
-        password=getattr(settings, 'REDIS_PASSWORD', None),
-        decode_responses=True,
-        socket_connect_timeout=1,
-        socket_timeout=1,
-    )
+from app01.utils.bot_detect import skip_counting
+from app01.utils.limiter_backends import get_backend
 
 
 def _get_request_ip(request):
@@ -23,22 +14,40 @@ def _get_request_ip(request):
     return (request.META.get('REMOTE_ADDR') or '').strip() or 'unknown'
 
 
+def _session_fallback(request, ip, ttl):
+    # 后端（Redis）故障时降级 session 去重
+    now_ts = int(time.time())
+    history = request.session.get('site_visit_history', {})
+    last_ts = int(history.get(ip, 0))
+    if now_ts - last_ts < ttl:
+        return False
+    history[ip] = now_ts
+    request.session['site_visit_history'] = history
+    return True
+
+
 def should_count_site_visit(request):
-    """按 IP 1 小时去重统计访问。"""
+    """按 IP 1 小时去重统计访问；爬虫/监控请求不计数，也不写去重 key。"""
+    if skip_counting(request):
+        return False
     ttl = int(getattr(settings, 'SITE_VISIT_LIMIT_SECONDS', 3600))
     ip = _get_request_ip(request)
     redis_key = f"blog:site:visit:{ip}"
     try:
-        created = _get_client().set(redis_key, 1, ex=ttl, nx=True)
-        return bool(created)
+        return get_backend().set_if_absent(redis_key, ttl)
     except Exception:
-        # Redis 故障时降级 session 去重
-        now_ts = int(time.time())
-        history = request.session.get('site_visit_history', {})
-        last_ts = int(history.get(ip, 0))
-        if now_ts - last_ts < ttl:
-            return False
-        history[ip] = now_ts
-        request.session['site_visit_history'] = history
-        return True
+        return _session_fallback(request, ip, ttl)
 
+
+async def ashould_count_site_visit(request):
+    """异步视图版本。"""
+    if skip_counting(request):
+        return False
+    ttl = int(getattr(settings, 'SITE_VISIT_LIMIT_SECONDS', 3600))
+    ip = _get_request_ip(request)
+    redis_key = f"blog:site:visit:{ip}"
+    try:
+        return await get_backend().aset_if_absent(redis_key, ttl)
+    except Exception:
+        # session 可能需要查库，放到线程里执行
+        return await sync_to_async(_session_fallback)(request, ip, ttl)
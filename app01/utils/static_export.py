@@ -0,0 +1,220 @@
+"""
+静态导出：用现有模板把已发布文章页、标签页（第一页）和首页渲染成 HTML，
+流量高峰时由 Nginx/CDN 直接发送，不经过 Django。
+
+- 输出到 STATIC_EXPORT_ROOT：index.html、tag/<id>.html（即 /?tag=<id>）、article/<id>/index.html
+- 增量：.manifest.json 记录每篇文章的指纹（update_time、作者、标签、评论数与最新评论时间、相关文章、模板内容），
+  指纹没变且文件存在的文章不重新渲染；所有页面写入前比较内容，没变的不写文件、不进清除列表
+- 文章页分批在进程池里渲染（fork 出的子进程各自连接数据库），首页和标签页在主进程渲染
+- 本次写入或删除的页面地址写入 purge.txt，交给 CDN 清除缓存
+- 登录状态、CSRF token、阅读量/访问量计数由 static/js/live_state.js 调用 live_state 接口补全；
+  评论等 POST 请求、分页和搜索仍由 Django 处理
+
+静态资源（CSS/JS）变化后模板内容不变，需要 export_static --force 全量重新渲染。
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.db.models import Count, Max
+from django.template.loader import get_template, render_to_string
+from django.test import RequestFactory
+from django.urls import reverse
+
+from app01.models import Article, Comment, RelatedArticle, Tag
+from app01.utils.feeds import write_if_changed
+from app01.views import ArticleDetailView, IndexView
+
+MANIFEST_NAME = '.manifest.json'
+PURGE_NAME = 'purge.txt'
+# 每个子进程任务渲染的文章数
+BATCH_SIZE = 50
+ARTICLE_TEMPLATES = ('base.html', 'article_detail.html')
+
+
+def export_root():
+    return str(getattr(settings, 'STATIC_EXPORT_ROOT', os.path.join(settings.BASE_DIR, 'export')))
+
+
+def _published():
+    return Article.objects.filter(status=1, is_delete=False)
+
+
+def _file_path(url):
+    """页面地址 -> 导出文件相对路径：/ -> index.html，/?tag=3 -> tag/3.html，/article/5/ -> article/5/index.html。"""
+    if url.startswith('/?tag='):
+        return f'tag/{url[len("/?tag="):]}.html'
+    return url.lstrip('/') + 'index.html'
+
+
+def _render_page(url, template_name, context, query=None):
+    request = RequestFactory().get(url.split('?')[0], query or {})
+    request.user = AnonymousUser()
+    # csrf_token 为 NOTPROVIDED 时 {% csrf_token %} 不输出，由 live_state.js 补上
+    context.update(static_export=True, csrf_token='NOTPROVIDED')
+    html = render_to_string(template_name, context, request)
+    return write_if_changed(os.path.join(export_root(), _file_path(url)), html)
+
+
+def _remove_page(url):
+    try:
+        os.unlink(os.path.join(export_root(), _file_path(url)))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _template_digest():
+    digest = hashlib.sha1()
+    for name in ARTICLE_TEMPLATES:
+        with open(get_template(name).origin.name, 'rb') as fp:
+            digest.update(fp.read())
+    return digest.hexdigest()
+
+
+def _fingerprints(article_ids, template_digest):
+    """一组文章的指纹：任何会改变文章页内容的字段变化，指纹都会变化。"""
+    parts = {
+        pk: [str(update_time), username or '', str(avatar or '')]
+        for pk, update_time, username, avatar in _published().filter(id__in=article_ids).values_list(
+            'id', 'update_time', 'user__username', 'user__avatar'
+        )
+    }
+    tag_rows = Article.tags.through.objects.filter(article_id__in=parts).order_by('article_id', 'tag_id')
+    for article_id, tag_id in tag_rows.values_list('article_id', 'tag_id'):
+        parts[article_id].append(f't{tag_id}')
+    comment_rows = (
+        Comment.objects.filter(article_id__in=parts)
+        .values('article_id')
+        .annotate(total=Count('id'), last_id=Max('id'), last_update=Max('update_time'))
+        .order_by()
+    )
+    for row in comment_rows:
+        parts[row['article_id']].append(f'c{row["total"]}:{row["last_id"]}:{row["last_update"]}')
+    related_rows = RelatedArticle.objects.filter(article_id__in=parts).order_by('article_id', 'rank')
+    for article_id, related_id, related_update in related_rows.values_list(
+        'article_id', 'related_id', 'related__update_time'
+    ):
+        parts[article_id].append(f'r{related_id}:{related_update}')
+    return {
+        pk: hashlib.sha1('|'.join([template_digest, *values]).encode('utf-8')).hexdigest()
+        for pk, values in parts.items()
+    }
+
+
+def _render_articles(article_ids):
+    """渲染一批文章页（在子进程中执行），返回内容有变化的页面地址。"""
+    written = []
+    articles = _published().filter(id__in=article_ids).select_related('user').prefetch_related('tags')
+    for article in articles:
+        url = reverse('article_detail', args=[article.id])
+        comment_queryset = ArticleDetailView._get_comment_queryset(article)
+        context = {
+            'article': article,
+            'comment_queryset': comment_queryset,
+            'root_comment_items': ArticleDetailView._build_comment_tree(comment_queryset),
+            'related_articles': [link.related for link in ArticleDetailView._get_related_queryset(article)],
+        }
+        if _render_page(url, 'article_detail.html', context):
+            written.append(url)
+    return written
+
+
+def _render_lists():
+    """渲染首页和各标签第一页，删除已没有文章的标签页。返回 (写入的地址, 删除的地址)。"""
+    written = []
+    pages = [('/', None, {})]
+    tag_ids = set(Tag.objects.filter(articles__status=1, articles__is_delete=False).values_list('id', flat=True))
+    for tag in Tag.objects.filter(id__in=tag_ids):
+        pages.append((f'/?tag={tag.id}', tag, {'tag': tag.id}))
+    for url, tag, query in pages:
+        context = IndexView._build_list_context('', tag, 1, RequestFactory().get('/', query).GET)
+        if _render_page(url, 'index.html', context, query):
+            written.append(url)
+
+    removed = []
+    tag_dir = os.path.join(export_root(), 'tag')
+    if os.path.isdir(tag_dir):
+        for name in os.listdir(tag_dir):
+            tag_id, ext = os.path.splitext(name)
+            if ext == '.html' and tag_id.isdigit() and int(tag_id) not in tag_ids:
+                url = f'/?tag={tag_id}'
+                if _remove_page(url):
+                    removed.append(url)
+    return written, removed
+
+
+def _load_manifest():
+    try:
+        with open(os.path.join(export_root(), MANIFEST_NAME), encoding='utf-8') as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return {}
+
+
+def _fork_context():
+    # 子进程依赖 fork 继承已初始化的 Django；不支持 fork 的平台退回主进程渲染
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def export_site(workers=None, force=False, chunk_size=1000, on_progress=None):
+    """
+    增量导出全站，返回 (重新渲染的文章数, 清除列表)。
+    force=True 时忽略上次的指纹，全部重新渲染（内容没变的文件仍然不会重写）。
+    """
+    os.makedirs(export_root(), exist_ok=True)
+    previous = _load_manifest().get('articles', {})
+    template_digest = _template_digest()
+
+    fingerprints = {}
+    ids = list(_published().order_by('id').values_list('id', flat=True))
+    for start in range(0, len(ids), chunk_size):
+        fingerprints.update(_fingerprints(ids[start:start + chunk_size], template_digest))
+
+    stale = [
+        pk for pk, fingerprint in fingerprints.items()
+        if force or previous.get(str(pk)) != fingerprint
+        or not os.path.exists(os.path.join(export_root(), _file_path(reverse('article_detail', args=[pk]))))
+    ]
+    batches = [stale[start:start + BATCH_SIZE] for start in range(0, len(stale), BATCH_SIZE)]
+
+    changed = []
+    workers = workers or os.cpu_count() or 1
+    context = _fork_context()
+    if workers > 1 and len(batches) > 1 and context is not None:
+        # 子进程不能共用父进程的数据库连接
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for urls in pool.map(_render_articles, batches):
+                changed.extend(urls)
+                if on_progress:
+                    on_progress(len(changed))
+    else:
+        for batch in batches:
+            changed.extend(_render_articles(batch))
+            if on_progress:
+                on_progress(len(changed))
+
+    # 已下线（删除、转草稿）的文章删除导出文件
+    for pk in previous:
+        if int(pk) not in fingerprints:
+            url = reverse('article_detail', args=[int(pk)])
+            if _remove_page(url):
+                changed.append(url)
+
+    written, removed = _render_lists()
+    changed.extend(written + removed)
+
+    manifest = {'articles': {str(pk): fingerprint for pk, fingerprint in fingerprints.items()}}
+    write_if_changed(os.path.join(export_root(), MANIFEST_NAME), json.dumps(manifest, sort_keys=True))
+    site_url = getattr(settings, 'SITE_URL', 'http://127.0.0.1:8000').rstrip('/')
+    purge_list = [site_url + url for url in changed]
+    write_if_changed(os.path.join(export_root(), PURGE_NAME), ''.join(url + '\n' for url in purge_list))
+    return len(stale), purge_list
@@ -0,0 +1,219 @@
+"""
+静态资源构建与服务。
+
+构建（python manage.py collectstatic）：
+- BundleFileSystemFinder：第三方目录（editor.md）只收集 STATIC_BUNDLES 白名单内的文件
+- CompressedManifestStaticFilesStorage：文件名带内容哈希 + staticfiles.json 清单，
+  并为文本类资源预先生成 .gz / .br
+
+服务（PrecompressedStaticMiddleware）：
+- 启动后首次请求时扫描一次 STATIC_ROOT 建立索引，之后每个请求只查字典
+- 按 Accept-Encoding 直接返回预压缩文件，不做任何实时压缩
+- 带哈希的文件名返回一年 immutable 缓存头
+"""
+import gzip
+import json
+import mimetypes
+import os
+import posixpath
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.contrib.staticfiles.utils import matches_patterns
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags
+
+try:
+    import brotli
+except ImportError:  # Brotli 为可选依赖，未安装时只生成 .gz
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.eot', '.ttf', '.otf',
+)
+# 压缩后至少小 5% 才保留
+MIN_COMPRESS_RATIO = 0.95
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def _in_bundle(path):
+    path = path.replace('\\', '/')
+    for prefix, patterns in getattr(settings, 'STATIC_BUNDLES', {}).items():
+        if path.startswith(prefix + '/'):
+            return matches_patterns(path[len(prefix) + 1:], patterns)
+    return True
+
+
+class BundleFileSystemFinder(FileSystemFinder):
+    """collectstatic 时按 STATIC_BUNDLES 白名单裁剪第三方目录。"""
+
+    def list(self, ignore_patterns):
+        for path, storage in super().list(ignore_patterns):
+            if _in_bundle(path):
+                yield path, storage
+
+
+def _write_compressed(full_path):
+    with open(full_path, 'rb') as fp:
+        data = fp.read()
+    limit = len(data) * MIN_COMPRESS_RATIO
+    variants = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', lambda raw: brotli.compress(raw, quality=11)))
+    for suffix, compress in variants:
+        compressed = compress(data)
+        target = full_path + suffix
+        if len(compressed) < limit:
+            with open(target, 'wb') as fp:
+                fp.write(compressed)
+        elif os.path.exists(target):
+            os.remove(target)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # 动态加载的资源（如 editor.md 按目录拼接的 lib 路径）不在清单里时回退原文件名
+    manifest_strict = False
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def safe_converter(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                # 第三方 CSS 引用了不存在的文件（如 editormd.min.css 里的 ".../fonts"），保留原样
+                return matchobj.group(0)
+
+        return safe_converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        # 原文件名和带哈希的文件名都会被访问（前者来自动态加载），两者都预压缩
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                _write_compressed(self.path(name))
+
+
+class _StaticIndex:
+    """STATIC_ROOT 的内存索引：相对路径 -> {编码: (文件路径, 大小, ETag)}。"""
+
+    def __init__(self, root):
+        self.files = {}
+        self.immutable = set()
+        if not root or not os.path.isdir(root):
+            return
+        manifest_path = os.path.join(root, 'staticfiles.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as fp:
+                self.immutable = set(json.load(fp).get('paths', {}).values())
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(full_path, root).replace(os.sep, '/')
+                if rel_path.endswith(('.gz', '.br')) and os.path.exists(full_path[:-3]):
+                    continue
+                entry = {'': self._stat(full_path)}
+                for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+                    if os.path.exists(full_path + suffix):
+                        entry[encoding] = self._stat(full_path + suffix)
+                self.files[rel_path] = entry
+
+    @staticmethod
+    def _stat(path):
+        stat = os.stat(path)
+        return path, stat.st_size, f'"{int(stat.st_mtime):x}-{stat.st_size:x}"', stat.st_mtime
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        if any(p.strip() in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000') for p in parts[1:]):
+            continue
+        accepted.add(coding)
+    return accepted
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def _etag_matches(if_none_match, etag):
+    """If-None-Match 判断：支持 ETag 列表和 *，按弱比较（忽略 W/ 前缀）。"""
+    tags = parse_etags(if_none_match)
+    if tags == ['*']:
+        return True
+    return _strip_weak(etag) in {_strip_weak(tag) for tag in tags}
+
+
+class PrecompressedStaticMiddleware:
+    """直接从 STATIC_ROOT 返回预压缩的静态文件；不在索引中的请求交给后续处理。同步/异步两用。"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.static_url = settings.STATIC_URL
+        self.max_age = int(getattr(settings, 'STATIC_MAX_AGE', 3600))
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = _StaticIndex(str(settings.STATIC_ROOT or ''))
+        return self._index
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.static_url):
+            response = self.serve(request)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # serve 只查内存索引、打开文件，直接在事件循环里执行
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.static_url):
+            response = self.serve(request)
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def serve(self, request):
+        rel_path = posixpath.normpath(request.path_info[len(self.static_url):]).lstrip('/')
+        entry = self.index.files.get(rel_path)
+        if entry is None:
+            return None
+
+        accepted = _accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        encoding = next((enc for enc in ('br', 'gzip') if enc in entry and enc in accepted), '')
+        path, _, etag, mtime = entry[encoding]
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and _etag_matches(if_none_match, etag):
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(rel_path)
+            response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+            # FileResponse 会按打开的文件名（如 app.css.br）加 Content-Disposition，静态资源不需要
+            del response['Content-Disposition']
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(mtime)
+        if len(entry) > 1:
+            response['Vary'] = 'Accept-Encoding'
+        if rel_path in self.index.immutable:
+            response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response['Cache-Control'] = f'public, max-age={self.max_age}'
+        return response
@@ -0,0 +1,193 @@
+"""
+两级缓存：进程内 LRU + Redis，用于标签、用户等数据量小、读多写少的数据。
+
+- 读：先查本进程 LRU（命中时没有任何 I/O），再 MGET Redis 中的版本号和值，都未命中才调用 loader
+- Redis 中的值带版本戳：invalidate() 对该 key 的版本号 INCR，旧版本的值自动作废；
+  加载期间数据被修改时，回填的旧值带的是旧版本号，同样不会被读到
+- 失效广播：invalidate() 之后 PUBLISH 到 CHANNEL，每个进程的订阅线程收到后删除本地条目；
+  订阅断线重连时清空全部本地条目（可能漏掉了消息），本地条目另有 local_ttl 兜底
+- 本地保存的是序列化后的内容，每次取出都是新对象，调用方修改返回值不会影响缓存
+- Redis 不可用时直接调用 loader，不写本地缓存（此时无法广播失效）
+
+数据修改后需要调用 invalidate()（一般挂在 post_save / post_delete 信号上）；
+QuerySet.update() 等不触发信号的批量修改需要自己调用。
+"""
+import base64
+import logging
+import os
+import pickle
+import socket
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+
+from app01.utils.redis_client import get_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'blog:tcache:'
+CHANNEL = 'blog:tcache:invalidate'
+
+# namespace -> TieredCache，订阅线程按消息里的 namespace 分发
+_caches = {}
+_subscriber = None
+_subscriber_lock = threading.Lock()
+
+
+def _origin():
+    # 消息来源：本进程发出的失效在 invalidate() 里已经同步处理过，订阅线程收到后跳过
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _dumps(value):
+    return base64.b64encode(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)).decode('ascii')
+
+
+def _loads(payload):
+    return pickle.loads(base64.b64decode(payload))
+
+
+class TieredCache:
+    def __init__(self, namespace, ttl=3600, local_ttl=60, maxsize=1000):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.maxsize = maxsize
+        # key -> (过期时刻, 序列化内容)
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        # 每收到一次失效加一：加载期间发生过失效时，加载结果不写入本地
+        self._generation = 0
+        _caches[namespace] = self
+
+    def _redis_keys(self, key):
+        return f'{KEY_PREFIX}ver:{self.namespace}:{key}', f'{KEY_PREFIX}{self.namespace}:{key}'
+
+    def _get_local(self, key):
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return item[1]
+
+    def _set_local(self, key, payload, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._local[key] = (time.monotonic() + self.local_ttl, payload)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def get(self, key, loader):
+        if not getattr(settings, 'TIERED_CACHE_ENABLED', True):
+            return loader()
+        payload = self._get_local(key)
+        if payload is not None:
+            return _loads(payload)
+
+        _ensure_subscriber()
+        generation = self._generation
+        version_key, value_key = self._redis_keys(key)
+        client = get_client()
+        try:
+            version, stored = client.mget(version_key, value_key)
+        except redis.RedisError:
+            return loader()
+        version = version or '0'
+        if stored is not None:
+            stamp, _, payload = stored.partition(':')
+            if stamp == version:
+                self._set_local(key, payload, generation)
+                return _loads(payload)
+
+        value = loader()
+        payload = _dumps(value)
+        try:
+            client.set(value_key, f'{version}:{payload}', ex=self.ttl)
+        except redis.RedisError:
+            return value
+        self._set_local(key, payload, generation)
+        return value
+
+    def invalidate(self, key):
+        self.drop_local(key)
+        version_key, _ = self._redis_keys(key)
+        try:
+            client = get_client()
+            client.incr(version_key)
+            client.publish(CHANNEL, f'{_origin()}\n{self.namespace}\n{key}')
+        except redis.RedisError as exc:
+            # 其它进程的本地条目只能等 local_ttl 过期
+            logger.warning('缓存失效广播失败 %s:%s：%s', self.namespace, key, exc)
+
+    def drop_local(self, key):
+        with self._lock:
+            self._generation += 1
+            self._local.pop(key, None)
+
+    def clear_local(self):
+        with self._lock:
+            self._generation += 1
+            self._local.clear()
+
+
+def _listen(ready):
+    connected = True
+    while True:
+        pubsub = None
+        try:
+            pubsub = get_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            # 订阅建立之前的消息收不到，先清空本地条目
+            for cache in list(_caches.values()):
+                cache.clear_local()
+            ready.set()
+            connected = True
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message is None or message['type'] != 'message':
+                    continue
+                origin, _, rest = message['data'].partition('\n')
+                namespace, _, key = rest.partition('\n')
+                cache = _caches.get(namespace)
+                if cache is not None and origin != _origin():
+                    cache.drop_local(key)
+        except Exception as exc:
+            # Redis 持续不可用时只在断开的那一次记日志
+            if connected:
+                logger.warning('缓存失效订阅中断，稍后重连：%s', exc)
+            connected = False
+            ready.set()
+            for cache in list(_caches.values()):
+                cache.clear_local()
+            time.sleep(1)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+
+def _ensure_subscriber():
+    """每个进程一个订阅线程（按 pid 判断，兼容 uWSGI 等 fork 出来的 worker）。"""
+    global _subscriber
+    if _subscriber is not None and _subscriber[0] == os.getpid():
+        return
+    with _subscriber_lock:
+        if _subscriber is not None and _subscriber[0] == os.getpid():
+            return
+        ready = threading.Event()
+        thread = threading.Thread(target=_listen, args=(ready,), name='tiered-cache-subscriber', daemon=True)
+        thread.start()
+        _subscriber = (os.getpid(), thread)
+        # 等订阅建立（及其清空本地条目）或失败后再继续，避免刚写入的本地条目被清掉
+        ready.wait(1.0)
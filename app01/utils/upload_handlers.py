@@ -0,0 +1,151 @@
+"""
+图片上传的流式处理器。
+
+在 Django 接收请求体的过程中就做校验：
+- 请求体 / 文件超过该接口的大小上限，立即中断，不再读取剩余数据
+- 首个数据块的魔数不是 jpg/png/gif/webp，立即中断
+- 边接收边计算 SHA-256，写入与 media/ 同一文件系统的临时文件，
+  file_store 保存时直接 rename 到最终位置，不再复制第二份
+
+用法：在 CSRF 校验读取请求体之前设置
+    request.upload_handlers = [ImageUploadHandler(request, 'avatar', 5 * 1024 * 1024)]
+解析完成后检查 handler.error。
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+# multipart 边界、字段头和普通表单字段的余量
+MULTIPART_OVERHEAD = 64 * 1024
+
+# 魔数 -> 扩展名
+_MAGIC_NUMBERS = (
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+)
+_HEADER_SIZE = 12
+
+
+def detect_image_ext(header):
+    """根据文件头判断真实图片类型，返回扩展名；无法识别返回 None。"""
+    for magic, ext in _MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return ext
+    # WebP：RIFF????WEBP
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+
+def upload_temp_dir():
+    """上传临时目录：放在 MEDIA_ROOT 下，保证与最终位置在同一文件系统，可直接 rename。"""
+    path = str(getattr(settings, 'UPLOAD_TEMP_DIR', os.path.join(settings.MEDIA_ROOT, '.upload_tmp')))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class HashedUploadedFile(UploadedFile):
+    """接收时已算好哈希、已落盘的上传文件。"""
+
+    def __init__(self, path, name, content_type, size, charset, sha256, image_ext):
+        super().__init__(open(path, 'rb'), name, content_type, size, charset)
+        self.sha256 = sha256
+        self.image_ext = image_ext
+        self._path = path
+
+    def temporary_file_path(self):
+        return self._path
+
+    def close(self):
+        try:
+            return self.file.close()
+        finally:
+            if os.path.exists(self._path):
+                os.remove(self._path)
+
+
+class ImageUploadHandler(FileUploadHandler):
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None, field_name='file', max_size=10 * 1024 * 1024):
+        super().__init__(request)
+        self.upload_field_name = field_name
+        self.max_size = max_size
+        self.error = ''
+        self._too_large = False
+        self._tmp = None
+
+    def _abort(self, message):
+        self.error = message
+        self._cleanup()
+        # connection_reset：不再读取（exhaust）剩余请求体
+        raise StopUpload(connection_reset=True)
+
+    def _cleanup(self):
+        if self._tmp is not None:
+            self._tmp.close()
+            if os.path.exists(self._tmp.name):
+                os.remove(self._tmp.name)
+            self._tmp = None
+
+    def _size_message(self):
+        return f'文件大小不能超过 {self.max_size // (1024 * 1024)}MB'
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # 声明的请求体已经超限：前面的普通字段（csrf/action）照常解析，到文件部分再中断
+        self._too_large = content_length > self.max_size + MULTIPART_OVERHEAD
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        if field_name != self.upload_field_name:
+            self._abort('不支持的上传字段')
+        if self._too_large:
+            self._abort(self._size_message())
+        self._digest = hashlib.sha256()
+        self._size = 0
+        self._header = b''
+        self._image_ext = None
+        self._tmp = tempfile.NamedTemporaryFile(dir=upload_temp_dir(), suffix='.upload', delete=False)
+
+    def _check_header(self, raw_data, final=False):
+        if self._image_ext is not None:
+            return
+        self._header += raw_data[:_HEADER_SIZE - len(self._header)]
+        if len(self._header) < _HEADER_SIZE and not final:
+            return
+        self._image_ext = detect_image_ext(self._header)
+        if self._image_ext is None:
+            self._abort('文件内容不是 jpg/png/gif/webp 图片')
+
+    def receive_data_chunk(self, raw_data, start):
+        self._size += len(raw_data)
+        if self._size > self.max_size:
+            self._abort(self._size_message())
+        self._check_header(raw_data)
+        self._digest.update(raw_data)
+        self._tmp.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        self._check_header(b'', final=True)
+        self._tmp.close()
+        uploaded = HashedUploadedFile(
+            path=self._tmp.name,
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            charset=self.charset,
+            sha256=self._digest.hexdigest(),
+            image_ext=self._image_ext,
+        )
+        self._tmp = None
+        return uploaded
+
+    def upload_interrupted(self):
+        self._cleanup()
@@ -0,0 +1,182 @@
+"""
+worker 预热：进程启动时（blog/wsgi.py、blog/asgi.py 导入阶段）提前完成首个请求才会做的准备工作，
+预热结束后 worker 才开始接收请求。
+
+- urls：填充 URL 解析器的反查表，编译全部路由正则
+- templates：编译 WARMUP_TEMPLATES（模板缓存加载器，DEBUG=False 时生效）
+- db：连接各数据库（确认可用、加载驱动）
+- redis：建立 Redis 连接池的第一个连接
+- caches：标签两级缓存、搜索提示索引、爬虫 UA 分类器、延后任务线程池
+- pages：用最新数据渲染一次首页和最新文章的详情页（ORM 查询编译、模板标签/过滤器、markdown 等）
+
+某一步失败只记 warning 日志并继续，不阻止 worker 启动（Redis 等不可用时各功能本来就有降级）。
+blog/asgi.py 在事件循环中导入时改在单独线程执行（见 warm_up_outside_loop）。
+结束时关闭数据库连接：uWSGI 未开 lazy-apps 时预热在 master 进程执行，fork 出的 worker 不能共用连接；
+CONN_MAX_AGE=0 时连接也会在首个请求开始时关闭。
+
+/readyz：本进程预热完成、且必需步骤（WARMUP_REQUIRED_STEPS，默认 db）都成功时返回 200 和各步骤耗时，
+否则返回 503（供负载均衡/容器就绪探针使用）。必需步骤失败后每次探测都重试一次，恢复后即转为就绪。
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.http import JsonResponse, QueryDict
+from django.template.loader import get_template, render_to_string
+from django.test import RequestFactory
+from django.urls import URLPattern, get_resolver
+from django.views.decorators.cache import never_cache
+
+from app01.models import Article
+from app01.utils import bot_detect, deferred
+from app01.utils.redis_client import get_client
+from app01.utils.reference_cache import get_all_tags
+from app01.utils.search_suggest import suggest_index
+from app01.views import ArticleDetailView, IndexView
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATES = ('base.html', 'index.html', 'article_detail.html')
+DEFAULT_REQUIRED_STEPS = ('db',)
+
+# 本进程的预热结果
+_state = {'ready': False, 'steps': {}, 'errors': {}}
+
+
+def _walk_patterns(patterns):
+    for pattern in patterns:
+        # 路由正则在首次访问 .regex 时编译
+        pattern.pattern.regex
+        if not isinstance(pattern, URLPattern):
+            _walk_patterns(pattern.url_patterns)
+
+
+def _warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    _walk_patterns(resolver.url_patterns)
+
+
+def _warm_templates():
+    for name in getattr(settings, 'WARMUP_TEMPLATES', DEFAULT_TEMPLATES):
+        get_template(name)
+
+
+def _warm_db():
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def _warm_redis():
+    get_client().ping()
+
+
+def _warm_caches():
+    get_all_tags()
+    suggest_index.get_index()
+    bot_detect.get_classifier()
+    deferred.start_workers()
+
+
+def _warm_pages():
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    context = IndexView._build_list_context('', None, 1, QueryDict())
+    render_to_string('index.html', context, request)
+
+    article = (
+        Article.objects.filter(status=1, is_delete=False)
+        .select_related('user').prefetch_related('tags')
+        .order_by('-id').first()
+    )
+    if article is not None:
+        comment_queryset = ArticleDetailView._get_comment_queryset(article)
+        render_to_string('article_detail.html', {
+            'article': article,
+            'root_comment_items': ArticleDetailView._build_comment_tree(comment_queryset),
+            'related_articles': [link.related for link in ArticleDetailView._get_related_queryset(article)],
+        }, request)
+
+
+STEPS = (
+    ('urls', _warm_urls),
+    ('templates', _warm_templates),
+    ('db', _warm_db),
+    ('redis', _warm_redis),
+    ('caches', _warm_caches),
+    ('pages', _warm_pages),
+)
+
+
+def warm_up():
+    """执行全部预热步骤，返回 {'ready', 'steps'（步骤 -> 毫秒）, 'errors'（步骤 -> 错误）}。"""
+    steps = {}
+    errors = {}
+    started = time.perf_counter()
+    for name, func in STEPS:
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as exc:
+            errors[name] = f'{type(exc).__name__}: {exc}'
+            logger.warning('预热步骤 %s 失败：%s', name, exc)
+        steps[name] = round((time.perf_counter() - start) * 1000, 1)
+    try:
+        connections.close_all()
+    except Exception as exc:
+        errors['close'] = f'{type(exc).__name__}: {exc}'
+        logger.warning('预热后关闭数据库连接失败：%s', exc)
+    steps['total'] = round((time.perf_counter() - started) * 1000, 1)
+    _state.update(ready=True, steps=steps, errors=errors)
+    logger.info('worker 预热完成，耗时 %sms', steps['total'])
+    return dict(_state)
+
+
+def warm_up_outside_loop():
+    """
+    blog/asgi.py 使用：uvicorn 在运行中的事件循环里导入应用，此时同步调用 ORM 会抛 SynchronousOnlyOperation，
+    放到单独线程执行并等待完成；没有运行中的事件循环时直接执行。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return warm_up()
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(warm_up).result()
+
+
+def is_ready():
+    return _state['ready'] or not getattr(settings, 'WARMUP_ENABLED', True)
+
+
+def failed_required_steps():
+    """重试预热时失败的必需步骤，返回仍然失败的步骤名；重试成功的从 errors 中移除。"""
+    required = getattr(settings, 'WARMUP_REQUIRED_STEPS', DEFAULT_REQUIRED_STEPS)
+    failed = []
+    for name, func in STEPS:
+        if name not in required or name not in _state['errors']:
+            continue
+        try:
+            func()
+        except Exception as exc:
+            _state['errors'][name] = f'{type(exc).__name__}: {exc}'
+            failed.append(name)
+        else:
+            del _state['errors'][name]
+    return failed
+
+
+@never_cache
+def ready_view(request):
+    """就绪探针：本进程预热完成前、或必需步骤（如数据库）不可用时返回 503。"""
+    if not is_ready():
+        return JsonResponse({'ready': False}, status=503)
+    failed = failed_required_steps()
+    return JsonResponse(
+        {'ready': not failed, 'failed': failed, 'steps': _state['steps'], 'errors': _state['errors']},
+        status=503 if failed else 200,
+    )
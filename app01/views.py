@@ -2,36 +2,40 @@
 import json
 import hashlib
 from datetime import date, timedelta
-from uuid import uuid4
 
 from django.contrib import auth
 from django.conf import settings
-from django.core.files.storage import default_storage
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Count, ExpressionWrapper, F, IntegerField, Q, Sum
 from django.db.models.functions import TruncDate
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.http import HttpResponseForbidden
-
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
 from app01.docorators import login
 from app01.models import *  # noqa: F403
 from app01.my_forms.article_forms import PubArticleForm
 from app01.my_forms.user_forms import LoginForm, RegisterForm
+from app01.utils import bulk_articles, drafts, file_store, image_variants
+from app01.utils.deferred import defer
 from app01.utils.read_limiter import should_increase_read_count
+from app01.utils.reference_cache import get_all_tags
+from app01.utils.search_suggest import suggest_index
 from app01.utils.permissions import is_site_owner
+from app01.utils.upload_handlers import ImageUploadHandler
 from app01.utils.site_visit_limiter import should_count_site_visit
 
 
 class IndexView(View):
-    def get(self, request):
-        # 搜索关键词（标题/正文）
-        search_keyword = request.GET.get('q', '').strip()
-        # 标签过滤参数
-        tag_id = request.GET.get('tag', '').strip()
-
+    @staticmethod
+    def _get_article_queryset(search_keyword, selected_tag):
         # 文章基础查询：仅展示未删除且已发布的文章，按发布时间倒序
         article_queryset = Article.objects.filter(
             is_delete=False,
@@ -43,17 +47,16 @@ class IndexView(View):
                 Q(title__icontains=search_keyword) | Q(content__icontains=search_keyword)
             )
 
-        selected_tag = None
-        if tag_id.isdigit():
-            selected_tag = Tag.objects.filter(id=int(tag_id)).first()
-            if selected_tag:
-                article_queryset = article_queryset.filter(tags=selected_tag)
+        if selected_tag:
+            article_queryset = article_queryset.filter(tags=selected_tag)
 
         # 多对多筛选后去重，避免同一文章重复显示
-        article_queryset = article_queryset.distinct()
+        return article_queryset.distinct()
 
+    @staticmethod
+    def _get_hot_tags():
         # 热门标签：按关联文章数排序
-        hot_tags = Tag.objects.annotate(
+        return Tag.objects.annotate(
             article_total=Count(
                 'articles',
                 filter=Q(articles__is_delete=False, articles__status=1),
@@ -61,8 +64,10 @@ class IndexView(View):
             )
         ).filter(article_total__gt=0).order_by('-article_total', 'name')[:12]
 
+    @staticmethod
+    def _get_hot_articles():
         # 热门文章 Top5：按 read_count + comment_count * 2 排序
-        hot_articles = Article.objects.filter(
+        return Article.objects.filter(
             is_delete=False,
             status=1,
         ).annotate(
@@ -72,29 +77,55 @@ class IndexView(View):
             )
         ).order_by('-hot_score', '-create_time')[:5]
 
-        # 站点统计
-        article_total = Article.objects.filter(is_delete=False, status=1).count()
-        user_total = User.objects.count()
-        today = date.today()
-        today_visit_obj, _ = DailyVisitStat.objects.get_or_create(date=today)
-        # 今日访问：按 IP 1 小时去重后再计数
-        if should_count_site_visit(request):
-            DailyVisitStat.objects.filter(id=today_visit_obj.id).update(visit_count=F('visit_count') + 1)
-        today_visit_obj.refresh_from_db(fields=['visit_count'])
-        today_visit_count = today_visit_obj.visit_count
-        total_visit_count = DailyVisitStat.objects.aggregate(total=Sum('visit_count'))['total'] or 0
-
+    @classmethod
+    def _build_list_context(cls, search_keyword, selected_tag, page_number, query_params):
+        """文章列表、侧栏和站点总数（不含访问统计），静态导出复用。"""
+        article_queryset = cls._get_article_queryset(search_keyword, selected_tag)
         # Paginator：分页器，每页 6 条
         paginator = Paginator(article_queryset, 6)
-        # GET 参数 page 指定页码，不合法时自动回退为第一页
-        page_obj = paginator.get_page(request.GET.get('page', 1))
-
         # 分页时保留除 page 之外的查询参数（如 q/tag）
-        query_params = request.GET.copy()
+        query_params = query_params.copy()
         query_params.pop('page', None)
-        querystring = query_params.urlencode()
+        return {
+            'search_keyword': search_keyword,
+            'selected_tag': selected_tag,
+            # GET 参数 page 指定页码，不合法时自动回退为第一页
+            'page_obj': paginator.get_page(page_number),
+            'querystring': query_params.urlencode(),
+            'hot_tags': cls._get_hot_tags(),
+            'hot_articles': cls._get_hot_articles(),
+            # 站点统计
+            'article_total': Article.objects.filter(is_delete=False, status=1).count(),
+            'user_total': User.objects.count(),
+        }
 
-        return render(request, 'index.html', locals())
+    def get(self, request):
+        # 搜索关键词（标题/正文）
+        search_keyword = request.GET.get('q', '').strip()
+        # 标签过滤参数
+        tag_id = request.GET.get('tag', '').strip()
+
+        selected_tag = None
+        if tag_id.isdigit():
+            selected_tag = Tag.objects.filter(id=int(tag_id)).first()
+        context = self._build_list_context(search_keyword, selected_tag, request.GET.get('page', 1), request.GET)
+        context['today_visit_count'], context['total_visit_count'] = count_site_visit(request)
+        return render(request, 'index.html', context)
+
+
+def increase_read_count(article_id):
+    """阅读量 +1（F 表达式：在数据库层执行 read_count = read_count + 1，避免并发覆盖）。"""
+    Article.objects.filter(id=article_id).update(read_count=F('read_count') + 1)
+
+
+def count_site_visit(request):
+    """今日访问按 IP 1 小时去重后计数，返回 (今日访问, 总访问量)。"""
+    today_visit_obj, _ = DailyVisitStat.objects.get_or_create(date=date.today())
+    if should_count_site_visit(request):
+        DailyVisitStat.objects.filter(id=today_visit_obj.id).update(visit_count=F('visit_count') + 1)
+    today_visit_obj.refresh_from_db(fields=['visit_count'])
+    total_visit_count = DailyVisitStat.objects.aggregate(total=Sum('visit_count'))['total'] or 0
+    return today_visit_obj.visit_count, total_visit_count
 
 
 class ArticleDetailView(View):
@@ -114,6 +145,15 @@ class ArticleDetailView(View):
         # select_related 预取 user/parent/root，减少模板里访问关联字段时的 SQL 次数
         return article.comments.select_related('user', 'parent__user', 'root').order_by('create_time')
 
+    @staticmethod
+    def _get_related_queryset(article):
+        # 预计算的相关文章（见 app01/utils/related.py），按 (article, rank) 索引一次查询
+        return RelatedArticle.objects.filter(
+            article_id=article.id,
+            related__is_delete=False,
+            related__status=1,
+        ).select_related('related').order_by('rank')
+
     @staticmethod
     def _build_comment_tree(comment_queryset):
         # 按“根评论 -> 子评论列表”组织数据，便于模板按楼层折叠显示
@@ -163,12 +203,12 @@ class ArticleDetailView(View):
         article = self._get_article(article_id)
         # 1 小时限流：登录用户按 user_id，匿名用户按 IP+UA 去重
         if should_increase_read_count(request, article.id):
-            # F 表达式：在数据库层执行 read_count = read_count + 1，避免并发覆盖
-            Article.objects.filter(id=article.id).update(read_count=F('read_count') + 1)
-        # refresh_from_db：把内存中的 article 字段刷新为数据库最新值
-        article.refresh_from_db(fields=['read_count'])
+            # 计数 UPDATE 放到响应发出之后执行；页面直接显示 +1 后的值
+            defer(increase_read_count, article.id)
+            article.read_count += 1
         comment_queryset = self._get_comment_queryset(article)
         root_comment_items = self._build_comment_tree(comment_queryset)
+        related_articles = [link.related for link in self._get_related_queryset(article)]
         return render(request, 'article_detail.html', locals())
 
     def post(self, request, article_id):
@@ -203,7 +243,7 @@ class ArticleDetailView(View):
         depth = 0
         if parent_id:
             # 仅允许回复当前文章下的评论，防止越权关联
-            parent_comment = article.comments.filter(id=parent_id).first()
+            parent_comment = article.comments.select_related('root').filter(id=parent_id).first()
             if not parent_comment:
                 comment_error = '回复目标评论不存在'
                 comment_queryset = self._get_comment_queryset(article)
@@ -214,16 +254,18 @@ class ArticleDetailView(View):
             root_comment = parent_comment.root if parent_comment.root_id else parent_comment
             depth = parent_comment.depth + 1
 
-        Comment.objects.create(
-            article=article,
-            user=comment_user,
-            content=content,
-            parent=parent_comment,
-            root=root_comment,
-            depth=depth,
-        )
-        # 新增评论后同步更新文章评论计数
-        Article.objects.filter(id=article.id).update(comment_count=F('comment_count') + 1)
+        # 评论和计数在同一事务中提交，reconcile_counters 按快照校正时两者总是一致
+        with transaction.atomic():
+            Comment.objects.create(
+                article=article,
+                user=comment_user,
+                content=content,
+                parent=parent_comment,
+                root=root_comment,
+                depth=depth,
+            )
+            # 新增评论后同步更新文章评论计数
+            Article.objects.filter(id=article.id).update(comment_count=F('comment_count') + 1)
         return redirect('article_detail', article_id=article.id)
 
     def http_method_not_allowed(self, request, *args, **kwargs):
@@ -236,8 +278,16 @@ class PubArticleView(View):
     def get(self, request):
         if not is_site_owner(request.user):
             return HttpResponseForbidden("无权限访问发布页面")
-        # 展示发布页时读取所有标签供勾选
-        tags = Tag.objects.all()
+        # 展示发布页时读取所有标签供勾选（两级缓存，通常不查库）
+        tags = get_all_tags()
+        # 未发布的自动保存草稿：继续编辑最近的一篇
+        draft = None
+        draft_article = Article.objects.filter(
+            user=request.user, status=0, is_delete=False,
+        ).order_by('-update_time').first()
+        if draft_article:
+            draft = drafts.restore(draft_article, list(draft_article.tags.values_list('id', flat=True)))
+            draft['article_id'] = draft_article.id
         return render(request, 'pub_article.html', locals())
 
     @login.is_login_method
@@ -255,12 +305,25 @@ class PubArticleView(View):
         content = pub_article_form.cleaned_data['content']
         tags = pub_article_form.cleaned_data['tags']
         user = request.user
-        # create：创建文章记录
-        article = Article.objects.create(
-            title=title,
-            content=content,
-            user=user,
-        )
+        draft_id = request.POST.get('draft_id', '').strip()
+        article = None
+        if draft_id.isdigit():
+            article = Article.objects.filter(id=int(draft_id), user=user, status=0, is_delete=False).first()
+        if article is None:
+            # create：创建文章记录
+            article = Article.objects.create(
+                title=title,
+                content=content,
+                user=user,
+            )
+        else:
+            # 发布自动保存的草稿：同一行改为已发布，发布时间为现在
+            article.title = title
+            article.content = content
+            article.status = 1
+            article.create_time = timezone.now()
+            article.save(update_fields=['title', 'content', 'status', 'create_time', 'update_time'])
+            drafts.discard(article.id)
         # many-to-many 关系赋值（文章-标签）
         article.tags.set(tags)
 
@@ -283,8 +346,10 @@ class EditArticleView(View):
         if not is_site_owner(request.user):
             return HttpResponseForbidden("无权限编辑文章")
         article = self._get_my_article(request, article_id)
-        tags = Tag.objects.all().order_by('name')
+        tags = get_all_tags()
         selected_tag_ids = list(article.tags.values_list('id', flat=True))
+        # 有未保存的自动保存内容时恢复到编辑框
+        draft = drafts.restore(article, selected_tag_ids)
         return render(request, 'article_edit.html', locals())
 
     @login.is_login_method
@@ -296,10 +361,15 @@ class EditArticleView(View):
         if not edit_form.is_valid():
             return JsonResponse({'code': 400, 'msg': edit_form.errors})
 
-        article.title = edit_form.cleaned_data['title']
-        article.content = edit_form.cleaned_data['content']
-        article.save(update_fields=['title', 'content', 'update_time'])
+        title = edit_form.cleaned_data['title']
+        content = edit_form.cleaned_data['content']
+        # 内容没有变化时不写文章行
+        if (article.title, article.content) != (title, content):
+            article.title = title
+            article.content = content
+            article.save(update_fields=['title', 'content', 'update_time'])
         article.tags.set(edit_form.cleaned_data['tags'])
+        drafts.discard(article.id)
 
         return JsonResponse({'code': 200, 'msg': '文章更新成功!'})
 
@@ -319,6 +389,7 @@ class DeleteArticleView(View):
         # 逻辑删除
         article.is_delete = True
         article.save(update_fields=['is_delete', 'update_time'])
+        drafts.discard(article.id)
         return redirect('index')
 
 
@@ -376,7 +447,21 @@ class RegisterView(View):
         return JsonResponse({'code': 200, 'msg': '注册成功!'})
 
 
+@method_decorator(csrf_exempt, name='dispatch')
 class PersonalCenterView(View):
+    upload_handler = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST':
+            # 头像上传：在 CSRF 校验读取请求体之前换上流式校验的上传处理器
+            self.upload_handler = ImageUploadHandler(
+                request,
+                field_name='avatar',
+                max_size=settings.AVATAR_MAX_SIZE,
+            )
+            request.upload_handlers = [self.upload_handler]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
     @staticmethod
     def _build_context(request):
         # 个人中心仅展示当前登录用户自己的已发布文章
@@ -421,7 +506,9 @@ class PersonalCenterView(View):
 
         if action == 'avatar':
             avatar_file = request.FILES.get('avatar')
-            if not avatar_file:
+            if self.upload_handler.error:
+                profile_error = self.upload_handler.error
+            elif not avatar_file:
                 profile_error = '请选择头像文件'
             else:
                 allow_ext = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
@@ -430,11 +517,15 @@ class PersonalCenterView(View):
                 ext = file_name[dot_index:].lower() if dot_index >= 0 else ''
                 if ext not in allow_ext:
                     profile_error = '头像仅支持 jpg/jpeg/png/gif/webp'
-                elif avatar_file.size > 5 * 1024 * 1024:
-                    profile_error = '头像大小不能超过 5MB'
                 else:
-                    request.user.avatar = avatar_file
+                    # 内容寻址存储：同一张图重复上传只保存一份
+                    old_avatar_name = request.user.avatar.name if request.user.avatar else ''
+                    stored = file_store.save_upload(avatar_file, 'avatar', avatar_file.image_ext)
+                    request.user.avatar = stored.name
                     request.user.save(update_fields=['avatar'])
+                    file_store.release(old_avatar_name)
+                    # 后台生成头像缩略图
+                    image_variants.schedule(stored.name, 'avatar')
                     profile_success = '头像更新成功'
         elif action == 'tag_add':
             if not is_site_owner(request.user):
@@ -475,16 +566,33 @@ class PersonalCenterView(View):
 
 
 class DataDashboardView(View):
-    def get(self, request):
-        # 最近 14 天访问趋势
-        days = 14
-        end_date = date.today()
-        start_date = end_date - timedelta(days=days - 1)
-        stat_queryset = DailyVisitStat.objects.filter(
+    # 统计最近 14 天
+    days = 14
+
+    @staticmethod
+    def _get_stat_queryset(start_date, end_date):
+        return DailyVisitStat.objects.filter(
             date__gte=start_date,
             date__lte=end_date,
         ).values('date', 'visit_count')
-        stat_map = {item['date']: item['visit_count'] for item in stat_queryset}
+
+    @staticmethod
+    def _get_register_queryset(start_date, end_date):
+        return User.objects.filter(
+            date_joined__date__gte=start_date,
+            date_joined__date__lte=end_date,
+        ).annotate(
+            register_date=TruncDate('date_joined')
+        ).values(
+            'register_date'
+        ).annotate(
+            total=Count('id')
+        )
+
+    @classmethod
+    def _build_chart_context(cls, start_date, stat_rows, register_rows):
+        days = cls.days
+        stat_map = {item['date']: item['visit_count'] for item in stat_rows}
 
         visit_dates = []
         visit_values = []
@@ -499,29 +607,31 @@ class DataDashboardView(View):
             visit_cumulative_values.append(cumulative)
 
         # 最近 14 天注册趋势
-        register_queryset = User.objects.filter(
-            date_joined__date__gte=start_date,
-            date_joined__date__lte=end_date,
-        ).annotate(
-            register_date=TruncDate('date_joined')
-        ).values(
-            'register_date'
-        ).annotate(
-            total=Count('id')
-        )
-        register_map = {item['register_date']: item['total'] for item in register_queryset}
+        register_map = {item['register_date']: item['total'] for item in register_rows}
         register_values = []
         for i in range(days):
             current_date = start_date + timedelta(days=i)
             register_values.append(int(register_map.get(current_date, 0)))
 
-        visit_dates_json = json.dumps(visit_dates, ensure_ascii=False)
-        visit_values_json = json.dumps(visit_values, ensure_ascii=False)
-        visit_cumulative_values_json = json.dumps(visit_cumulative_values, ensure_ascii=False)
-        register_values_json = json.dumps(register_values, ensure_ascii=False)
-        total_visit_count = DailyVisitStat.objects.aggregate(total=Sum('visit_count'))['total'] or 0
-        total_user_count = User.objects.count()
-        return render(request, 'dashboard.html', locals())
+        return {
+            'visit_dates_json': json.dumps(visit_dates, ensure_ascii=False),
+            'visit_values_json': json.dumps(visit_values, ensure_ascii=False),
+            'visit_cumulative_values_json': json.dumps(visit_cumulative_values, ensure_ascii=False),
+            'register_values_json': json.dumps(register_values, ensure_ascii=False),
+        }
+
+    def get(self, request):
+        # 最近 14 天访问趋势
+        end_date = date.today()
+        start_date = end_date - timedelta(days=self.days - 1)
+        context = self._build_chart_context(
+            start_date,
+            self._get_stat_queryset(start_date, end_date),
+            self._get_register_queryset(start_date, end_date),
+        )
+        context['total_visit_count'] = DailyVisitStat.objects.aggregate(total=Sum('visit_count'))['total'] or 0
+        context['total_user_count'] = User.objects.count()
+        return render(request, 'dashboard.html', context)
 
 
 # 退出登录
@@ -536,11 +646,25 @@ def logout(request):
 
 
 @login.is_login_func
+@csrf_exempt
 def upload_article_image(request):
     if request.method != 'POST':
         return JsonResponse({'success': 0, 'message': '仅支持 POST 请求'})
-
+    # 必须在 CSRF 校验读取请求体之前换上流式校验的上传处理器
+    upload_handler = ImageUploadHandler(
+        request,
+        field_name='editormd-image-file',
+        max_size=settings.ARTICLE_IMAGE_MAX_SIZE,
+    )
+    request.upload_handlers = [upload_handler]
+    return _save_article_image(request, upload_handler)
+
+
+@csrf_protect
+def _save_article_image(request, upload_handler):
     image_file = request.FILES.get('editormd-image-file')
+    if upload_handler.error:
+        return JsonResponse({'success': 0, 'message': upload_handler.error})
     if not image_file:
         return JsonResponse({'success': 0, 'message': '未接收到图片文件'})
 
@@ -551,14 +675,12 @@ def upload_article_image(request):
     if ext not in allow_ext:
         return JsonResponse({'success': 0, 'message': '仅支持 jpg/jpeg/png/gif/webp'})
 
-    # 10MB 限制
-    if image_file.size > 10 * 1024 * 1024:
-        return JsonResponse({'success': 0, 'message': '图片大小不能超过 10MB'})
-
-    # 保存到 media/article/
-    safe_name = f"{uuid4().hex}{ext}"
-    save_path = default_storage.save(f"article/{safe_name}", image_file)
-    file_url = f"{settings.MEDIA_URL}{save_path}".replace('\\', '/')
+    # 大小上限与真实类型已由上传处理器在接收过程中校验；扩展名以文件头识别结果为准
+    # 保存到 media/article/，文件名为内容 SHA-256，相同图片复用已有文件
+    stored = file_store.save_upload(image_file, 'article', image_file.image_ext)
+    file_url = f"{settings.MEDIA_URL}{stored.name}".replace('\\', '/')
+    # 后台生成多宽度 WebP/JPEG 派生图
+    image_variants.schedule(stored.name, 'article')
     return JsonResponse({'success': 1, 'message': '上传成功', 'url': file_url})
 
 
@@ -591,4 +713,114 @@ def create_tag(request):
     })
 
 
+@login.is_login_func
+def bulk_article_action(request):
+    """批量操作文章：operation=publish/unpublish/delete/add_tags/remove_tags/set_tags，ids、tags 可传多个。"""
+    if not is_site_owner(request.user):
+        return JsonResponse({'code': 403, 'msg': '无权限管理文章'})
+
+    if request.method != 'POST':
+        return JsonResponse({'code': 405, 'msg': '仅支持 POST 请求'})
 
+    # ids 支持多个同名参数或逗号分隔
+    article_ids = {
+        int(pk) for value in request.POST.getlist('ids') for pk in value.split(',') if pk.strip().isdigit()
+    }
+    tag_ids = {int(pk) for pk in request.POST.getlist('tags') if pk.isdigit()}
+    if not article_ids:
+        return JsonResponse({'code': 400, 'msg': '请选择文章'})
+    max_ids = getattr(settings, 'BULK_ARTICLE_MAX', 1000)
+    if len(article_ids) > max_ids:
+        return JsonResponse({'code': 400, 'msg': f'一次最多操作 {max_ids} 篇文章'})
+
+    operation = request.POST.get('operation', '')
+    try:
+        matched, changed = bulk_articles.apply(request.user, operation, article_ids, tag_ids)
+    except ValueError as exc:
+        return JsonResponse({'code': 400, 'msg': str(exc)})
+    return JsonResponse({
+        'code': 200,
+        'msg': f'已处理 {matched} 篇，其中 {len(changed)} 篇有变化',
+        'data': {'operation': operation, 'matched': matched, 'changed': changed},
+    })
+
+
+@login.is_login_func
+def autosave_draft(request):
+    """编辑器自动保存：内容先写草稿缓冲区，空闲或关闭页面（flush=1）时才写入文章行。"""
+    if not is_site_owner(request.user):
+        return JsonResponse({'code': 403, 'msg': '无权限编辑文章'})
+
+    if request.method != 'POST':
+        return JsonResponse({'code': 405, 'msg': '仅支持 POST 请求'})
+
+    title = request.POST.get('title', '').strip()
+    content = request.POST.get('content', '')
+    tag_ids = sorted({int(pk) for pk in request.POST.getlist('tags') if pk.isdigit()})
+    # 长度上限与发布表单一致
+    form_fields = PubArticleForm.base_fields
+    if len(title) > form_fields['title'].max_length or len(content) > form_fields['content'].max_length:
+        return JsonResponse({'code': 400, 'msg': '标题或内容超出长度限制'})
+
+    article_id = request.POST.get('article_id', '').strip()
+    if not article_id.isdigit():
+        if not title and not content.strip():
+            return JsonResponse({'code': 200, 'data': {'article_id': None, 'saved': 'unchanged'}})
+        # 新文章第一次自动保存：创建草稿行，之后的保存先写缓冲区
+        article = Article.objects.create(title=title, content=content, user=request.user, status=0)
+        article.tags.set(Tag.objects.filter(id__in=tag_ids))
+        return JsonResponse({'code': 200, 'data': {'article_id': article.id, 'saved': 'persisted'}})
+
+    article = Article.objects.filter(
+        id=int(article_id), user=request.user, is_delete=False,
+    ).only('id', 'status').first()
+    if article is None:
+        return JsonResponse({'code': 404, 'msg': '文章不存在'})
+    saved = drafts.autosave(article, title, content, tag_ids, flush=request.POST.get('flush') == '1')
+    return JsonResponse({'code': 200, 'data': {'article_id': article.id, 'saved': saved}})
+
+
+@never_cache
+def live_state(request):
+    """静态导出页面的动态部分：登录状态、CSRF token、阅读量/访问量计数与最新计数。"""
+    data = {'csrf_token': get_token(request), 'user': None, 'visit': None}
+    if request.user.is_authenticated:
+        data['user'] = {'username': request.user.username}
+
+    article_ids = [int(pk) for pk in request.GET.get('articles', '').split(',') if pk.isdigit()][:50]
+    read_id = request.GET.get('read', '').strip()
+    if read_id.isdigit():
+        article_id = int(read_id)
+        # 与 ArticleDetailView 相同的 1 小时限流
+        published = Article.objects.filter(id=article_id, is_delete=False, status=1)
+        if published.exists() and should_increase_read_count(request, article_id):
+            defer(increase_read_count, article_id)
+        article_ids.append(article_id)
+
+    if request.GET.get('visit') == '1':
+        today_visit_count, total_visit_count = count_site_visit(request)
+        data['visit'] = {'today_visit_count': today_visit_count, 'total_visit_count': total_visit_count}
+
+    counts = Article.objects.filter(id__in=article_ids, is_delete=False, status=1).values_list(
+        'id', 'read_count', 'comment_count'
+    )
+    data['articles'] = {
+        str(pk): {'read_count': read_count, 'comment_count': comment_count}
+        for pk, read_count, comment_count in counts
+    }
+    return JsonResponse({'code': 200, 'data': data})
+
+
+def suggest(request):
+    """搜索框输入提示：按前缀匹配文章标题和标签名（进程内索引，不查数据库）。"""
+    articles, tags = suggest_index.search(request.GET.get('q', '')[:50])
+    response = JsonResponse({
+        'code': 200,
+        'data': {
+            'articles': [{'id': pk, 'title': title} for pk, title in articles],
+            'tags': [{'id': pk, 'name': name} for pk, name in tags],
+        },
+    })
+    # 退格等重复输入直接用浏览器缓存
+    response['Cache-Control'] = 'public, max-age=30'
+    return response
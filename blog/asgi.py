@@ -12,5 +12,16 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog.settings')
+# ASGI 下首页/文章详情/数据看板使用异步视图
+os.environ.setdefault('BLOG_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+
+# 预热（WARMUP_ENABLED，环境变量 BLOG_WARMUP=0 关闭）：完成后 worker 才开始接收请求；
+# uvicorn 在事件循环中导入本模块，预热放到单独线程执行
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'WARMUP_ENABLED', True):
+    from app01.utils.warmup import warm_up_outside_loop  # noqa: E402
+
+    warm_up_outside_loop()
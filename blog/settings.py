@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -31,20 +32,31 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 延后任务：defer() 记下的副作用在响应发出后由后台线程执行（放在最前，所有请求都有任务列表）
+    'app01.utils.deferred.DeferredTaskMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # 预压缩静态文件：collectstatic 之后直接返回 .br/.gz，带哈希的文件长期缓存
+    'app01.utils.static_pipeline.PrecompressedStaticMiddleware',
+    # 请求级 SQL/Redis/模板耗时统计：Server-Timing 响应头 + /metrics 直方图
+    'app01.utils.metrics.MetricsMiddleware',
+    # 读写分离：写过数据的客户端在一段时间内读主库
+    'app01.utils.db_router.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # 超级管理员带 ?_profile=1 时用 cProfile 剖析该请求
+    'app01.utils.profiler.ProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'blog.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates 的子类，额外统计模板渲染耗时
+        'BACKEND': 'app01.utils.metrics.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -56,6 +68,7 @@ TEMPLATES = [
             ],
             'builtins': [
                 'django.templatetags.static',
+                'app01.templatetags.image_tags',
             ],
         },
     },
@@ -71,8 +84,28 @@ DATABASES = {
         'PASSWORD': '123456',
         'HOST': '127.0.0.1',
         'PORT': '3306',
-    }
+    },
+    # 从库示例（别名同时加入 DATABASE_REPLICAS）：
+    # 'replica1': {
+    #     'ENGINE': 'django.db.backends.mysql',
+    #     'NAME': 'blog',
+    #     'USER': 'readonly',
+    #     'PASSWORD': '123456',
+    #     'HOST': '127.0.0.1',
+    #     'PORT': '3307',
+    #     'TEST': {'MIRROR': 'default'},
+    # },
 }
+# 读写分离：请求中的读随机分到健康的从库，写入走 default；列表为空时全部走 default
+DATABASE_ROUTERS = ['app01.utils.db_router.ReplicaRouter']
+DATABASE_REPLICAS = []
+# 非安全方法写入数据后，该客户端读主库的秒数
+REPLICA_PIN_SECONDS = 10
+# 从库健康检查间隔（秒），检查失败或查询出现连接错误后摘除同样时长
+REPLICA_HEALTH_CHECK_INTERVAL = 5
+# MySQL 从库复制延迟超过该秒数时摘除（需 REPLICATION CLIENT 权限），None 不检查
+REPLICA_MAX_LAG_SECONDS = None
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -99,9 +132,70 @@ USE_TZ = False
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / "staticfiles"
+STATICFILES_FINDERS = [
+    'app01.utils.static_pipeline.BundleFileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+]
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # 文件名带内容哈希 + 预生成 gzip/brotli，需先执行 collectstatic
+    'staticfiles': {
+        'BACKEND': 'app01.utils.static_pipeline.CompressedManifestStaticFilesStorage',
+    },
+}
+# 未带哈希的静态文件（如 editor.md 动态加载的模块）的缓存时间（秒）
+STATIC_MAX_AGE = 3600
+# 第三方目录只收集页面实际用到的文件（发布/编辑页的 editor.md 仅启用表格工具栏）
+STATIC_BUNDLES = {
+    'editor.md-1.5.0': [
+        'editormd.min.js',
+        'css/editormd.min.css',
+        'fonts/*',
+        'images/loading*.gif',
+        'lib/marked.min.js',
+        'lib/prettify.min.js',
+        'lib/codemirror/codemirror.min.js',
+        'lib/codemirror/codemirror.min.css',
+        'lib/codemirror/modes.min.js',
+        'lib/codemirror/addons.min.js',
+        'lib/codemirror/addon/dialog/dialog.css',
+        'lib/codemirror/addon/search/matchesonscrollbar.css',
+        'plugins/table-dialog/table-dialog.js',
+    ],
+}
 # media
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# media 发送方式：None（FileResponse）/ 'x-accel-redirect'（Nginx）/ 'x-sendfile'（Apache、lighttpd）
+MEDIA_ACCEL = None
+# Nginx internal location，如 location /protected-media/ { internal; alias /path/to/media/; }
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+# 非内容寻址的 media 文件（如默认头像）的缓存时间（秒）
+MEDIA_MAX_AGE = 86400
+
+# 订阅（rss.xml / atom.xml）和站点地图（sitemap.xml + sitemaps/）的输出目录，生产环境由 Nginx 直接发送
+FEEDS_ROOT = BASE_DIR / 'feeds'
+FEEDS_ENABLED = True
+# 订阅和站点地图中的绝对地址前缀
+SITE_URL = 'http://127.0.0.1:8000'
+SITE_NAME = 'CNR Blog'
+FEED_ITEMS = 20
+# 站点地图按文章 id 分片，每片的 id 区间大小（协议上限 50000 条）
+SITEMAP_SHARD_SIZE = 5000
+FEEDS_MAX_AGE = 600
+
+# 相关文章：每篇保存的数量和标签相似度（jaccard / cosine），修改后执行 python manage.py build_related
+RELATED_ARTICLES_TOP_K = 5
+RELATED_ARTICLES_METRIC = 'jaccard'
+
+# 搜索提示索引：检查 Redis 版本号的最小间隔、Redis 不可用时索引的最长使用时间（秒）
+SUGGEST_CHECK_INTERVAL = 1
+SUGGEST_MAX_AGE = 300
+
+# 静态导出（python manage.py export_static）的输出目录：流量高峰时由 Nginx/CDN 直接发送已发布页面
+STATIC_EXPORT_ROOT = BASE_DIR / 'export'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -116,14 +210,97 @@ DEFAULT_FROM_EMAIL = '2331650385@qq.com'
 
 
 AUTH_USER_MODEL = 'app01.User'
+# 认证中间件按 session 加载用户时走两级缓存（进程内 LRU + Redis）
+AUTHENTICATION_BACKENDS = ['app01.utils.reference_cache.CachedModelBackend']
+# 标签、用户的两级缓存开关；关闭后每次直接查库
+TIERED_CACHE_ENABLED = True
 # Redis（用于阅读量去重限流）
 REDIS_HOST = '127.0.0.1'
 REDIS_PORT = 6379
 REDIS_DB = 0
 REDIS_PASSWORD = None
+# 本地验证时可替换为 Redis 替身，例如 'fakeredis.FakeRedis'
+REDIS_CLIENT_FACTORY = None
+# 异步视图使用的 redis.asyncio 替身，例如 'fakeredis.FakeAsyncRedis'
+REDIS_ASYNC_CLIENT_FACTORY = None
+
+# 首页/文章详情/数据看板使用异步视图（app01/async_views.py），blog/asgi.py 默认开启
+ASYNC_VIEWS = os.environ.get('BLOG_ASYNC_VIEWS') == '1'
+
+# 会话存 Redis（Redis 不可用时降级数据库），内容未变化时不写回
+SESSION_ENGINE = 'app01.utils.redis_session'
+
+# 去重/限流后端：
+# - RedisLimiterBackend：多进程/多机部署
+# - LocalLimiterBackend：单机部署、测试环境（进程内存储，无需 Redis）
+# - CacheLimiterBackend：使用 LIMITER_CACHE_ALIAS 指定的 Django cache
+LIMITER_BACKEND = 'app01.utils.limiter_backends.RedisLimiterBackend'
+
+# 性能统计：慢查询阈值（毫秒）
+SLOW_QUERY_MS = 100
+# Server-Timing 响应头会把每个请求的 SQL/Redis/模板耗时发给任何访客，只在本地调试、压测时打开
+SERVER_TIMING_HEADER = False
+# /metrics 抓取凭据：请求头 Authorization: Bearer <token>，环境变量 BLOG_METRICS_TOKEN 设置（超级管理员始终可访问）
+METRICS_TOKEN = os.environ.get('BLOG_METRICS_TOKEN')
+# 免凭据抓取的地址（如独立的内网抓取机）。同机 Nginx 反向代理时所有访客的 REMOTE_ADDR 都是 127.0.0.1，不要填回环地址
+METRICS_ALLOWED_IPS = ()
+
+# 按需请求剖析：是否启用（默认关闭，环境变量 BLOG_PROFILER=1 开启）、结果目录、最多保留的文件数（超出删除最旧的）
+PROFILER_ENABLED = os.environ.get('BLOG_PROFILER') == '1'
+PROFILER_DIR = BASE_DIR / 'profiles'
+PROFILER_MAX_FILES = 50
+
+# 图片上传大小上限（字节）：上传处理器在接收过程中校验，超限立即中断
+ARTICLE_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+AVATAR_MAX_SIZE = 5 * 1024 * 1024
+
+# 派生图片（需安装 Pillow）：头像缩略图边长、文章图片宽度、后台生成线程数
+IMAGE_AVATAR_SIZES = (96, 160)
+IMAGE_ARTICLE_WIDTHS = (480, 960, 1440)
+IMAGE_VARIANT_WORKERS = 2
+# 派生图是否存在的进程内缓存条数；“存在”/“不存在”的结果分别缓存多少秒后重新检查
+IMAGE_VARIANT_CACHE_SIZE = 10000
+IMAGE_VARIANT_HIT_TTL = 600
+IMAGE_VARIANT_MISS_TTL = 60
 
 # 阅读量去重窗口（秒）
 ARTICLE_READ_LIMIT_SECONDS = 3600
 
 # 网站访问去重窗口（秒，按 IP）
 SITE_VISIT_LIMIT_SECONDS = 3600
+
+# 爬虫/监控识别（app01/utils/bot_detect.py）：识别出的请求不计阅读量、访问量
+BOT_DETECTION_ENABLED = True
+# 追加的 User-Agent 正则（不区分大小写）
+BOT_USER_AGENT_PATTERNS = []
+# 按来源 IP 识别的网段，如监控服务的出口地址：['203.0.113.0/24']
+BOT_IP_RANGES = []
+# 按 UA 字符串缓存分类结果的条数
+BOT_UA_CACHE_SIZE = 4096
+
+# 延后任务（app01/utils/deferred.py）：阅读量计数等在响应发出后由后台线程执行
+DEFERRED_WORKERS = 4
+# 队列上限：排满后在请求线程里直接执行（背压）
+DEFERRED_MAX_PENDING = 1000
+# 进程退出时等待队列执行完的最长秒数
+DEFERRED_DRAIN_TIMEOUT = 10
+# True：在 request_finished 里同步执行（调试、查询预算检查用）
+DEFERRED_INLINE = False
+
+# worker 预热（app01/utils/warmup.py）：blog/wsgi.py、blog/asgi.py 导入时执行，BLOG_WARMUP=0 关闭
+WARMUP_ENABLED = os.environ.get('BLOG_WARMUP', '1') != '0'
+# 预先编译的模板
+WARMUP_TEMPLATES = ['base.html', 'index.html', 'article_detail.html']
+# 失败时 /readyz 返回 503 的预热步骤（其余步骤失败只记日志，功能本身有降级）
+WARMUP_REQUIRED_STEPS = ('db',)
+
+# 草稿自动保存（app01/utils/drafts.py）：最后一次自动保存后空闲多少秒写入文章行
+DRAFT_IDLE_SECONDS = 30
+# Redis 中草稿缓冲的保留时间（秒）
+DRAFT_BUFFER_TTL = 7 * 24 * 3600
+
+# 文章批量操作（/article/bulk/）一次最多处理的文章数
+BULK_ARTICLE_MAX = 1000
+
+# 后台列表页（app01/utils/admin_changelist.py）：结果超过这个行数时显示估算条数（无筛选时取 MySQL 表统计），按主键排序时改用游标翻页
+ADMIN_COUNT_THRESHOLD = 10000
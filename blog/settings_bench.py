@@ -0,0 +1,25 @@
+"""
+本地基准测试配置：SQLite + 进程内去重，不依赖 MySQL 和 Redis。
+
+    python manage.py migrate --settings=blog.settings_bench
+    python manage.py generate_demo_data --scale medium --settings=blog.settings_bench
+    python manage.py bench_routes --settings=blog.settings_bench --output bench.json
+"""
+from blog.settings import *  # noqa: F401,F403
+from blog.settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'bench.sqlite3',
+    }
+}
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+LIMITER_BACKEND = 'app01.utils.limiter_backends.LocalLimiterBackend'
+# 不要求先执行 collectstatic（模板里的 {% static %} 不查 staticfiles.json 清单）
+STORAGES = {
+    **STORAGES,  # noqa: F405
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# 每个请求的 SQL 条数取自 Server-Timing 响应头
+SERVER_TIMING_HEADER = True
@@ -0,0 +1,29 @@
+"""
+测试配置：SQLite，不依赖 MySQL 和 Redis。
+
+    python manage.py test app01 --settings=blog.settings_test
+
+需要 Redis 的测试用 override_settings 指向 fakeredis（未安装时跳过）。
+replica 为独立的 SQLite 从库，默认不加入 DATABASE_REPLICAS，读写分离的测试里再开启。
+"""
+from blog.settings import *  # noqa: F401,F403
+from blog.settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_replica.sqlite3',
+    },
+}
+DATABASE_REPLICAS = []
+SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+LIMITER_BACKEND = 'app01.utils.limiter_backends.LocalLimiterBackend'
+STORAGES = {
+    **STORAGES,  # noqa: F405
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -1,9 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from app01.utils import profiler
+
 app_name = 'blog'
 
 urlpatterns = [
+    # 请求剖析记录（需在 admin.site.urls 之前）
+    path('admin/profiles/', profiler.profile_list, name='profile_list'),
+    path('admin/profiles/<str:name>', profiler.profile_download, name='profile_download'),
     path('admin/', admin.site.urls),
 
     path('', include('app01.urls')),
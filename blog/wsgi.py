@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog.settings')
 
 application = get_wsgi_application()
+
+# 预热（WARMUP_ENABLED，环境变量 BLOG_WARMUP=0 关闭）：完成后 worker 才开始接收请求
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'WARMUP_ENABLED', True):
+    from app01.utils.warmup import warm_up  # noqa: E402
+
+    warm_up()
@@ -0,0 +1,93 @@
+// 文章编辑器自动保存：内容有变化时每隔几秒提交一次，关闭页面时用 sendBeacon 提交并要求立即落库
+// options: url、articleId（新文章为空，首次保存后由服务器返回）、collect()（返回 {title, content, tags}）、
+//          status（显示保存状态的 jQuery 元素）、interval（毫秒，默认 5000）
+// 编辑器加载完成后调用返回对象的 ready()，以当时的内容为基准，之后有变化才提交
+window.draftAutosave = function (options) {
+    var articleId = options.articleId || '';
+    var lastSent = null;
+    var inflight = false;
+    var stopped = false;
+
+    function buildForm(data, flush) {
+        var form = new FormData();
+        form.append('csrfmiddlewaretoken', $("[name='csrfmiddlewaretoken']").val());
+        form.append('article_id', articleId);
+        form.append('title', data.title);
+        form.append('content', data.content);
+        $.each(data.tags, function (_, tag) {
+            form.append('tags', tag);
+        });
+        if (flush) {
+            form.append('flush', '1');
+        }
+        return form;
+    }
+
+    function save() {
+        if (lastSent === null || stopped || inflight) {
+            return;
+        }
+        var data = options.collect();
+        var snapshot = JSON.stringify(data);
+        // 内容没变时跳过：输入再频繁，每个间隔最多提交一次
+        if (snapshot === lastSent) {
+            return;
+        }
+        inflight = true;
+        $.ajax({
+            url: options.url,
+            type: 'POST',
+            data: buildForm(data, false),
+            processData: false,
+            contentType: false,
+            success: function (res) {
+                if (res.code === 200) {
+                    lastSent = snapshot;
+                    if (res.data.article_id) {
+                        articleId = res.data.article_id;
+                    }
+                    options.status.text('已自动保存 ' + new Date().toLocaleTimeString());
+                } else {
+                    options.status.text(res.msg || '自动保存失败');
+                }
+            },
+            error: function () {
+                options.status.text('自动保存失败，稍后重试');
+            },
+            complete: function () {
+                inflight = false;
+            }
+        });
+    }
+
+    var timer = setInterval(save, options.interval || 5000);
+
+    window.addEventListener('pagehide', function () {
+        if (lastSent === null || stopped || !navigator.sendBeacon) {
+            return;
+        }
+        // 首次保存还在途中时还没有 articleId，再不带 id 提交会另建一篇草稿，只保留在途那次
+        if (inflight && !articleId) {
+            return;
+        }
+        var data = options.collect();
+        if (!articleId && JSON.stringify(data) === lastSent) {
+            return;
+        }
+        navigator.sendBeacon(options.url, buildForm(data, true));
+    });
+
+    return {
+        ready: function () {
+            lastSent = JSON.stringify(options.collect());
+        },
+        articleId: function () {
+            return articleId;
+        },
+        // 显式发布/保存前调用，之后不再自动提交
+        stop: function () {
+            stopped = true;
+            clearInterval(timer);
+        }
+    };
+};
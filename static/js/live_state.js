@@ -0,0 +1,65 @@
+// 静态导出页面的动态部分：一次请求 live_state 接口，补全登录状态、CSRF token 和计数
+(function () {
+    var script = document.currentScript;
+    var url = script.getAttribute('data-url');
+
+    $(function () {
+        var articleIds = [];
+        $('[data-live-read], [data-live-comment]').each(function () {
+            var id = $(this).data('live-read') || $(this).data('live-comment');
+            if (articleIds.indexOf(id) < 0) {
+                articleIds.push(id);
+            }
+        });
+        var params = {articles: articleIds.join(',')};
+        // 文章页计阅读量，首页计站点访问量（与动态页面相同的限流规则）
+        var article = $('[data-live-article]').data('live-article');
+        if (article) {
+            params.read = article;
+        }
+        if ($('[data-live-visit]').length) {
+            params.visit = 1;
+        }
+
+        $.getJSON(url, params, function (res) {
+            if (res.code !== 200) {
+                return;
+            }
+            var data = res.data;
+
+            // POST 表单补上 CSRF token（导出时没有输出）
+            $('form[method="post"]').each(function () {
+                if (!$(this).find('input[name="csrfmiddlewaretoken"]').length) {
+                    $('<input type="hidden" name="csrfmiddlewaretoken">').val(data.csrf_token).prependTo(this);
+                }
+            });
+
+            if (data.user) {
+                $('.nav-auth').empty().append(
+                    $('<a href="/profile/" class="btn btn-primary"></a>').text(data.user.username)
+                );
+                // 登录用户评论不需要填写昵称
+                $('input[name="guest_name"]').closest('div').remove();
+            }
+
+            $.each(data.articles, function (id, counts) {
+                $('[data-live-read="' + id + '"]').text(counts.read_count);
+                $('[data-live-comment="' + id + '"]').text(counts.comment_count);
+                var total = $('[data-comment-total="' + id + '"]');
+                // 导出后又有新评论：提示打开动态页面查看
+                if (total.length && counts.comment_count > parseInt(total.text(), 10)) {
+                    total.closest('h5').after(
+                        $('<div class="alert alert-info py-2 small"></div>').append(
+                            $('<a>').attr('href', '?fresh=1').text('有 ' + (counts.comment_count - parseInt(total.text(), 10)) + ' 条新评论，点击查看')
+                        )
+                    );
+                }
+            });
+
+            if (data.visit) {
+                $('[data-live-visit="today"]').text(data.visit.today_visit_count);
+                $('[data-live-visit="total"]').text(data.visit.total_visit_count);
+            }
+        });
+    });
+})();
@@ -0,0 +1,61 @@
+// 搜索框输入提示：输入停顿后请求 /suggest/，列出匹配的标签和文章标题
+(function () {
+    var url = document.currentScript.getAttribute('data-url');
+
+    $(function () {
+        var form = $('.nav-search-form');
+        var input = form.find('input[name="q"]');
+        var menu = $('<div class="list-group position-absolute w-100 shadow-sm" style="z-index:1050; top:100%;"></div>').hide();
+        form.addClass('position-relative').append(menu);
+        var timer = null;
+        var latest = '';
+
+        function render(data) {
+            menu.empty();
+            $.each(data.tags, function (_, tag) {
+                menu.append(
+                    $('<a class="list-group-item list-group-item-action small"></a>')
+                        .attr('href', '/?tag=' + tag.id)
+                        .append($('<span class="badge text-bg-light border me-2">标签</span>'), $('<span>').text(tag.name))
+                );
+            });
+            $.each(data.articles, function (_, article) {
+                menu.append(
+                    $('<a class="list-group-item list-group-item-action small text-truncate"></a>')
+                        .attr('href', '/article/' + article.id + '/')
+                        .text(article.title)
+                );
+            });
+            menu.toggle(menu.children().length > 0);
+        }
+
+        input.on('input', function () {
+            clearTimeout(timer);
+            var keyword = $.trim(input.val());
+            latest = keyword;
+            if (!keyword) {
+                menu.hide();
+                return;
+            }
+            timer = setTimeout(function () {
+                $.getJSON(url, {q: keyword}, function (res) {
+                    // 只显示最后一次输入的结果
+                    if (res.code === 200 && keyword === latest) {
+                        render(res.data);
+                    }
+                });
+            }, 120);
+        });
+
+        input.on('keydown', function (event) {
+            if (event.key === 'Escape') {
+                menu.hide();
+            }
+        });
+        $(document).on('click', function (event) {
+            if (!form.is(event.target) && !form.has(event.target).length) {
+                menu.hide();
+            }
+        });
+    });
+})();